@@ -0,0 +1,8 @@
+"""Núcleo de cálculo do Analisador Under/Over.
+
+Importar este pacote não carrega Streamlit nem pandas: apenas NumPy.
+"""
+from analisador.lote import gerar_curvas_lote
+from analisador.nucleo import AnalisadorApostasUnderOver
+
+__all__ = ['AnalisadorApostasUnderOver', 'gerar_curvas_lote']
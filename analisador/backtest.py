@@ -0,0 +1,156 @@
+"""Backtest histórico dos sinais de divergência e das janelas de entrada
+
+Reproduz os históricos do ArmazemTicks contra os sinais do analisador e
+simula operações de trading com saída após um número fixo de minutos:
+
+  * divergência: em cada partida, entra no primeiro tick de cada faixa de
+    analisar_divergencia (🔥 OPORTUNIDADE ALTA ... 🚨 RISCO ALTO),
+    apostando no under;
+  * janela_under / janela_over: entra nos minutos indicados por
+    analisar_melhor_entrada_under / analisar_melhor_entrada_over (as
+    mesmas regras, varridas em lote por entradas.varrer_entradas).
+
+A saída é o primeiro tick em minuto >= entrada + minutos_saida (ou o
+último tick da partida). O retorno de uma operação fechada é
+odd_entrada / odd_saida - 1 por unidade apostada.
+
+As partidas são divididas em fatias de tamanho fixo processadas num pool
+de processos; como as fatias não dependem do número de processos e são
+somadas sempre na mesma ordem, o resultado agregado é determinístico.
+
+    python -m analisador.backtest dados/historico --processos 8
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analisador.entradas import ESTRATEGIA_OVER, ESTRATEGIA_UNDER, varrer_entradas
+from analisador.historico import ArmazemTicks
+from analisador.lote import STATUS_DIVERGENCIA, classificar_divergencia_lote, gerar_curvas_lote
+
+FAIXAS = STATUS_DIVERGENCIA + ('janela_under', 'janela_over')
+JANELA_UNDER = len(STATUS_DIVERGENCIA)
+JANELA_OVER = JANELA_UNDER + 1
+
+TAMANHO_FATIA = 500
+
+
+def _carregar_fatia(raiz, ids):
+    armazem = ArmazemTicks(raiz)
+    blocos = [armazem.ticks(i) for i in ids]
+    inicio = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blocos], out=inicio[1:])
+    ticks = np.concatenate(blocos) if blocos else np.zeros(0)
+    unders = np.array([armazem.under_inicial(i) for i in ids])
+    return unders, inicio, ticks
+
+
+def _operacoes(chave, precos, inicio, partida_entrada, minuto_entrada, indice_entrada, minutos_saida):
+    """Retorno de cada operação: saída no primeiro tick em minuto >= entrada + minutos_saida"""
+    saida = np.searchsorted(chave, partida_entrada * 1000.0 + minuto_entrada + minutos_saida, side='left')
+    saida = np.minimum(saida, inicio[partida_entrada + 1] - 1)
+    saida = np.maximum(saida, indice_entrada)
+    return precos[indice_entrada] / precos[saida] - 1
+
+
+def avaliar_fatia(unders, inicio, ticks, minutos_saida=15):
+    """Soma entradas, acertos e retorno por faixa para um bloco de partidas
+
+    Devolve uma matriz (len(FAIXAS), 3): entradas, acertos, soma do retorno.
+    """
+    resultado = np.zeros((len(FAIXAS), 3))
+    if ticks.shape[0] == 0:
+        return resultado
+
+    n_partidas = unders.shape[0]
+    partida = np.repeat(np.arange(n_partidas), np.diff(inicio))
+    minuto = ticks['minuto'].astype(np.float64)
+    under = ticks['under'].astype(np.float64)
+    over = ticks['over'].astype(np.float64)
+    chave = partida * 1000.0 + minuto
+
+    curvas = gerar_curvas_lote(unders)
+    indice_minuto = np.clip(minuto.astype(np.int64), 1, 90) - 1
+    esperado = curvas['under'][partida, indice_minuto]
+    _, faixa = classificar_divergencia_lote(under, esperado)
+
+    def acumular(posicao_faixa, retornos):
+        resultado[posicao_faixa, 0] += retornos.shape[0]
+        resultado[posicao_faixa, 1] += np.count_nonzero(retornos > 0)
+        resultado[posicao_faixa, 2] += retornos.sum()
+
+    # Divergência: primeiro tick de cada (partida, faixa)
+    _, primeiros = np.unique(partida * len(FAIXAS) + faixa, return_index=True)
+    for posicao_faixa in range(len(STATUS_DIVERGENCIA)):
+        entradas = primeiros[faixa[primeiros] == posicao_faixa]
+        acumular(posicao_faixa, _operacoes(chave, under, inicio, partida[entradas],
+                                           minuto[entradas], entradas, minutos_saida))
+
+    # Janelas de entrada: varridas em lote sobre a matriz de curvas
+    com_ticks = np.diff(inicio) > 0
+    for posicao_faixa, estrategia, precos in ((JANELA_UNDER, ESTRATEGIA_UNDER, under),
+                                              (JANELA_OVER, ESTRATEGIA_OVER, over)):
+        varredura = varrer_entradas(curvas[estrategia.serie], estrategia)
+        selecionadas = (varredura['minuto'] > 0) & com_ticks[:, None]
+        if not selecionadas.any():
+            continue
+        partidas_entrada = np.nonzero(selecionadas)[0]
+        minutos_entrada = varredura['minuto'][selecionadas].astype(np.float64)
+        indices = np.searchsorted(chave, partidas_entrada * 1000.0 + minutos_entrada, side='left')
+        validas = indices < inicio[partidas_entrada + 1]
+        acumular(posicao_faixa, _operacoes(chave, precos, inicio, partidas_entrada[validas],
+                                           minutos_entrada[validas], indices[validas], minutos_saida))
+    return resultado
+
+
+def _executar_fatia(argumentos):
+    raiz, ids, minutos_saida = argumentos
+    return avaliar_fatia(*_carregar_fatia(raiz, ids), minutos_saida=minutos_saida)
+
+
+def resumir(totais):
+    relatorio = {}
+    for nome, (entradas, acertos, soma_retorno) in zip(FAIXAS, totais.tolist()):
+        relatorio[nome] = {
+            'entradas': int(entradas),
+            'acertos': int(acertos),
+            'taxa_acerto': round(acertos / entradas * 100, 1) if entradas else 0.0,
+            'roi_percent': round(soma_retorno / entradas * 100, 2) if entradas else 0.0
+        }
+    return relatorio
+
+
+def executar_backtest(raiz, temporada=None, processos=None, minutos_saida=15, tamanho_fatia=TAMANHO_FATIA):
+    """Roda o backtest sobre o armazém em raiz; devolve o relatório por faixa"""
+    ids = ArmazemTicks(raiz).partidas(temporada)
+    fatias = [(raiz, ids[i:i + tamanho_fatia], minutos_saida) for i in range(0, len(ids), tamanho_fatia)]
+
+    if processos == 1 or len(fatias) <= 1:
+        parciais = [_executar_fatia(f) for f in fatias]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            # map preserva a ordem das fatias: soma sempre na mesma ordem
+            parciais = list(pool.map(_executar_fatia, fatias))
+
+    totais = np.zeros((len(FAIXAS), 3))
+    for parcial in parciais:
+        totais += parcial
+    return resumir(totais)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backtest dos sinais do analisador')
+    parser.add_argument('raiz', help='diretório do ArmazemTicks')
+    parser.add_argument('--temporada', default=None)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--minutos-saida', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    relatorio = executar_backtest(args.raiz, args.temporada, args.processos, args.minutos_saida)
+    for nome, dados in relatorio.items():
+        print(f"{nome}: {dados['entradas']} entradas | acerto {dados['taxa_acerto']}% | ROI {dados['roi_percent']:+.2f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Cache limitado (LRU) na frente dos métodos caros do analisador"""
+import threading
+from collections import OrderedDict
+
+from analisador.nucleo import AnalisadorApostasUnderOver
+from analisador.resultado import ResultadoCurva
+
+
+class CacheLRU:
+    """Cache com tamanho máximo: descarta o item usado há mais tempo
+
+    Seguro para uso entre threads (cada sessão do Streamlit roda numa thread).
+    """
+
+    def __init__(self, tamanho_maximo=256):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+    def obter(self, chave, calcular):
+        """Devolve o valor em cache para chave, ou calcula, guarda e devolve"""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+
+        valor = calcular()
+
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+                self.descartes += 1
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self):
+        total = self.acertos + self.falhas
+        return {
+            'itens': len(self._itens),
+            'tamanho_maximo': self.tamanho_maximo,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+            'taxa_acerto': round(self.acertos / total * 100, 1) if total else 0.0
+        }
+
+
+def _chave_curva(curva, coluna):
+    if isinstance(curva, ResultadoCurva):
+        return (coluna, curva.minutos.tobytes(), getattr(curva, coluna).tobytes())
+    return tuple(linha[coluna] for linha in curva)
+
+
+class AnalisadorEmCache:
+    """Analisador com cache nos métodos caros
+
+    Os resultados devolvidos são compartilhados entre chamadas: trate-os
+    como somente leitura (curvas e projeções são ResultadoCurva com arrays
+    travados). Métodos sem cache são repassados ao analisador.
+
+    Com disco (um CacheDisco), uma falha na memória consulta o disco antes
+    de calcular, e o que é calculado fica gravado para outros processos e
+    reinícios.
+    """
+
+    def __init__(self, analisador=None, tamanho_maximo=256, disco=None):
+        self.analisador = analisador if analisador is not None else AnalisadorApostasUnderOver()
+        self.disco = disco
+        self.caches = {
+            'curva': CacheLRU(tamanho_maximo),
+            'distribuicao': CacheLRU(tamanho_maximo),
+            'entrada_under': CacheLRU(tamanho_maximo),
+            'entrada_over': CacheLRU(tamanho_maximo),
+            'projecao': CacheLRU(tamanho_maximo),
+            'tabelas': CacheLRU(tamanho_maximo)
+        }
+
+    def __getattr__(self, nome):
+        return getattr(self.analisador, nome)
+
+    def _obter(self, nome, chave, calcular):
+        if self.disco is not None:
+            return self.caches[nome].obter(chave, lambda: self.disco.obter(nome, chave, calcular))
+        return self.caches[nome].obter(chave, calcular)
+
+    def gerar_curva_equilibrio_90min(self, under_inicial, over_inicial, ao_criar_pontos=None):
+        """Curva em cache por under_inicial (over_inicial não altera a curva)"""
+        def calcular():
+            pontos = {}
+            curva = self.analisador.gerar_curva_equilibrio_90min(
+                under_inicial, over_inicial, ao_criar_pontos=pontos.update
+            )
+            return curva, pontos
+
+        curva, pontos = self._obter('curva', float(under_inicial), calcular)
+        if ao_criar_pontos is not None:
+            ao_criar_pontos(dict(pontos))
+        return curva
+
+    def analisar_distribuicao_queda(self, curva):
+        return self._obter(
+            'distribuicao', _chave_curva(curva, 'under'),
+            lambda: self.analisador.analisar_distribuicao_queda(curva)
+        )
+
+    def analisar_melhor_entrada_under(self, curva):
+        return self._obter(
+            'entrada_under', _chave_curva(curva, 'under'),
+            lambda: self.analisador.analisar_melhor_entrada_under(curva)
+        )
+
+    def analisar_melhor_entrada_over(self, curva):
+        return self._obter(
+            'entrada_over', _chave_curva(curva, 'over'),
+            lambda: self.analisador.analisar_melhor_entrada_over(curva)
+        )
+
+    def projetar_restante_equilibrio(self, under_inicial, under_atual, minuto_atual, placar):
+        return self._obter(
+            'projecao', (float(under_inicial), float(under_atual), int(minuto_atual), placar),
+            lambda: self.analisador.projetar_restante_equilibrio(under_inicial, under_atual, minuto_atual, placar)
+        )
+
+    def obter_tabela(self, chave, construir):
+        """Cache genérico para tabelas derivadas (DataFrames dos gráficos)"""
+        return self.caches['tabelas'].obter(chave, construir)
+
+    def estatisticas(self):
+        estatisticas = {nome: cache.estatisticas() for nome, cache in self.caches.items()}
+        if self.disco is not None:
+            estatisticas['disco'] = self.disco.estatisticas()
+        return estatisticas
+
+    def limpar(self):
+        for cache in self.caches.values():
+            cache.limpar()
@@ -0,0 +1,372 @@
+"""Cache persistente em disco (SQLite) dos resultados do analisador
+
+O CacheLRU de cache.py vive na memória do processo: reiniciar o servidor
+ou subir um novo contêiner recalcula tudo do zero. CacheDisco guarda os
+mesmos resultados num arquivo SQLite que sobrevive aos reinícios e pode
+ser compartilhado por vários processos na mesma máquina:
+
+  * chave: (tipo, entradas do método) mais o hash dos parâmetros do
+    modelo (hash_parametros), então trocar os parâmetros invalida tudo;
+  * valores em binário compacto: curvas como int16 + float64 crus
+    (~1.6 KB por curva de 90 minutos), análises como JSON;
+  * modo WAL: leitores não bloqueiam o escritor nem uns aos outros, e
+    cada thread usa a própria conexão;
+  * tamanho limitado: passando de tamanho_maximo bytes, os itens acessados
+    há mais tempo são descartados até sobrar 90% do limite;
+  * leitura sem escrita: os horários de acesso dos acertos ficam em
+    memória e vão ao disco em lote (a cada intervalo_acesso acertos, nas
+    gravações e antes do descarte), sem esperar pela trava de escrita.
+    Sob disputa o lote é deixado para depois; na pior das hipóteses o
+    LRU fica menos preciso, mas um valor já lido nunca é jogado fora.
+
+Falhas do SQLite (disco cheio, banco travado além do timeout) não
+derrubam o analisador: o valor é calculado normalmente e o erro contado.
+Um valor guardado que não decodifica (truncado ou corrompido) é apagado
+e tratado como ausente.
+
+Pré-aquecimento com as odds de abertura mais comuns (escada de ticks da
+bolsa de 1.5 a 30):
+    python -m analisador.cache_disco aquecer [--caminho ARQUIVO]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+
+import numpy as np
+
+from analisador.parametros import PARAMETROS, hash_parametros
+from analisador.resultado import ResultadoCurva
+
+ARQUIVO_PADRAO = os.environ.get('ANALISADOR_CACHE', os.path.join('dados', 'cache_resultados.sqlite'))
+
+FORMATO = 1
+TAMANHO_MAXIMO = 64 * 1024 * 1024
+TEMPO_ESPERA = 5.0
+INTERVALO_LIMPEZA = 64
+INTERVALO_ACESSO = 64
+FRACAO_APOS_LIMPEZA = 0.9
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    chave BLOB PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    valor BLOB NOT NULL,
+    tamanho INTEGER NOT NULL,
+    acesso REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resultados_acesso ON resultados (acesso);
+"""
+
+
+def _codificar_curva(curva):
+    return struct.pack('<H', len(curva)) + curva.minutos.tobytes() + curva.valores.tobytes()
+
+
+def _decodificar_curva(dados, posicao=0):
+    (tamanho,) = struct.unpack_from('<H', dados, posicao)
+    posicao += 2
+    minutos = np.frombuffer(dados, dtype=np.int16, count=tamanho, offset=posicao)
+    posicao += 2 * tamanho
+    valores = np.frombuffer(dados, dtype=np.float64, count=2 * tamanho, offset=posicao).reshape(2, tamanho)
+    return ResultadoCurva(minutos, valores[0], valores[1]), posicao + 16 * tamanho
+
+
+def _codificar_curva_pontos(valor):
+    curva, pontos = valor
+    minutos = sorted(pontos)
+    return (_codificar_curva(curva) + struct.pack('<H', len(minutos))
+            + np.array(minutos, dtype=np.int16).tobytes()
+            + np.array([pontos[m] for m in minutos], dtype=np.float64).tobytes())
+
+
+def _decodificar_curva_pontos(dados):
+    curva, posicao = _decodificar_curva(dados)
+    (tamanho,) = struct.unpack_from('<H', dados, posicao)
+    posicao += 2
+    minutos = np.frombuffer(dados, dtype=np.int16, count=tamanho, offset=posicao).tolist()
+    valores = np.frombuffer(dados, dtype=np.float64, count=tamanho, offset=posicao + 2 * tamanho).tolist()
+    return curva, dict(zip(minutos, valores))
+
+
+def _codificar_json(valor):
+    return json.dumps(valor, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _decodificar_json(dados):
+    return json.loads(dados)
+
+
+# Erros de decodificação de um valor truncado ou corrompido
+ERROS_DECODIFICACAO = (struct.error, ValueError, UnicodeDecodeError)
+
+# tipo -> (codificar, decodificar); os tipos são os caches de AnalisadorEmCache
+CODECS = {
+    'curva': (_codificar_curva_pontos, _decodificar_curva_pontos),
+    'projecao': (_codificar_curva, lambda dados: _decodificar_curva(dados)[0]),
+    'distribuicao': (_codificar_json, _decodificar_json),
+    'entrada_under': (_codificar_json, _decodificar_json),
+    'entrada_over': (_codificar_json, _decodificar_json),
+}
+
+
+class CacheDisco:
+    """Cache persistente em SQLite, seguro entre threads e processos"""
+
+    def __init__(self, caminho=ARQUIVO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO, parametros=None,
+                 intervalo_limpeza=INTERVALO_LIMPEZA, intervalo_acesso=INTERVALO_ACESSO):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.intervalo_limpeza = intervalo_limpeza
+        self.intervalo_acesso = intervalo_acesso
+        self.versao = f'{FORMATO}:{hash_parametros(parametros if parametros is not None else PARAMETROS)}'
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._gravacoes = 0
+        self._acessos = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.erros = 0
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        conexao = self._conexao()
+        conexao.execute('PRAGMA journal_mode=WAL')
+        conexao.executescript(ESQUEMA)
+
+    @classmethod
+    def abrir(cls, caminho=ARQUIVO_PADRAO, **opcoes):
+        """Abre o cache; None se desativado (caminho vazio) ou se o arquivo não pode ser usado"""
+        if not caminho:
+            return None
+        try:
+            return cls(caminho, **opcoes)
+        except (OSError, sqlite3.Error):
+            return None
+
+    def _conexao(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            # Autocommit: cada comando é uma transação curta
+            conexao = sqlite3.connect(self.caminho, timeout=TEMPO_ESPERA, isolation_level=None)
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def _chave(self, tipo, chave):
+        return hashlib.blake2b(repr((self.versao, tipo, chave)).encode(), digest_size=16).digest()
+
+    def _contar(self, campo):
+        with self._trava:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def _gravar_acessos(self, espera=False):
+        """Leva ao disco os horários de acesso pendentes, numa só transação
+
+        Sem espera, desiste na hora se outro processo tem a trava de escrita;
+        horários perdidos só deixam o LRU menos preciso.
+        """
+        with self._trava:
+            if not self._acessos:
+                return
+            acessos, self._acessos = self._acessos, {}
+        try:
+            conexao = self._conexao()
+            conexao.execute(f'PRAGMA busy_timeout = {int(TEMPO_ESPERA * 1000) if espera else 0}')
+            try:
+                conexao.execute('BEGIN IMMEDIATE')
+                conexao.executemany('UPDATE resultados SET acesso = ? WHERE chave = ?',
+                                    [(instante, chave) for chave, instante in acessos.items()])
+                conexao.execute('COMMIT')
+            finally:
+                if conexao.in_transaction:
+                    conexao.execute('ROLLBACK')
+                conexao.execute(f'PRAGMA busy_timeout = {int(TEMPO_ESPERA * 1000)}')
+        except sqlite3.Error:
+            pass
+
+    def ler(self, tipo, chave):
+        """Valor guardado para (tipo, chave), ou None; só lê do banco (o acesso vai em lote)"""
+        chave = self._chave(tipo, chave)
+        try:
+            conexao = self._conexao()
+            linha = conexao.execute('SELECT valor FROM resultados WHERE chave = ?', (chave,)).fetchone()
+        except sqlite3.Error:
+            self._contar('erros')
+            return None
+        if linha is None:
+            return None
+        try:
+            valor = CODECS[tipo][1](linha[0])
+        except ERROS_DECODIFICACAO:
+            self._contar('erros')
+            try:
+                conexao.execute('DELETE FROM resultados WHERE chave = ?', (chave,))
+            except sqlite3.Error:
+                pass
+            return None
+        with self._trava:
+            self._acessos[chave] = time.time()
+            pendentes = len(self._acessos)
+        if pendentes >= self.intervalo_acesso:
+            self._gravar_acessos()
+        return valor
+
+    def gravar(self, tipo, chave, valor):
+        dados = CODECS[tipo][0](valor)
+        try:
+            self._conexao().execute(
+                'INSERT OR REPLACE INTO resultados (chave, tipo, valor, tamanho, acesso) VALUES (?, ?, ?, ?, ?)',
+                (self._chave(tipo, chave), tipo, dados, len(dados), time.time())
+            )
+        except sqlite3.Error:
+            self._contar('erros')
+            return
+        self._gravar_acessos()
+        with self._trava:
+            self._gravacoes += 1
+            limpar = self._gravacoes % self.intervalo_limpeza == 0
+        if limpar:
+            self.descartar()
+
+    def obter(self, tipo, chave, calcular):
+        """Devolve o valor do disco para (tipo, chave), ou calcula, grava e devolve"""
+        valor = self.ler(tipo, chave)
+        if valor is not None:
+            self._contar('acertos')
+            return valor
+        self._contar('falhas')
+        valor = calcular()
+        self.gravar(tipo, chave, valor)
+        return valor
+
+    def descartar(self):
+        """Acima de tamanho_maximo, apaga os itens acessados há mais tempo; devolve quantos"""
+        alvo = int(self.tamanho_maximo * FRACAO_APOS_LIMPEZA)
+        # A ordem do LRU precisa dos acessos mais recentes
+        self._gravar_acessos(espera=True)
+        try:
+            conexao = self._conexao()
+            total = conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM resultados').fetchone()[0]
+            if total <= self.tamanho_maximo:
+                return 0
+            # Soma acumulada dos mais recentes: o que passa do alvo sai
+            cursor = conexao.execute("""
+                DELETE FROM resultados WHERE chave IN (
+                    SELECT chave FROM (
+                        SELECT chave, SUM(tamanho) OVER (ORDER BY acesso DESC, chave) AS acumulado
+                        FROM resultados
+                    ) WHERE acumulado > ?
+                )
+            """, (alvo,))
+        except sqlite3.Error:
+            self._contar('erros')
+            return 0
+        with self._trava:
+            self.descartes += cursor.rowcount
+        return cursor.rowcount
+
+    def tamanho(self):
+        """(itens, bytes) guardados; (0, 0) se o banco não puder ser lido"""
+        try:
+            return self._conexao().execute('SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM resultados').fetchone()
+        except sqlite3.Error:
+            self._contar('erros')
+            return 0, 0
+
+    def __len__(self):
+        return self.tamanho()[0]
+
+    def limpar(self):
+        """Apaga todos os itens; devolve False se o banco não pôde ser alterado"""
+        try:
+            self._conexao().execute('DELETE FROM resultados')
+        except sqlite3.Error:
+            self._contar('erros')
+            return False
+        return True
+
+    def fechar(self):
+        self._gravar_acessos(espera=True)
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def estatisticas(self):
+        itens, bytes_guardados = self.tamanho()
+        total = self.acertos + self.falhas
+        return {
+            'itens': itens,
+            'bytes': bytes_guardados,
+            'tamanho_maximo': self.tamanho_maximo,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'descartes': self.descartes,
+            'erros': self.erros,
+            'taxa_acerto': round(self.acertos / total * 100, 1) if total else 0.0
+        }
+
+
+def odds_abertura(inicio=1.5, fim=30.0):
+    """Odds de abertura mais comuns: a escada de ticks da bolsa entre inicio e fim"""
+    from analisador.tabela import escada_ticks
+
+    grade = escada_ticks(fim)
+    return grade[(grade >= inicio) & (grade <= fim)]
+
+
+def aquecer(analisador, unders_iniciais):
+    """Calcula curva, distribuição e janelas de entrada de cada odd (grava no disco)
+
+    analisador é um AnalisadorEmCache com disco; devolve quantas odds foram aquecidas.
+    """
+    for under_inicial in unders_iniciais:
+        under_inicial = float(under_inicial)
+        over_inicial = analisador.calcular_over_baseado_no_under(under_inicial)
+        curva = analisador.gerar_curva_equilibrio_90min(under_inicial, over_inicial)
+        analisador.analisar_distribuicao_queda(curva)
+        analisador.analisar_melhor_entrada_under(curva)
+        analisador.analisar_melhor_entrada_over(curva)
+    return len(unders_iniciais)
+
+
+def main(argv=None):
+    from analisador.cache import AnalisadorEmCache
+
+    parser = argparse.ArgumentParser(description='Cache persistente de resultados')
+    parser.add_argument('--caminho', default=ARQUIVO_PADRAO, help='arquivo SQLite do cache')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    aquecimento = subcomandos.add_parser('aquecer', help='pré-calcula as odds de abertura comuns')
+    aquecimento.add_argument('--inicio', type=float, default=1.5)
+    aquecimento.add_argument('--fim', type=float, default=30.0)
+    subcomandos.add_parser('estatisticas', help='itens e bytes guardados')
+    subcomandos.add_parser('limpar', help='apaga todos os itens')
+    args = parser.parse_args(argv)
+
+    disco = CacheDisco(args.caminho)
+    if args.comando == 'aquecer':
+        inicio = time.perf_counter()
+        quantidade = aquecer(AnalisadorEmCache(disco=disco), odds_abertura(args.inicio, args.fim))
+        itens, bytes_guardados = disco.tamanho()
+        print(f"🔥 {quantidade} odds aquecidas em {time.perf_counter() - inicio:.1f} s "
+              f"({itens} itens, {bytes_guardados / 1024:.0f} KB em {args.caminho})")
+    elif args.comando == 'estatisticas':
+        itens, bytes_guardados = disco.tamanho()
+        print(f"📦 {itens} itens, {bytes_guardados / 1024:.0f} KB em {args.caminho}")
+    elif args.comando == 'limpar':
+        if disco.limpar():
+            print(f"🧹 Cache {args.caminho} limpo")
+        else:
+            print(f"❌ Não foi possível limpar {args.caminho}")
+    disco.fechar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Calibração dos multiplicadores do Under final e das velocidades por período
+
+Ajusta os parâmetros de analisador.parametros a históricos reais do
+ArmazemTicks. A perda é o erro quadrático médio entre o log da curva
+prevista e o log do último under observado em cada (partida, minuto);
+para cada conjunto de parâmetros ela é avaliada com uma única chamada
+vetorizada (alguns milissegundos para uma temporada inteira).
+
+A busca (aleatória ou em grade) roda num pool de processos e grava o
+melhor conjunto num arquivo versionado, lido pelo analisador na
+inicialização:
+
+    python -m analisador.calibracao dados/historico --candidatos 2000
+"""
+import argparse
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analisador.historico import ArmazemTicks
+from analisador.lote import calcular_under_final_lote, curvas_continuas_lote
+from analisador.parametros import ARQUIVO_PADRAO, PARAMETROS_PADRAO, salvar_parametros
+
+DadosCalibracao = namedtuple('DadosCalibracao', 'unders linha coluna log_observado')
+DadosCalibracao.__doc__ = """Observações prontas para a perda vetorizada
+
+unders: under_inicial distintos; cada observação k compara a curva
+unders[linha[k]] no minuto coluna[k] + 1 com exp(log_observado[k]).
+"""
+
+
+def preparar_dados(temporada):
+    """Reduz uma Temporada ao último under observado por (partida, minuto)"""
+    ticks = temporada.ticks
+    partida = np.repeat(np.arange(len(temporada.ids)), np.diff(temporada.inicio))
+    coluna = np.clip(ticks['minuto'].astype(np.int64), 1, 90) - 1
+    chave = partida * 90 + coluna
+
+    # Ticks estão em ordem: a última ocorrência de cada chave é a mais recente
+    _, ultimos = np.unique(chave[::-1], return_index=True)
+    ultimos = chave.shape[0] - 1 - ultimos
+    observado = ticks['under'][ultimos].astype(np.float64)
+    validos = observado > 1.0
+
+    unders, linha_partida = np.unique(temporada.under_inicial, return_inverse=True)
+    return DadosCalibracao(
+        unders=unders,
+        linha=linha_partida[partida[ultimos][validos]],
+        coluna=coluna[ultimos][validos],
+        log_observado=np.log(observado[validos])
+    )
+
+
+def avaliar(dados, parametros):
+    """Perda (EQM em log-odds) de um conjunto de parâmetros"""
+    finais = calcular_under_final_lote(dados.unders, parametros)
+    curvas = curvas_continuas_lote(dados.unders, finais, parametros)
+    previsto = np.log(curvas[dados.linha, dados.coluna])
+    return float(np.mean((previsto - dados.log_observado) ** 2))
+
+
+def _normalizar_velocidades(velocidades, soma):
+    velocidades = np.asarray(velocidades, dtype=np.float64)
+    return tuple(float(v) for v in velocidades / velocidades.sum() * soma)
+
+
+def candidatos_aleatorios(base=PARAMETROS_PADRAO, quantidade=500, semente=0, escala=0.2):
+    """Perturbações log-normais dos multiplicadores, pisos e velocidades"""
+    gerador = np.random.default_rng(semente)
+    soma = sum(base.velocidades)
+    candidatos = [base]
+    for _ in range(quantidade - 1):
+        faixas = tuple(
+            (limite,
+             float(multiplicador * np.exp(gerador.normal(0, escala))),
+             float(max(1.01, piso * np.exp(gerador.normal(0, escala / 10)))))
+            for limite, multiplicador, piso in base.faixas_under_final
+        )
+        multiplicador, piso = base.faixa_padrao
+        faixa_padrao = (float(multiplicador * np.exp(gerador.normal(0, escala))),
+                        float(max(1.01, piso * np.exp(gerador.normal(0, escala / 10)))))
+        velocidades = np.array(base.velocidades) * np.exp(gerador.normal(0, escala, len(base.velocidades)))
+        candidatos.append(base._replace(
+            faixas_under_final=faixas,
+            faixa_padrao=faixa_padrao,
+            velocidades=_normalizar_velocidades(velocidades, soma)
+        ))
+    return candidatos
+
+
+def candidatos_grade(base=PARAMETROS_PADRAO, fatores=np.linspace(0.7, 1.3, 13), inclinacoes=np.linspace(-1, 1, 9)):
+    """Grade: fator comum nos multiplicadores × inclinação das velocidades
+
+    Inclinação positiva desloca a queda para o fim do jogo, negativa para
+    o começo.
+    """
+    soma = sum(base.velocidades)
+    posicoes = np.linspace(-1, 1, len(base.velocidades))
+    candidatos = []
+    for fator in fatores:
+        faixas = tuple((limite, float(m * fator), piso) for limite, m, piso in base.faixas_under_final)
+        faixa_padrao = (float(base.faixa_padrao[0] * fator), base.faixa_padrao[1])
+        for inclinacao in inclinacoes:
+            velocidades = np.array(base.velocidades) * np.exp(inclinacao * posicoes)
+            candidatos.append(base._replace(
+                faixas_under_final=faixas,
+                faixa_padrao=faixa_padrao,
+                velocidades=_normalizar_velocidades(velocidades, soma)
+            ))
+    return candidatos
+
+
+_DADOS = None
+
+
+def _iniciar_processo(dados):
+    global _DADOS
+    _DADOS = dados
+
+
+def _avaliar_bloco(candidatos):
+    return [avaliar(_DADOS, parametros) for parametros in candidatos]
+
+
+def buscar(dados, candidatos, processos=None, tamanho_bloco=32):
+    """Avalia todos os candidatos (em paralelo); devolve (melhor, perdas)"""
+    blocos = [candidatos[i:i + tamanho_bloco] for i in range(0, len(candidatos), tamanho_bloco)]
+    if processos == 1 or len(blocos) <= 1:
+        _iniciar_processo(dados)
+        perdas = [p for bloco in blocos for p in _avaliar_bloco(bloco)]
+    else:
+        with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo, initargs=(dados,)) as pool:
+            perdas = [p for parcial in pool.map(_avaliar_bloco, blocos) for p in parcial]
+    perdas = np.array(perdas)
+    # argmin devolve o primeiro mínimo: resultado determinístico
+    return candidatos[int(np.argmin(perdas))], perdas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibração dos parâmetros do modelo de curvas')
+    parser.add_argument('raiz', help='diretório do ArmazemTicks')
+    parser.add_argument('--temporada', default=None)
+    parser.add_argument('--modo', choices=['aleatorio', 'grade'], default='aleatorio')
+    parser.add_argument('--candidatos', type=int, default=500)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--saida', default=ARQUIVO_PADRAO)
+    args = parser.parse_args(argv)
+
+    dados = preparar_dados(ArmazemTicks(args.raiz).carregar_temporada(args.temporada))
+    if args.modo == 'grade':
+        candidatos = candidatos_grade()
+    else:
+        candidatos = candidatos_aleatorios(quantidade=args.candidatos, semente=args.semente)
+
+    inicio = time.perf_counter()
+    melhor, perdas = buscar(dados, candidatos, args.processos)
+    decorrido = time.perf_counter() - inicio
+
+    perda_base = avaliar(dados, PARAMETROS_PADRAO)
+    salvo = salvar_parametros(
+        melhor, args.saida,
+        perda=float(perdas.min()),
+        perda_padrao=perda_base,
+        observacoes=int(dados.linha.shape[0]),
+        criado_em=time.strftime('%Y-%m-%dT%H:%M:%S')
+    )
+    print(f"📊 {len(candidatos)} candidatos em {decorrido:.2f}s ({decorrido / len(candidatos) * 1000:.1f} ms cada)")
+    print(f"Perda padrão: {perda_base:.6f} → calibrada: {perdas.min():.6f}")
+    print(f"✅ Parâmetros versão {salvo.versao} gravados em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
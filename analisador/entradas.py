@@ -0,0 +1,167 @@
+"""Varredura vetorizada de janelas de entrada sobre matrizes de curvas
+
+Uma EstrategiaEntrada descreve onde procurar entradas:
+  * a série ('under' ou 'over');
+  * os inícios range(inicio, fim, passo) e a janela (minutos até a saída);
+  * os limites das odds de entrada e de saída e a queda mínima;
+  * como ordenar as entradas ('queda' ou 'minuto') e quantas manter (k).
+
+varrer_entradas avalia uma estratégia sobre uma matriz (N, T) de curvas
+de uma vez. As janelas são views de sliding_window_view, sem cópia, e o
+top-k de cada curva sai de um argpartition (seleção parcial) mais a
+ordenação só dos k escolhidos. A chave de ordenação é inteira (queda
+arredondada em décimos, desempatada pelo minuto mais cedo), então o
+resultado é idêntico ao do sorted() estável dos scanners originais.
+
+ESTRATEGIA_UNDER e ESTRATEGIA_OVER são as regras de
+analisar_melhor_entrada_under/over. varrer_estrategias percorre várias
+estratégias reaproveitando as janelas de mesma geometria, e
+grade_estrategias monta o produto de janelas, passos e limiares.
+"""
+import itertools
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analisador.lote import arredondar
+
+EstrategiaEntrada = namedtuple(
+    'EstrategiaEntrada',
+    'serie inicio fim passo janela limiar entrada_minima entrada_maxima saida_minima inclusivo ordem k',
+    defaults=(None, None, None, None, False, 'queda', 3)
+)
+EstrategiaEntrada.__doc__ = """Regras de uma varredura de entradas
+
+serie: 'under' ou 'over'; inícios (índices 0-based) em range(inicio, fim, passo)
+janela: minutos entre a entrada e a saída (0 = só a odd de entrada)
+limiar: queda mínima em % entre entrada e saída (None = sem exigência)
+entrada_minima/entrada_maxima/saida_minima: limites das odds (None = livre)
+inclusivo: limites com <= (True) ou estritos (False); o limiar é sempre >=
+ordem: 'queda' (maior queda primeiro) ou 'minuto'; k: entradas por curva
+"""
+
+ORDENS = ('queda', 'minuto')
+
+# Regras de analisar_melhor_entrada_under: janela de 15 minutos a cada 5,
+# do minuto 11 ao 66, entrada > 1.30, saída > 1.10 e queda >= 8%
+ESTRATEGIA_UNDER = EstrategiaEntrada(
+    'under', 10, 70, 5, 15, limiar=8, entrada_minima=1.30, saida_minima=1.10
+)
+
+# Regras de analisar_melhor_entrada_over: a cada 3 minutos do 66 ao 84,
+# odd entre 1.8 e 12.0, as três primeiras
+ESTRATEGIA_OVER = EstrategiaEntrada(
+    'over', 65, 85, 3, 0, entrada_minima=1.8, entrada_maxima=12.0, inclusivo=True, ordem='minuto'
+)
+
+
+def _dentro(valores, minimo, maximo, inclusivo):
+    valido = np.ones(valores.shape, dtype=bool)
+    if minimo is not None:
+        valido &= valores >= minimo if inclusivo else valores > minimo
+    if maximo is not None:
+        valido &= valores <= maximo if inclusivo else valores < maximo
+    return valido
+
+
+def _janelas(curvas, estrategia):
+    """(entrada, saída, índices de início) da geometria da estratégia, como views"""
+    largura = estrategia.janela + 1
+    if curvas.shape[1] < largura:
+        vazio = np.empty((curvas.shape[0], 0))
+        return vazio, vazio, np.empty(0, dtype=np.int64)
+    janelas = sliding_window_view(curvas, largura, axis=1)[:, estrategia.inicio:estrategia.fim:estrategia.passo]
+    indices = np.arange(curvas.shape[1] - estrategia.janela)[estrategia.inicio:estrategia.fim:estrategia.passo]
+    return janelas[..., 0], janelas[..., -1], indices
+
+
+def _top_k(chave, k):
+    """Posições das k maiores chaves de cada linha, em ordem decrescente"""
+    posicoes = chave.shape[1]
+    if k < posicoes:
+        escolhidas = np.argpartition(chave, posicoes - k, axis=1)[:, posicoes - k:]
+    else:
+        escolhidas = np.broadcast_to(np.arange(posicoes), chave.shape)
+    # Decrescente sem negar a chave (o mínimo de int64 das inválidas não tem negativo)
+    ordem = np.argsort(np.take_along_axis(chave, escolhidas, axis=1), axis=1)[:, ::-1]
+    return np.take_along_axis(escolhidas, ordem, axis=1)
+
+
+def varrer_entradas(curvas, estrategia, _geometria=None):
+    """Top-k entradas de cada curva de uma matriz (N, T)
+
+    Devolve dict de arrays (N, k): 'minuto' (1-based, 0 onde não há
+    entrada), 'odd_entrada', 'odd_saida', 'queda_percent' (arredondada) e
+    'queda'; mais 'quantidade' (N,) de entradas válidas por curva. As
+    entradas válidas vêm primeiro em cada linha.
+    """
+    if estrategia.ordem not in ORDENS:
+        raise ValueError(f"ordem deve ser uma de: {', '.join(ORDENS)}")
+    curvas = np.atleast_2d(np.asarray(curvas, dtype=np.float64))
+    entrada, saida, indices = _geometria or _janelas(curvas, estrategia)
+
+    queda = (entrada - saida) / entrada * 100
+    queda_percent = arredondar(queda, 1)
+    valido = _dentro(entrada, estrategia.entrada_minima, estrategia.entrada_maxima, estrategia.inclusivo)
+    valido &= _dentro(saida, estrategia.saida_minima, None, estrategia.inclusivo)
+    if estrategia.limiar is not None:
+        valido &= queda >= estrategia.limiar
+
+    # Chave inteira única: décimos de queda e, no empate, o minuto mais cedo
+    posicoes = indices.shape[0]
+    cedo = posicoes - 1 - np.arange(posicoes)
+    if estrategia.ordem == 'queda':
+        chave = np.rint(queda_percent * 10).astype(np.int64) * posicoes + cedo
+    else:
+        chave = np.broadcast_to(cedo, valido.shape).astype(np.int64)
+    chave = np.where(valido, chave, np.iinfo(np.int64).min)
+
+    k = min(estrategia.k, posicoes)
+    escolhidas = _top_k(chave, k) if k > 0 else np.empty((curvas.shape[0], 0), dtype=np.int64)
+    selecionado = np.take_along_axis(valido, escolhidas, axis=1)
+
+    def tomar(valores):
+        return np.take_along_axis(valores, escolhidas, axis=1)
+
+    return {
+        'minuto': np.where(selecionado, indices[escolhidas] + 1, 0),
+        'odd_entrada': tomar(entrada),
+        'odd_saida': tomar(saida),
+        'queda_percent': tomar(queda_percent),
+        'queda': tomar(queda),
+        'quantidade': selecionado.sum(axis=1)
+    }
+
+
+def varrer_estrategias(curvas_por_serie, estrategias):
+    """varrer_entradas para cada estratégia, reaproveitando as janelas de mesma geometria
+
+    curvas_por_serie: {'under': (N, T), 'over': (N, T)}; devolve a lista de resultados.
+    """
+    geometrias = {}
+    resultados = []
+    for estrategia in estrategias:
+        curvas = np.atleast_2d(np.asarray(curvas_por_serie[estrategia.serie], dtype=np.float64))
+        chave = (estrategia.serie, estrategia.inicio, estrategia.fim, estrategia.passo, estrategia.janela)
+        if chave not in geometrias:
+            geometrias[chave] = _janelas(curvas, estrategia)
+        resultados.append(varrer_entradas(curvas, estrategia, geometrias[chave]))
+    return resultados
+
+
+def grade_estrategias(base=ESTRATEGIA_UNDER, janelas=(15,), passos=(5,), limiares=(8,)):
+    """Estratégias do produto janelas x passos x limiares sobre uma base"""
+    return [
+        base._replace(janela=janela, passo=passo, limiar=limiar)
+        for janela, passo, limiar in itertools.product(janelas, passos, limiares)
+    ]
+
+
+def entradas_da_curva(resultado, linha=0):
+    """Entradas válidas de uma curva do resultado, como lista de dicts"""
+    quantidade = int(resultado['quantidade'][linha])
+    return [
+        {campo: resultado[campo][linha, i].item() for campo in ('minuto', 'odd_entrada', 'odd_saida', 'queda_percent', 'queda')}
+        for i in range(quantidade)
+    ]
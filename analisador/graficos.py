@@ -0,0 +1,224 @@
+"""Camada de gráfico de várias partidas, reduzida e incremental
+
+Um gráfico com a curva esperada, os ticks reais e as faixas de confiança
+de dezenas de partidas cresce sem limite conforme os ticks chegam, e
+reenviar tudo a cada tick pesa no navegador. GraficoPartidas mantém:
+
+  * um orçamento fixo de pontos por série (pontos): curvas esperadas e
+    faixas, que são estáticas, passam por lttb() uma vez;
+  * os ticks reais passam por AmostradorLTTB, a versão incremental do
+    LTTB (Largest-Triangle-Three-Buckets) em baldes de tempo fixos sobre
+    os 90 minutos. Um balde só é emitido quando o seguinte fecha, então
+    o ponto escolhido nunca muda depois de enviado, e a série fica com
+    no máximo pontos + 2 pontos, qualquer que seja o número de ticks;
+  * uma fila de linhas novas no formato longo (minuto, valor, serie):
+    novas_linhas() devolve só o que mudou desde a última chamada (para
+    quem anexa pontos, como o fragmento ao vivo do app),
+    e historico() tudo o que já foi emitido, para redesenhar. Em ambos os
+    casos o tamanho enviado é limitado pelo orçamento, não pelos ticks.
+
+O preço do orçamento fixo é um atraso de até dois baldes (com 180 pontos,
+um minuto de jogo) entre o tick e o ponto no gráfico. Ticks fora dos 90
+minutos (acréscimos) caem no primeiro ou no último balde, então o limite
+vale para qualquer minuto.
+"""
+import math
+
+import numpy as np
+
+from analisador.lote import MINUTOS
+
+PONTOS = 180
+DURACAO = 90
+
+
+def lttb(x, y, pontos):
+    """Índices dos pontos escolhidos pelo LTTB (sempre inclui o primeiro e o último)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+
+    passo = (n - 2) / (pontos - 2)
+    escolhidos = np.empty(pontos, dtype=np.int64)
+    escolhidos[0] = 0
+    escolhidos[-1] = n - 1
+    anterior = 0
+    for balde in range(pontos - 2):
+        inicio = int(balde * passo) + 1
+        fim = int((balde + 1) * passo) + 1
+        proximo_fim = min(int((balde + 2) * passo) + 1, n)
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        # Área do triângulo (anterior, candidato, média do próximo balde), sem o fator 1/2
+        area = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                      - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+class AmostradorLTTB:
+    """LTTB incremental de uma série em baldes de tempo fixos
+
+    adicionar() devolve os pontos (x, y) que ficaram definitivos com o
+    novo valor; finalizar() devolve o que falta (último balde e último
+    ponto) quando a série acaba.
+    """
+
+    __slots__ = ('largura', 'inicio', 'ultimo_balde', '_anterior', '_pendente', '_atual', '_balde')
+
+    def __init__(self, pontos=PONTOS, inicio=0.0, fim=DURACAO):
+        self.largura = (fim - inicio) / pontos
+        self.inicio = inicio
+        self.ultimo_balde = pontos - 1
+        self._anterior = None
+        self._pendente = None
+        self._atual = []
+        self._balde = -1
+
+    def _escolher(self, candidatos, media_x, media_y):
+        ax, ay = self._anterior
+        melhor = max(candidatos, key=lambda p: abs((ax - media_x) * (p[1] - ay) - (ax - p[0]) * (media_y - ay)))
+        self._anterior = melhor
+        return melhor
+
+    def _balde_de(self, x):
+        """Balde do minuto x; antes do início ou depois do fim, o primeiro ou o último"""
+        return min(max(math.floor((x - self.inicio) / self.largura), 0), self.ultimo_balde)
+
+    def adicionar(self, x, y):
+        if self._anterior is None:
+            # O primeiro ponto sempre fica
+            self._anterior = (x, y)
+            self._balde = self._balde_de(x)
+            return [(x, y)]
+
+        emitidos = []
+        balde = self._balde_de(x)
+        if balde > self._balde and self._atual:
+            # O balde atual fechou: o pendente já tem a média do seguinte
+            if self._pendente is not None:
+                media_x = sum(p[0] for p in self._atual) / len(self._atual)
+                media_y = sum(p[1] for p in self._atual) / len(self._atual)
+                emitidos.append(self._escolher(self._pendente, media_x, media_y))
+            self._pendente = self._atual
+            self._atual = []
+        self._balde = max(balde, self._balde)
+        self._atual.append((x, y))
+        return emitidos
+
+    def finalizar(self):
+        emitidos = []
+        ultimo = self._atual[-1] if self._atual else None
+        if self._pendente is not None:
+            proximo = ultimo if ultimo is not None else self._pendente[-1]
+            emitidos.append(self._escolher(self._pendente, *proximo))
+        if ultimo is not None:
+            emitidos.append(ultimo)
+        self._pendente = None
+        self._atual = []
+        return emitidos
+
+
+class GraficoPartidas:
+    """Curva esperada, faixas e ticks de várias partidas num só gráfico
+
+    As séries se chamam '<partida> · esperado', '<partida> · ticks' e
+    '<partida> · <faixa>'. Linhas no formato longo: dict com 'minuto',
+    'valor' e 'serie'.
+    """
+
+    def __init__(self, pontos=PONTOS):
+        self.pontos = pontos
+        self._amostradores = {}
+        self._series = {}
+        self._linhas = []
+        self._enviadas = 0
+        self.ticks_recebidos = 0
+
+    def __len__(self):
+        return len(self._amostradores)
+
+    def __contains__(self, id_partida):
+        return id_partida in self._amostradores
+
+    def partidas(self):
+        """Partidas com séries no gráfico, inclusive as já encerradas"""
+        return list(self._series)
+
+    def _emitir(self, serie, minutos, valores):
+        self._linhas.extend((float(minuto), float(valor), serie) for minuto, valor in zip(minutos, valores))
+
+    def _serie_ticks(self, id_partida):
+        return f'{id_partida} · ticks'
+
+    def adicionar_partida(self, id_partida, esperado, faixas=None, minutos=MINUTOS):
+        """Começa a acompanhar uma partida: curva esperada e faixas {nome: valores} entram reduzidas"""
+        series = self._series.setdefault(id_partida, {self._serie_ticks(id_partida)})
+        for nome, valores in [('esperado', esperado)] + list((faixas or {}).items()):
+            valores = np.asarray(valores, dtype=np.float64)
+            indices = lttb(minutos, valores, self.pontos)
+            series.add(f'{id_partida} · {nome}')
+            self._emitir(f'{id_partida} · {nome}', np.asarray(minutos)[indices], valores[indices])
+        self._amostradores[id_partida] = AmostradorLTTB(self.pontos)
+
+    def registrar_ticks(self, ids_partidas, minutos, unders):
+        """Passa ticks (partida, minuto, under) pelos amostradores; partidas desconhecidas são ignoradas"""
+        for id_partida, minuto, under in zip(ids_partidas, minutos, unders):
+            amostrador = self._amostradores.get(id_partida)
+            if amostrador is None:
+                continue
+            self.ticks_recebidos += 1
+            for x, y in amostrador.adicionar(float(minuto), float(under)):
+                self._linhas.append((x, y, self._serie_ticks(id_partida)))
+
+    def registrar_tick(self, id_partida, minuto, under):
+        self.registrar_ticks((id_partida,), (minuto,), (under,))
+
+    def encerrar_partida(self, id_partida):
+        """Emite o fim da série de ticks e para de acompanhar a partida"""
+        amostrador = self._amostradores.pop(id_partida, None)
+        if amostrador is not None:
+            for x, y in amostrador.finalizar():
+                self._linhas.append((x, y, self._serie_ticks(id_partida)))
+
+    def remover_partida(self, id_partida):
+        """Tira a partida do gráfico: para de acompanhá-la e apaga as linhas já emitidas
+
+        Devolve os nomes das séries removidas (vazio se a partida não estava
+        no gráfico), para quem guarda as linhas já enviadas apagar as suas.
+        """
+        self._amostradores.pop(id_partida, None)
+        series = self._series.pop(id_partida, set())
+        if series:
+            enviadas = sum(1 for linha in self._linhas[:self._enviadas] if linha[2] not in series)
+            self._linhas = [linha for linha in self._linhas if linha[2] not in series]
+            self._enviadas = enviadas
+        return series
+
+    def _como_colunas(self, linhas):
+        return {
+            'minuto': [linha[0] for linha in linhas],
+            'valor': [linha[1] for linha in linhas],
+            'serie': [linha[2] for linha in linhas]
+        }
+
+    def novas_linhas(self):
+        """Linhas emitidas desde a última chamada (para anexar ao que já foi desenhado)"""
+        novas = self._linhas[self._enviadas:]
+        self._enviadas = len(self._linhas)
+        return self._como_colunas(novas)
+
+    def historico(self):
+        """Todas as linhas já emitidas (para desenhar o gráfico do zero)"""
+        self._enviadas = len(self._linhas)
+        return self._como_colunas(self._linhas)
+
+    def estatisticas(self):
+        return {
+            'partidas': len(self._amostradores),
+            'pontos': len(self._linhas),
+            'ticks_recebidos': self.ticks_recebidos
+        }
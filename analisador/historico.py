@@ -0,0 +1,211 @@
+"""Armazém colunar de históricos de ticks, mapeado em memória
+
+Layout em disco (tudo somente-anexação):
+    raiz/indice.csv            id_partida,temporada,under_inicial
+    raiz/partidas/<id>.ticks   registros TICK brutos, em ordem de minuto
+
+Cada partida é um array estruturado NumPy gravado direto no arquivo; a
+leitura usa np.memmap, então ticks() e intervalo() devolvem visões sem
+cópia. intervalo() e o backtest fazem busca binária no minuto, então a
+ordem é garantida na gravação: cada bloco anexado é ordenado por
+(minuto, instante), e um bloco que começa antes do último minuto já
+gravado é recusado (em descarregar(), os ticks atrasados são descartados
+e contados). carregar_temporada() junta todas as partidas de uma temporada num
+único array pré-alocado, sem passar por dicts Python por tick.
+"""
+import csv
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+TICK = np.dtype([
+    ('instante', '<f8'),   # segundos desde o início da partida
+    ('minuto', '<f4'),
+    ('under', '<f4'),
+    ('over', '<f4'),
+])
+
+ARQUIVO_INDICE = 'indice.csv'
+EXTENSAO = '.ticks'
+
+_ID_VALIDO = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+Temporada = namedtuple('Temporada', 'ids under_inicial inicio ticks')
+Temporada.__doc__ = """Temporada carregada em bloco
+
+ids e under_inicial têm uma posição por partida; os ticks da partida i
+são ticks[inicio[i]:inicio[i + 1]].
+"""
+
+
+class ArmazemTicks:
+    """Histórico de ticks por partida, em arquivos binários colunares"""
+
+    def __init__(self, raiz):
+        self.raiz = raiz
+        self._dir_partidas = os.path.join(raiz, 'partidas')
+        os.makedirs(self._dir_partidas, exist_ok=True)
+        self._indice = {}
+        self._pendentes = {}
+        self.descartados = 0
+        self._ler_indice()
+
+    def _ler_indice(self):
+        caminho = os.path.join(self.raiz, ARQUIVO_INDICE)
+        if not os.path.exists(caminho):
+            return
+        with open(caminho, newline='') as arquivo:
+            for id_partida, temporada, under_inicial in csv.reader(arquivo):
+                self._indice[id_partida] = (temporada, float(under_inicial))
+
+    def _caminho(self, id_partida):
+        return os.path.join(self._dir_partidas, id_partida + EXTENSAO)
+
+    def __contains__(self, id_partida):
+        return id_partida in self._indice
+
+    def __len__(self):
+        return len(self._indice)
+
+    def registrar_partida(self, id_partida, under_inicial, temporada=''):
+        """Inclui a partida no índice (uma vez por partida)"""
+        id_partida = str(id_partida)
+        if not _ID_VALIDO.match(id_partida):
+            raise ValueError(f"id_partida inválido para o armazém: {id_partida!r}")
+        if id_partida in self._indice:
+            return
+        with open(os.path.join(self.raiz, ARQUIVO_INDICE), 'a', newline='') as arquivo:
+            csv.writer(arquivo).writerow((id_partida, temporada, repr(float(under_inicial))))
+        self._indice[id_partida] = (temporada, float(under_inicial))
+
+    def under_inicial(self, id_partida):
+        return self._indice[id_partida][1]
+
+    def partidas(self, temporada=None):
+        return [id_partida for id_partida, (t, _) in self._indice.items() if temporada is None or t == temporada]
+
+    def _ultimo_minuto(self, id_partida):
+        """Minuto do último tick gravado da partida (-inf se não houver)"""
+        caminho = self._caminho(id_partida)
+        registros = os.path.getsize(caminho) // TICK.itemsize if os.path.exists(caminho) else 0
+        if not registros:
+            return -np.inf
+        with open(caminho, 'rb') as arquivo:
+            arquivo.seek((registros - 1) * TICK.itemsize)
+            return float(np.frombuffer(arquivo.read(TICK.itemsize), dtype=TICK)['minuto'][0])
+
+    def anexar(self, id_partida, ticks):
+        """Anexa ticks (array TICK, ou qualquer array com esses campos)
+
+        O bloco é gravado em ordem de (minuto, instante); ValueError se ele
+        começa antes do último minuto já gravado da partida.
+        """
+        if id_partida not in self._indice:
+            raise KeyError(f"Partida não registrada: {id_partida}")
+        ticks = np.asarray(ticks)
+        if ticks.dtype != TICK:
+            convertido = np.zeros(ticks.shape[0], dtype=TICK)
+            for campo in TICK.names:
+                if campo in ticks.dtype.names:
+                    convertido[campo] = ticks[campo]
+            ticks = convertido
+        if not ticks.shape[0]:
+            return
+        ticks = ticks[np.lexsort((ticks['instante'], ticks['minuto']))]
+        ultimo = self._ultimo_minuto(id_partida)
+        if ticks['minuto'][0] < ultimo:
+            raise ValueError(
+                f"Ticks fora de ordem para {id_partida}: minuto {ticks['minuto'][0]:g} "
+                f"antes do último gravado ({ultimo:g})"
+            )
+        with open(self._caminho(id_partida), 'ab') as arquivo:
+            arquivo.write(np.ascontiguousarray(ticks).tobytes())
+
+    def anexar_tick(self, id_partida, minuto, under, over, instante=None):
+        """Acumula um tick em memória; descarregar() grava os pendentes"""
+        if instante is None:
+            instante = (minuto - 1) * 60.0
+        self._pendentes.setdefault(id_partida, []).append((instante, minuto, under, over))
+
+    def descarregar(self):
+        """Grava todos os ticks acumulados por anexar_tick(); devolve quantos foram gravados
+
+        Os pendentes de cada partida são ordenados; os que ficaram antes do
+        último minuto já gravado são descartados e contados em descartados.
+        """
+        pendentes, self._pendentes = self._pendentes, {}
+        gravados = 0
+        for id_partida, linhas in pendentes.items():
+            ticks = np.array(linhas, dtype=TICK)
+            atrasados = ticks['minuto'] < self._ultimo_minuto(id_partida)
+            if atrasados.any():
+                self.descartados += int(atrasados.sum())
+                ticks = ticks[~atrasados]
+            self.anexar(id_partida, ticks)
+            gravados += ticks.shape[0]
+        return gravados
+
+    def ouvinte_monitor(self, estado):
+        """Ouvinte para MonitorPartidas.adicionar_ouvinte: registra cada tick"""
+        if estado.id_partida not in self._indice:
+            self.registrar_partida(estado.id_partida, estado.under_inicial)
+        self.anexar_tick(estado.id_partida, estado.minuto, estado.under_atual, estado.over_atual)
+
+    def ticks(self, id_partida):
+        """Todos os ticks da partida: visão somente leitura mapeada em memória"""
+        caminho = self._caminho(id_partida)
+        if id_partida not in self._indice:
+            raise KeyError(f"Partida não registrada: {id_partida}")
+        if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+            return np.zeros(0, dtype=TICK)
+        return np.memmap(caminho, dtype=TICK, mode='r')
+
+    def intervalo(self, id_partida, minuto_inicio, minuto_fim):
+        """Ticks com minuto_inicio <= minuto <= minuto_fim, sem cópia"""
+        ticks = self.ticks(id_partida)
+        minutos = ticks['minuto']
+        inicio = np.searchsorted(minutos, minuto_inicio, side='left')
+        fim = np.searchsorted(minutos, minuto_fim, side='right')
+        return ticks[inicio:fim]
+
+    def carregar_temporada(self, temporada=None):
+        """Carrega todas as partidas (de uma temporada) num único array"""
+        ids = self.partidas(temporada)
+        tamanhos = np.array([
+            os.path.getsize(self._caminho(i)) // TICK.itemsize if os.path.exists(self._caminho(i)) else 0
+            for i in ids
+        ], dtype=np.int64)
+        inicio = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(tamanhos, out=inicio[1:])
+
+        ticks = np.empty(int(inicio[-1]), dtype=TICK)
+        for posicao, id_partida in enumerate(ids):
+            if tamanhos[posicao]:
+                with open(self._caminho(id_partida), 'rb') as arquivo:
+                    arquivo.readinto(ticks[inicio[posicao]:inicio[posicao + 1]])
+
+        return Temporada(
+            ids=np.array(ids),
+            under_inicial=np.array([self._indice[i][1] for i in ids]),
+            inicio=inicio,
+            ticks=ticks
+        )
+
+
+def importar_replay(armazem, caminho, temporada=''):
+    """Importa um arquivo no formato de analisador.ingestao para o armazém
+
+    O primeiro under de cada partida é registrado como under_inicial.
+    """
+    linhas = {}
+    with open(caminho, newline='') as arquivo:
+        leitor = csv.reader(arquivo)
+        next(leitor, None)
+        for instante, id_partida, minuto, under, over in leitor:
+            linhas.setdefault(id_partida, []).append((float(instante), float(minuto), float(under), float(over)))
+    for id_partida, ticks in linhas.items():
+        armazem.registrar_partida(id_partida, ticks[0][2], temporada)
+        armazem.anexar(id_partida, np.array(ticks, dtype=TICK))
+    return len(linhas)
@@ -0,0 +1,333 @@
+"""Ingestão assíncrona (asyncio) de fluxos de odds ao vivo
+
+Uma FonteTicks produz ticks (instante, id_partida, minuto, under, over);
+o IngestorTicks os coloca numa fila limitada (contrapressão: a fonte
+espera quando a fila enche), drena todos os ticks disponíveis a cada
+iteração do loop e os entrega em lote ao MonitorPartidas.
+
+Fontes incluídas, para testes sem rede externa:
+  * FonteReplay: lê um arquivo CSV gravado, na velocidade desejada;
+  * FonteSocket: servidor TCP local que recebe linhas CSV
+    (enviar_arquivo() reproduz um arquivo gravado contra ele).
+
+Formato CSV: instante,id_partida,minuto,under,over
+(instante em segundos desde o início da gravação). Linhas malformadas
+são descartadas e contadas (descartados no resumo), sem interromper a
+fonte nem derrubar a conexão.
+
+    python -m analisador.ingestao replay gravacao.csv --velocidade 10
+    python -m analisador.ingestao sintetico gravacao.csv --partidas 300
+"""
+import argparse
+import asyncio
+import csv
+import math
+import random
+import time
+from collections import namedtuple
+
+from analisador.lote import gerar_curvas_lote
+from analisador.monitor import MonitorPartidas
+
+Tick = namedtuple('Tick', 'instante id_partida minuto under over')
+
+CABECALHO = ('instante', 'id_partida', 'minuto', 'under', 'over')
+
+# Quanto FonteSocket.fechar() espera os clientes terminarem de enviar
+TEMPO_FECHAR = 1.0
+
+
+def ler_tick(campos):
+    """Tick de uma linha já separada em campos; ValueError se malformada"""
+    instante, id_partida, minuto, under, over = campos
+    tick = Tick(float(instante), id_partida, int(minuto), float(under), float(over))
+    if not all(math.isfinite(valor) for valor in (tick.instante, tick.under, tick.over)):
+        raise ValueError('valores devem ser finitos')
+    return tick
+
+
+class FonteTicks:
+    """Interface de fonte: ticks() é um gerador assíncrono de Tick
+
+    descartados conta as linhas malformadas que a fonte pulou.
+    """
+
+    descartados = 0
+
+    async def ticks(self):
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def _ler(self, campos):
+        """Tick dos campos, ou None (e conta o descarte) se a linha for malformada"""
+        try:
+            return ler_tick(campos)
+        except ValueError:
+            self.descartados += 1
+            return None
+
+
+class FonteReplay(FonteTicks):
+    """Reproduz um arquivo gravado
+
+    velocidade=1 respeita os instantes gravados, 10 é dez vezes mais rápido
+    e 0 (ou None) reproduz o mais rápido possível.
+    """
+
+    def __init__(self, caminho, velocidade=1.0):
+        self.caminho = caminho
+        self.velocidade = velocidade
+
+    async def ticks(self):
+        inicio = time.monotonic()
+        with open(self.caminho, newline='') as arquivo:
+            leitor = csv.reader(arquivo)
+            next(leitor, None)
+            for i, campos in enumerate(leitor):
+                tick = self._ler(campos)
+                if tick is None:
+                    continue
+                if self.velocidade:
+                    atraso = tick.instante / self.velocidade - (time.monotonic() - inicio)
+                    if atraso > 0.001:
+                        await asyncio.sleep(atraso)
+                elif i % 1024 == 0:
+                    # Devolve o controle ao loop de vez em quando
+                    await asyncio.sleep(0)
+                yield tick
+
+
+class FonteSocket(FonteTicks):
+    """Servidor TCP local: cada linha recebida é um tick em CSV
+
+    A leitura dos sockets só avança quando há espaço na fila interna, então
+    a contrapressão chega ao remetente pelo controle de fluxo do TCP.
+    """
+
+    def __init__(self, host='127.0.0.1', porta=0, tamanho_fila=10000):
+        self.host = host
+        self.porta = porta
+        self._fila = asyncio.Queue(tamanho_fila)
+        self._servidor = None
+        self._conexoes = set()
+        self.pronta = asyncio.Event()
+
+    async def _conexao(self, leitor, escritor):
+        tarefa = asyncio.current_task()
+        self._conexoes.add(tarefa)
+        try:
+            async for linha in leitor:
+                try:
+                    linha = linha.decode().strip()
+                except UnicodeDecodeError:
+                    self.descartados += 1
+                    continue
+                if not linha or linha.startswith(CABECALHO[0]):
+                    continue
+                tick = self._ler(linha.split(','))
+                if tick is not None:
+                    await self._fila.put(tick)
+        finally:
+            self._conexoes.discard(tarefa)
+            escritor.close()
+
+    async def ticks(self):
+        self._servidor = await asyncio.start_server(self._conexao, self.host, self.porta)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        self.pronta.set()
+        while True:
+            tick = await self._fila.get()
+            if tick is None:
+                return
+            yield tick
+
+    async def fechar(self, espera=TEMPO_FECHAR):
+        """Para de aceitar conexões e encerra ticks() após a última linha recebida
+
+        Clientes que ainda estão conectados depois de espera segundos (um
+        feed ocioso, por exemplo) têm a conexão cancelada.
+        """
+        if self._servidor is not None:
+            self._servidor.close()
+        if self._conexoes:
+            _, pendentes = await asyncio.wait(self._conexoes, timeout=espera)
+            for tarefa in pendentes:
+                tarefa.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+        if self._servidor is not None:
+            await self._servidor.wait_closed()
+        await self._fila.put(None)
+
+
+async def enviar_arquivo(caminho, host='127.0.0.1', porta=0):
+    """Envia um arquivo gravado para uma FonteSocket"""
+    _, escritor = await asyncio.open_connection(host, porta)
+    with open(caminho, 'rb') as arquivo:
+        for linha in arquivo:
+            escritor.write(linha)
+            if escritor.transport.get_write_buffer_size() > 1 << 16:
+                await escritor.drain()
+    await escritor.drain()
+    escritor.close()
+    await escritor.wait_closed()
+
+
+class MetricasIngestao:
+    """Vazão, profundidade da fila e atraso do processamento"""
+
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.recebidos = 0
+        self.descartados = 0
+        self.processados = 0
+        self.lotes = 0
+        self.profundidade = 0
+        self.profundidade_maxima = 0
+        self.atraso_ultimo = 0.0
+        self.atraso_maximo = 0.0
+
+    def resumo(self):
+        decorrido = max(time.monotonic() - self.inicio, 1e-9)
+        return {
+            'ticks_por_segundo': round(self.processados / decorrido, 1),
+            'recebidos': self.recebidos,
+            'descartados': self.descartados,
+            'processados': self.processados,
+            'lotes': self.lotes,
+            'ticks_por_lote': round(self.processados / self.lotes, 1) if self.lotes else 0.0,
+            'profundidade_fila': self.profundidade,
+            'profundidade_maxima': self.profundidade_maxima,
+            'atraso_ms': round(self.atraso_ultimo * 1000, 3),
+            'atraso_maximo_ms': round(self.atraso_maximo * 1000, 3)
+        }
+
+
+class IngestorTicks:
+    """Liga uma fonte ao monitor com fila limitada e processamento em lote
+
+    Partidas desconhecidas são iniciadas no primeiro tick, usando o under
+    desse tick como under_inicial; as que chegam no mesmo lote têm as
+    curvas geradas juntas.
+    """
+
+    def __init__(self, fonte, monitor=None, tamanho_fila=10000, max_lote=4096):
+        self.fonte = fonte
+        self.monitor = monitor if monitor is not None else MonitorPartidas()
+        self.fila = asyncio.Queue(tamanho_fila)
+        self.max_lote = max_lote
+        self.metricas = MetricasIngestao()
+        self._fim = object()
+
+    async def _produzir(self):
+        fila = self.fila
+        metricas = self.metricas
+        try:
+            async for tick in self.fonte.ticks():
+                await fila.put((time.monotonic(), tick))
+                metricas.recebidos += 1
+        finally:
+            metricas.descartados = self.fonte.descartados
+            await fila.put((time.monotonic(), self._fim))
+
+    def _processar(self, lote):
+        monitor = self.monitor
+        novas = {}
+        for tick in lote:
+            if tick.id_partida not in monitor and tick.id_partida not in novas:
+                novas[tick.id_partida] = tick.under
+        if novas:
+            monitor.iniciar_partidas(list(novas), list(novas.values()))
+        return monitor.processar_lote((t.id_partida, t.minuto, t.under, t.over) for t in lote)
+
+    async def _consumir(self):
+        fila = self.fila
+        metricas = self.metricas
+        while True:
+            recebido_em, tick = await fila.get()
+            lote = []
+            terminou = tick is self._fim
+            if not terminou:
+                lote.append(tick)
+            # Drena o que já está na fila: um lote por iteração do loop. O
+            # atraso do lote é medido no tick mais antigo (o primeiro)
+            while not terminou and len(lote) < self.max_lote and not fila.empty():
+                _, tick = fila.get_nowait()
+                if tick is self._fim:
+                    terminou = True
+                else:
+                    lote.append(tick)
+
+            metricas.profundidade = fila.qsize()
+            metricas.profundidade_maxima = max(metricas.profundidade_maxima, metricas.profundidade + len(lote))
+            if lote:
+                self._processar(lote)
+                metricas.processados += len(lote)
+                metricas.lotes += 1
+                metricas.atraso_ultimo = time.monotonic() - recebido_em
+                metricas.atraso_maximo = max(metricas.atraso_maximo, metricas.atraso_ultimo)
+            if terminou:
+                return
+
+    async def executar(self):
+        """Roda até a fonte terminar; devolve o resumo das métricas"""
+        self.metricas = MetricasIngestao()
+        await asyncio.gather(self._produzir(), self._consumir())
+        return self.metricas.resumo()
+
+
+def gerar_replay_sintetico(caminho, partidas=300, ticks_por_minuto=6, semente=0):
+    """Grava um replay artificial: curvas esperadas com ruído, ordenado no tempo"""
+    aleatorio = random.Random(semente)
+    unders = [round(aleatorio.uniform(2.0, 15.0), 2) for _ in range(partidas)]
+    curvas = gerar_curvas_lote(unders)
+    passo = 60 / ticks_por_minuto
+    total = 0
+    with open(caminho, 'w', newline='') as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(CABECALHO)
+        for minuto in range(1, 91):
+            for fatia in range(ticks_por_minuto):
+                instante = (minuto - 1) * 60 + fatia * passo
+                for p in range(partidas):
+                    under = max(round(curvas['under'][p, minuto - 1] * aleatorio.uniform(0.85, 1.15), 2), 1.01)
+                    over = round(1 / (1 - 1 / under), 3) if under > 1.01 else 15.0
+                    escritor.writerow((f'{instante:.1f}', f'P{p}', minuto, under, over))
+                    total += 1
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingestão de odds ao vivo')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    replay = subcomandos.add_parser('replay', help='reproduz um arquivo gravado')
+    replay.add_argument('arquivo')
+    replay.add_argument('--velocidade', type=float, default=0, help='0 = o mais rápido possível')
+    replay.add_argument('--socket', action='store_true', help='envia o arquivo por um socket TCP local')
+    sintetico = subcomandos.add_parser('sintetico', help='grava um replay artificial')
+    sintetico.add_argument('arquivo')
+    sintetico.add_argument('--partidas', type=int, default=300)
+    sintetico.add_argument('--ticks-por-minuto', type=int, default=6)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'sintetico':
+        total = gerar_replay_sintetico(args.arquivo, args.partidas, args.ticks_por_minuto)
+        print(f"✅ {total} ticks gravados em {args.arquivo}")
+        return
+
+    async def executar():
+        if not args.socket:
+            return await IngestorTicks(FonteReplay(args.arquivo, args.velocidade)).executar()
+        fonte = FonteSocket()
+        tarefa = asyncio.create_task(IngestorTicks(fonte).executar())
+        await fonte.pronta.wait()
+        await enviar_arquivo(args.arquivo, porta=fonte.porta)
+        await fonte.fechar()
+        return await tarefa
+
+    resumo = asyncio.run(executar())
+    for nome, valor in resumo.items():
+        print(f"{nome}: {valor}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Motor vetorizado: gera muitas curvas de 90 minutos de uma só vez"""
+import math
+
+import numpy as np
+
+from analisador.parametros import PARAMETROS
+
+MINUTOS = np.arange(1, 91)
+
+MINUTOS_CONTROLE = (1, 15, 30, 45, 46, 60, 75, 85, 90)
+
+# Linhas processadas por vez (limita o tamanho das matrizes temporárias)
+TAMANHO_BLOCO = 65536
+
+
+def _preparar_interpolacao(minutos_controle, minutos):
+    """Segmento (início, fim) e peso suavizado de cada minuto, calculados uma única vez"""
+    inicios = []
+    fins = []
+    pesos = []
+    ultimo = len(minutos_controle) - 1
+    for minuto in minutos:
+        if minuto in minutos_controle:
+            # Ponto de controle exato: peso zero devolve o próprio ponto
+            indice = minutos_controle.index(minuto)
+            inicios.append(indice)
+            fins.append(min(indice + 1, ultimo))
+            pesos.append(0.0)
+            continue
+        for i in range(ultimo):
+            min1 = minutos_controle[i]
+            min2 = minutos_controle[i + 1]
+            if min1 <= minuto <= min2:
+                fator = (minuto - min1) / (min2 - min1)
+                inicios.append(i)
+                fins.append(i + 1)
+                pesos.append(1 - math.exp(-2 * fator))
+                break
+    return np.array(inicios), np.array(fins), np.array(pesos)
+
+
+SEGMENTOS, SEGMENTOS_FIM, PESOS = _preparar_interpolacao(MINUTOS_CONTROLE, [int(m) for m in MINUTOS])
+
+
+def arredondar(valores, casas):
+    """Equivalente vetorizado de round(): idêntico ao arredondamento do Python"""
+    valores = np.asarray(valores, dtype=np.float64)
+    resultado = np.round(valores, casas)
+    escalado = valores * 10.0 ** casas
+    fracao = escalado - np.floor(escalado)
+    # Casos próximos de ...5 podem divergir: resolve-os com round() escalar
+    duvidosos = np.abs(fracao - 0.5) < 1e-6
+    if duvidosos.any():
+        resultado[duvidosos] = [round(valor, casas) for valor in valores[duvidosos].tolist()]
+    return resultado
+
+
+def calcular_under_final_lote(unders_iniciais, parametros=None):
+    """Versão vetorizada de calcular_under_final_esperado"""
+    parametros = parametros or PARAMETROS
+    faixas = parametros.faixas_under_final
+    unders = np.asarray(unders_iniciais, dtype=np.float64)
+    condicoes = [unders >= limite for limite, _, _ in faixas]
+    multiplicadores = np.select(condicoes, [m for _, m, _ in faixas], parametros.faixa_padrao[0])
+    pisos = np.select(condicoes, [p for _, _, p in faixas], parametros.faixa_padrao[1])
+    return np.maximum(pisos, unders * multiplicadores)
+
+
+def calcular_over_lote(unders):
+    """Versão vetorizada de calcular_over_baseado_no_under"""
+    unders = np.maximum(np.asarray(unders, dtype=np.float64), 1.01)
+    prob_over = 1 - 1 / unders
+    with np.errstate(divide='ignore'):
+        over = 1 / prob_over
+    return np.where(prob_over <= 0.01, 15.0, np.minimum(over, 15.0))
+
+
+def criar_pontos_controle_lote(unders_iniciais, unders_finais, parametros=None):
+    """Versão vetorizada de criar_curva_natural: matriz (N, 9) de pontos de controle"""
+    velocidades = (parametros or PARAMETROS).velocidades
+    unders = np.asarray(unders_iniciais, dtype=np.float64)
+    finais = np.asarray(unders_finais, dtype=np.float64)
+    diferenca_total = unders - finais
+
+    pontos = np.empty((unders.shape[0], len(MINUTOS_CONTROLE)))
+    pontos[:, 0] = unders
+    valor_atual = unders.copy()
+
+    # Minutos 15, 30 e 45
+    for coluna, velocidade in ((1, velocidades[0]), (2, velocidades[1]), (3, velocidades[2])):
+        valor_atual = valor_atual - diferenca_total * velocidade
+        pontos[:, coluna] = np.maximum(valor_atual, finais)
+
+    # Minuto 46 (pequeno boost no início do 2º tempo)
+    pontos[:, 4] = np.maximum(pontos[:, 3] - (pontos[:, 3] - finais) * 0.05, finais)
+
+    # Minutos 60, 75 e 85 (85 recebe 70% da queda final)
+    for coluna, queda in ((5, diferenca_total * velocidades[3]),
+                          (6, diferenca_total * velocidades[4]),
+                          (7, diferenca_total * velocidades[5] * 0.7)):
+        valor_atual = valor_atual - queda
+        pontos[:, coluna] = np.maximum(valor_atual, finais)
+
+    pontos[:, 8] = finais
+
+    # Garante progressão decrescente (mesma correção de 0.98 do caminho escalar)
+    for coluna in range(1, len(MINUTOS_CONTROLE)):
+        subiu = pontos[:, coluna] >= pontos[:, coluna - 1]
+        corrigido = np.maximum(pontos[:, coluna - 1] * 0.98, finais)
+        pontos[:, coluna] = np.where(subiu, corrigido, pontos[:, coluna])
+
+    return pontos
+
+
+def curvas_continuas_lote(unders, finais, parametros=None):
+    """Curvas (N, 90) antes do arredondamento, para calibração e validação"""
+    pontos = criar_pontos_controle_lote(unders, finais, parametros)
+
+    inicio = pontos[:, SEGMENTOS]
+    fim = pontos[:, SEGMENTOS_FIM]
+    interpolado = np.minimum(inicio + (fim - inicio) * PESOS, inicio)
+
+    # Dupla verificação: nunca sobe, nunca abaixo do final nem de 1.01
+    acumulado = np.minimum.accumulate(np.minimum(interpolado, unders[:, None]), axis=1)
+    return np.maximum(acumulado, np.maximum(finais, 1.01)[:, None])
+
+
+def gerar_curvas_lote(unders_iniciais, parametros=None):
+    """Gera N curvas de uma vez: matrizes (N, 90) de under e over
+
+    O resultado é numericamente idêntico a chamar gerar_curva_equilibrio_90min
+    para cada under_inicial (com os mesmos parâmetros).
+    """
+    unders = np.atleast_1d(np.asarray(unders_iniciais, dtype=np.float64)).ravel()
+    under = np.empty((unders.shape[0], len(MINUTOS)))
+    over = np.empty_like(under)
+
+    for inicio in range(0, unders.shape[0], TAMANHO_BLOCO):
+        bloco = unders[inicio:inicio + TAMANHO_BLOCO]
+        finais = calcular_under_final_lote(bloco, parametros)
+        curvas = curvas_continuas_lote(bloco, finais, parametros)
+        under[inicio:inicio + TAMANHO_BLOCO] = arredondar(curvas, 2)
+        over[inicio:inicio + TAMANHO_BLOCO] = arredondar(calcular_over_lote(curvas), 3)
+
+    return {
+        'minuto': MINUTOS,
+        'under': under,
+        'over': over
+    }
+
+
+# Limiares de analisar_divergencia, do status mais favorável ao menos favorável
+LIMIARES_DIVERGENCIA = (15, 8, -8, -15)
+STATUS_DIVERGENCIA = (
+    "🔥 OPORTUNIDADE ALTA",
+    "💰 OPORTUNIDADE MÉDIA",
+    "⚖️ EQUILIBRADO",
+    "⚠️ CUIDADO",
+    "🚨 RISCO ALTO",
+)
+
+
+def classificar_divergencia_lote(unders_reais, unders_esperados):
+    """Versão vetorizada de analisar_divergencia
+
+    Devolve (divergencia_percent arredondada, índice em STATUS_DIVERGENCIA).
+    """
+    reais = np.asarray(unders_reais, dtype=np.float64)
+    esperados = np.asarray(unders_esperados, dtype=np.float64)
+    esperados = np.where(esperados <= 0, 1.01, esperados)
+    divergencia = ((reais - esperados) / esperados) * 100
+    faixa = np.full(divergencia.shape, len(LIMIARES_DIVERGENCIA), dtype=np.int8)
+    for i, limiar in reversed(list(enumerate(LIMIARES_DIVERGENCIA))):
+        faixa[divergencia >= limiar] = i
+    return arredondar(divergencia, 1), faixa
+
+
+def calcular_taxa_queda_lote(unders_iniciais, unders_atuais, minutos):
+    """Versão vetorizada de calcular_taxa_queda"""
+    iniciais = np.asarray(unders_iniciais, dtype=np.float64)
+    minutos = np.asarray(minutos, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        taxa = (iniciais - np.asarray(unders_atuais, dtype=np.float64)) / (iniciais * minutos)
+    return np.where(minutos == 0, 0.0, taxa)
+
+
+RITMOS = ("DESACELERADA ⏰", "ACELERADA ⚡")
+
+
+def classificar_ritmo_lote(taxas_queda):
+    """Índice em RITMOS, como classificar_ritmo"""
+    return np.where(np.asarray(taxas_queda) >= 0.015, 0, 1).astype(np.int8)
+
+
+POTENCIAIS = ("🔥 MUITO ALTO", "💰 ALTO", "⚖️ MÉDIO", "⚠️ BAIXO")
+
+
+def calcular_queda_restante_lote(unders_atuais, unders_finais):
+    atuais = np.asarray(unders_atuais, dtype=np.float64)
+    finais = np.asarray(unders_finais, dtype=np.float64)
+    return np.where(atuais > finais, ((atuais - finais) / atuais) * 100, 0.0)
+
+
+def classificar_potencial_lote(quedas_restantes):
+    """Índice em POTENCIAIS, como classificar_potencial"""
+    quedas = np.asarray(quedas_restantes)
+    return np.select([quedas > 35, quedas > 25, quedas > 15], [0, 1, 2], 3).astype(np.int8)
@@ -0,0 +1,218 @@
+"""Mercado de várias linhas (0.5, 1.5, 2.5, 3.5...) com remoção da margem
+
+calcular_over_baseado_no_under supõe uma só linha e um livro sem margem.
+Aqui as cotações chegam em escadas de (linha, under, over) por partida,
+em matrizes (partidas, linhas), com NaN onde a cotação falta.
+
+1. remover_margem tira o overround de cada par under/over:
+     * 'proporcional': divide as probabilidades implícitas pela soma;
+     * 'aditivo': tira metade do excesso de cada lado;
+     * 'shin': modelo de Shin (apostadores informados), com z resolvido
+       por bissecção vetorizada.
+2. Cada linha, com o placar (gols já marcados), dá os gols esperados no
+   restante do jogo: a média de Poisson cuja P(gols <= linha - placar) é
+   a probabilidade justa do under. A partida fica com a média das linhas
+   ponderada pela informação de Fisher de cada uma: linhas com under
+   muito provável ou muito improvável quase não pesam.
+3. A curva de uma linha (curvas_continuas_lote) dá o formato do tempo:
+   a fração dos gols esperados que ainda falta em cada minuto. Com ela,
+   todas as linhas são projetadas num único array (partidas, linhas,
+   minutos) de probabilidades e odds, justas ou com a margem de volta.
+
+Tudo é NumPy com broadcasting: nenhum laço em Python por partida ou por
+linha. Os laços que existem são por iteração da bissecção e por termo da
+soma de Poisson, e cada um opera no array inteiro.
+"""
+import numpy as np
+
+from analisador.lote import MINUTOS, calcular_under_final_lote, curvas_continuas_lote
+
+LINHAS = (0.5, 1.5, 2.5, 3.5)
+METODOS = ('proporcional', 'aditivo', 'shin')
+
+ODD_MINIMA = 1.01
+ODD_MAXIMA = 999.0
+GOLS_MAXIMOS = 20.0
+ITERACOES = 60
+
+
+def _probabilidades_implicitas(unders, overs):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1 / np.asarray(unders, dtype=np.float64), 1 / np.asarray(overs, dtype=np.float64)
+
+
+def _shin(implicitas, soma):
+    """Probabilidades de Shin para arrays (..., 2) de probabilidades implícitas"""
+    def probabilidades(z):
+        z = z[..., None]
+        return (np.sqrt(z ** 2 + 4 * (1 - z) * implicitas ** 2 / soma[..., None]) - z) / (2 * (1 - z))
+
+    # A soma das probabilidades cai com z: bissecção em [0, 1) no array inteiro
+    baixo = np.zeros(soma.shape)
+    alto = np.full(soma.shape, 0.999)
+    for _ in range(ITERACOES):
+        meio = (baixo + alto) / 2
+        acima = probabilidades(meio).sum(axis=-1) > 1
+        baixo = np.where(acima, meio, baixo)
+        alto = np.where(acima, alto, meio)
+    z = (baixo + alto) / 2
+    return probabilidades(z), z
+
+
+def remover_margem(unders, overs, metodo='proporcional'):
+    """Probabilidades justas de under e over e a margem de cada cotação
+
+    Cotações sem margem (soma <= 1) só são normalizadas. Devolve dict com
+    'under', 'over', 'margem' e, no método Shin, 'z'.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"método deve ser um de: {', '.join(METODOS)}")
+    prob_under, prob_over = _probabilidades_implicitas(unders, overs)
+    soma = prob_under + prob_over
+    resultado = {'margem': soma - 1}
+
+    if metodo == 'aditivo':
+        excesso = (soma - 1) / 2
+        prob_under = np.clip(prob_under - excesso, 1e-9, 1)
+        prob_over = np.clip(prob_over - excesso, 1e-9, 1)
+        soma = prob_under + prob_over
+    elif metodo == 'shin':
+        justas, z = _shin(np.stack([prob_under, prob_over], axis=-1), soma)
+        com_margem = soma > 1
+        prob_under = np.where(com_margem, justas[..., 0], prob_under)
+        prob_over = np.where(com_margem, justas[..., 1], prob_over)
+        soma = prob_under + prob_over
+        resultado['z'] = np.where(com_margem, z, 0.0)
+
+    resultado['under'] = prob_under / soma
+    resultado['over'] = prob_over / soma
+    return resultado
+
+
+def cdf_poisson(limites, medias):
+    """P(Poisson(medias) <= limites), com broadcasting; limites negativos dão 0"""
+    limites = np.asarray(limites)
+    medias = np.asarray(medias, dtype=np.float64)
+    maximo = int(np.nanmax(limites, initial=-1))
+    termo = np.exp(-medias)
+    total = np.where(limites >= 0, termo, 0.0)
+    for k in range(1, maximo + 1):
+        termo = termo * medias / k
+        total = total + np.where(limites >= k, termo, 0.0)
+    return total
+
+
+def gols_esperados(limites, prob_under):
+    """Média de Poisson com P(gols <= limite) = prob_under, por bissecção vetorizada
+
+    NaN onde a cotação falta ou a linha já foi superada (limite < 0).
+    """
+    limites = np.asarray(limites)
+    prob_under = np.asarray(prob_under, dtype=np.float64)
+    forma = np.broadcast_shapes(limites.shape, prob_under.shape)
+    baixo = np.zeros(forma)
+    alto = np.full(forma, GOLS_MAXIMOS)
+    for _ in range(ITERACOES):
+        meio = (baixo + alto) / 2
+        # A CDF cai com a média: acima do alvo, a média ainda é pequena
+        acima = cdf_poisson(limites, meio) > prob_under
+        baixo = np.where(acima, meio, baixo)
+        alto = np.where(acima, alto, meio)
+    return np.where((limites >= 0) & np.isfinite(prob_under), (baixo + alto) / 2, np.nan)
+
+
+def fracao_restante_lote(medias, parametros=None):
+    """Fração (N, 91) dos gols esperados que ainda falta nos minutos 0 a 90
+
+    O formato vem da curva de uma linha da partida equivalente (under
+    inicial justo exp(media)): log(curva / under_final), normalizado.
+    """
+    medias = np.asarray(medias, dtype=np.float64)
+    unders = np.exp(np.nan_to_num(medias, nan=0.0))
+    finais = calcular_under_final_lote(unders, parametros)
+    curvas = curvas_continuas_lote(unders, finais, parametros)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total = np.log(unders / finais)
+        fracao = np.log(curvas / finais[:, None]) / total[:, None]
+    # Jogos com under inicial abaixo do final: queda linear até o fim
+    linear = 1 - MINUTOS / 90
+    fracao = np.where((total > 0)[:, None], np.clip(fracao, 0, 1), linear)
+    return np.concatenate([np.ones((medias.shape[0], 1)), fracao], axis=1)
+
+
+def projetar_linhas(unders, overs, linhas=LINHAS, metodo='proporcional', gols=0, minutos=0,
+                    com_margem=False, parametros=None):
+    """Projeção de todas as linhas de muitas partidas num único array
+
+    unders, overs: cotações (partidas, linhas), NaN onde faltam;
+    gols, minutos: placar (total de gols) e minuto das cotações, por partida.
+
+    Devolve dict com 'linhas', 'minuto' (1-90) e:
+      * 'margem': (partidas, linhas);
+      * 'gols_esperados': (partidas,), gols que faltam no minuto das cotações;
+      * 'gols_por_linha': (partidas, linhas), o ajuste de cada linha;
+      * 'prob_under', 'under', 'over': (partidas, linhas, 90).
+    Minutos já jogados repetem o valor do minuto das cotações. As odds são
+    justas ou, com com_margem=True, com a margem da linha reaplicada
+    proporcionalmente; ficam entre ODD_MINIMA e ODD_MAXIMA.
+    """
+    unders = np.atleast_2d(np.asarray(unders, dtype=np.float64))
+    overs = np.atleast_2d(np.asarray(overs, dtype=np.float64))
+    linhas = np.asarray(linhas, dtype=np.float64)
+    partidas = unders.shape[0]
+    gols = np.broadcast_to(np.asarray(gols, dtype=np.int64), (partidas,))
+    minutos = np.clip(np.broadcast_to(np.asarray(minutos, dtype=np.int64), (partidas,)), 0, 89)
+
+    justas = remover_margem(unders, overs, metodo)
+    limites = np.floor(linhas)[None, :].astype(np.int64) - gols[:, None]
+    por_linha = gols_esperados(limites, justas['under'])
+    validas = np.isfinite(por_linha)
+    medias_linha = np.where(validas, por_linha, 0)
+    # Informação de Fisher de P(gols <= limite) sobre a média: pmf² / (p (1 - p))
+    prob = cdf_poisson(limites, medias_linha)
+    pmf = prob - cdf_poisson(limites - 1, medias_linha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pesos = np.where(validas, pmf ** 2 / (prob * (1 - prob)), 0)
+        pesos = np.where(np.isfinite(pesos), pesos, 0)
+        medias = (pesos * medias_linha).sum(axis=1) / pesos.sum(axis=1)
+
+    # O formato depende dos gols esperados no jogo todo, que se obtêm do
+    # restante dividindo pela fração que falta no minuto (ponto fixo)
+    totais = medias / (1 - minutos / 90)
+    for _ in range(3):
+        fracao = fracao_restante_lote(totais, parametros)
+        atual = fracao[np.arange(partidas), minutos]
+        totais = np.where(atual > 0, medias / atual, medias)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relativa = np.where(atual[:, None] > 0, np.minimum(fracao[:, 1:] / atual[:, None], 1), 0.0)
+    restante = medias[:, None] * relativa
+
+    prob_under = cdf_poisson(limites[:, :, None], restante[:, None, :])
+    if com_margem:
+        margem = 1 + np.where(np.isfinite(justas['margem']), np.maximum(justas['margem'], 0), 0)[:, :, None]
+    else:
+        margem = 1
+    with np.errstate(divide='ignore'):
+        under = np.clip(1 / (prob_under * margem), ODD_MINIMA, ODD_MAXIMA)
+        over = np.clip(1 / ((1 - prob_under) * margem), ODD_MINIMA, ODD_MAXIMA)
+
+    return {
+        'linhas': linhas,
+        'minuto': MINUTOS,
+        'margem': justas['margem'],
+        'gols_esperados': medias,
+        'gols_por_linha': por_linha,
+        'prob_under': prob_under,
+        'under': under,
+        'over': over
+    }
+
+
+def projetar_cotacao(under, over, linha, gols=0, minuto=0, linhas=LINHAS, metodo='proporcional', parametros=None):
+    """projetar_linhas a partir de uma única cotação (a linha dela entra em `linhas` se faltar)"""
+    linhas = tuple(sorted(set(linhas) | {linha}))
+    unders = np.full((1, len(linhas)), np.nan)
+    overs = np.full((1, len(linhas)), np.nan)
+    unders[0, linhas.index(linha)] = under
+    overs[0, linhas.index(linha)] = over
+    return projetar_linhas(unders, overs, linhas, metodo, gols, minuto, parametros=parametros)
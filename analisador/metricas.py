@@ -0,0 +1,220 @@
+"""Instrumentação opcional: temporizadores, contadores e histogramas
+
+Desligada por padrão. ativar() (ou ANALISADOR_METRICAS=1 na
+inicialização) envolve os métodos públicos das classes do analisador com
+temporizadores; desativar() restaura os métodos originais, então com a
+instrumentação desligada o custo nos métodos é zero. Etapas arbitrárias
+(renderização, montagem de DataFrames) usam `with medir('nome'):`, que
+desligado devolve um contexto nulo compartilhado.
+
+Exportação em JSON (para_json) e no formato texto do Prometheus
+(para_prometheus), para arquivo (gravar) ou num endpoint HTTP local
+(servir: /metrics e /metrics.json).
+"""
+import bisect
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites superiores dos baldes do histograma, em segundos
+BALDES = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+PORTA_PADRAO = 9464
+
+_NULO = contextlib.nullcontext()
+
+
+class Histograma:
+    __slots__ = ('contagens', 'soma', 'total', 'maximo')
+
+    def __init__(self):
+        self.contagens = [0] * (len(BALDES) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = 0.0
+
+    def observar(self, segundos):
+        self.contagens[bisect.bisect_left(BALDES, segundos)] += 1
+        self.soma += segundos
+        self.total += 1
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """Limite superior do balde que contém o percentil p (0-100)"""
+        alvo = self.total * p / 100
+        acumulado = 0
+        for limite, contagem in zip(BALDES + (float('inf'),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+class RegistroMetricas:
+    """Contadores e histogramas de duração por nome"""
+
+    def __init__(self):
+        self.ativo = False
+        self.contadores = {}
+        self.histogramas = {}
+        self._trava = threading.Lock()
+        self._originais = []
+
+    def contar(self, nome, quantidade=1):
+        if not self.ativo:
+            return
+        with self._trava:
+            self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def observar(self, nome, segundos):
+        with self._trava:
+            histograma = self.histogramas.get(nome)
+            if histograma is None:
+                histograma = self.histogramas[nome] = Histograma()
+            histograma.observar(segundos)
+
+    @contextlib.contextmanager
+    def _temporizador(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio)
+
+    def medir(self, nome):
+        """Contexto que mede a duração do bloco (nulo quando desligado)"""
+        if not self.ativo:
+            return _NULO
+        return self._temporizador(nome)
+
+    def _envolver(self, nome, funcao):
+        registro = self
+
+        @functools.wraps(funcao)
+        def medido(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registro.observar(nome, time.perf_counter() - inicio)
+        return medido
+
+    def instrumentar_classe(self, classe):
+        """Envolve os métodos públicos da classe com temporizadores"""
+        for nome, funcao in list(vars(classe).items()):
+            if nome.startswith('_') or not callable(funcao):
+                continue
+            self._originais.append((classe, nome, funcao))
+            setattr(classe, nome, self._envolver(f'{classe.__name__}.{nome}', funcao))
+
+    def ativar(self, classes=None):
+        if self.ativo:
+            return
+        if classes is None:
+            from analisador.cache import AnalisadorEmCache
+            from analisador.monitor import MonitorPartidas
+            from analisador.nucleo import AnalisadorApostasUnderOver
+            classes = (AnalisadorApostasUnderOver, AnalisadorEmCache, MonitorPartidas)
+        for classe in classes:
+            self.instrumentar_classe(classe)
+        self.ativo = True
+
+    def desativar(self):
+        for classe, nome, funcao in reversed(self._originais):
+            setattr(classe, nome, funcao)
+        self._originais = []
+        self.ativo = False
+
+    def limpar(self):
+        with self._trava:
+            self.contadores.clear()
+            self.histogramas.clear()
+
+    def para_json(self):
+        with self._trava:
+            return {
+                'contadores': dict(self.contadores),
+                'temporizadores': {
+                    nome: {
+                        'chamadas': h.total,
+                        'total_s': round(h.soma, 6),
+                        'media_us': round(h.soma / h.total * 1e6, 2) if h.total else 0.0,
+                        'p50_us': round(h.percentil(50) * 1e6, 2),
+                        'p99_us': round(h.percentil(99) * 1e6, 2),
+                        'maximo_us': round(h.maximo * 1e6, 2),
+                        'baldes': dict(zip([str(b) for b in BALDES] + ['+Inf'], h.contagens))
+                    }
+                    for nome, h in self.histogramas.items()
+                }
+            }
+
+    def para_prometheus(self, prefixo='analisador'):
+        linhas = []
+        with self._trava:
+            if self.contadores:
+                linhas.append(f'# TYPE {prefixo}_eventos_total counter')
+                for nome, valor in sorted(self.contadores.items()):
+                    linhas.append(f'{prefixo}_eventos_total{{nome="{nome}"}} {valor}')
+            if self.histogramas:
+                linhas.append(f'# TYPE {prefixo}_duracao_segundos histogram')
+                for nome, h in sorted(self.histogramas.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(BALDES, h.contagens):
+                        acumulado += contagem
+                        linhas.append(f'{prefixo}_duracao_segundos_bucket{{nome="{nome}",le="{limite}"}} {acumulado}')
+                    linhas.append(f'{prefixo}_duracao_segundos_bucket{{nome="{nome}",le="+Inf"}} {h.total}')
+                    linhas.append(f'{prefixo}_duracao_segundos_sum{{nome="{nome}"}} {h.soma:.9f}')
+                    linhas.append(f'{prefixo}_duracao_segundos_count{{nome="{nome}"}} {h.total}')
+        return '\n'.join(linhas) + '\n'
+
+    def gravar(self, caminho):
+        """Grava em JSON (.json) ou no formato do Prometheus (qualquer outro)"""
+        with open(caminho, 'w') as arquivo:
+            if caminho.endswith('.json'):
+                json.dump(self.para_json(), arquivo, indent=2)
+            else:
+                arquivo.write(self.para_prometheus())
+
+    def servir(self, porta=PORTA_PADRAO, host='127.0.0.1'):
+        """Sobe o endpoint HTTP local numa thread daemon; devolve o servidor (OSError se a porta estiver em uso)"""
+        registro = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    corpo = json.dumps(registro.para_json()).encode()
+                    tipo = 'application/json'
+                elif self.path.startswith('/metrics'):
+                    corpo = registro.para_prometheus().encode()
+                    tipo = 'text/plain; version=0.0.4'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((host, porta), Manipulador)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
+
+
+REGISTRO = RegistroMetricas()
+
+medir = REGISTRO.medir
+contar = REGISTRO.contar
+ativar = REGISTRO.ativar
+desativar = REGISTRO.desativar
+
+if os.environ.get('ANALISADOR_METRICAS') == '1':
+    ativar()
@@ -0,0 +1,577 @@
+"""Monitor ao vivo distribuído entre processos, sobre memória compartilhada
+
+Um processo só não dá conta de todas as partidas de um sábado cheio. O
+CoordenadorMonitor divide as partidas entre processos trabalhadores
+(partições). Os ticks de cada partição seguem numa fila própria e são
+processados em lote, com as funções vetorizadas de lote.py.
+
+Todo o estado fica num único segmento multiprocessing.shared_memory
+(MemoriaMonitor), com uma linha (vaga) por partida:
+  * a curva de 90 minutos (a mesma de gerar_curva_equilibrio_90min);
+  * o último tick;
+  * divergência, taxa de queda e queda restante;
+  * os códigos de status, ritmo e potencial.
+A interface e outros leitores anexam o segmento pelo nome. Os arrays
+(curvas, valores, codigos...) são views diretas do segmento: nada passa
+por pickle nem é copiado entre processos. Cada vaga tem um contador de
+versão, ímpar enquanto o trabalhador escreve. instantaneo() copia só as
+linhas ativas e relê as que mudaram no meio da leitura; se uma vaga não
+estabiliza em TEMPO_LEITURA (trabalhador morto no meio de uma escrita),
+a leitura falha com RuntimeError em vez de devolver dados rasgados.
+
+Os ids das partidas ocupam até TAMANHO_ID bytes em UTF-8 no segmento;
+ids maiores são recusados com ValueError em iniciar_partidas.
+
+O coordenador:
+  * põe cada partida nova na partição com menos partidas (a curva é
+    gerada pelo trabalhador dela);
+  * libera a vaga quando a partida termina;
+  * rebalanceia quando as partições ficam desiguais. Mover uma partida
+    só troca a partição dona da vaga: curva e estado já estão na memória
+    compartilhada;
+  * grava a carga de cada partição (partidas, ticks, lotes, tempo
+    ocupado) no próprio segmento, visível para os leitores.
+
+Tem a mesma interface de entrada do MonitorPartidas (iniciar_partidas,
+processar_lote, in), então serve de monitor para o IngestorTicks:
+
+    python -m analisador.monitor_distribuido gravacao.csv --processos 4 --manter
+
+Com --manter o segmento fica disponível até Ctrl+C. Com
+ANALISADOR_MONITOR=<nome> a interface mostra o modo "🖥️ Monitor
+Compartilhado".
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import multiprocessing
+import queue
+import time
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from analisador.lote import (
+    MINUTOS, POTENCIAIS, RITMOS, STATUS_DIVERGENCIA, calcular_queda_restante_lote, calcular_taxa_queda_lote,
+    calcular_under_final_lote, classificar_divergencia_lote, classificar_potencial_lote, classificar_ritmo_lote,
+    gerar_curvas_lote
+)
+
+NOME_PADRAO = 'analisador_monitor'
+PROCESSOS = 2
+CAPACIDADE = 10000
+TOLERANCIA = 1
+FILA_MAXIMA = 64
+TEMPO_RESPOSTA = 1.0
+TEMPO_LEITURA = 1.0
+
+MAGICO = 0x4D4F4E31
+ALINHAMENTO = 64
+TAMANHO_ID = 48
+
+# Situação de cada vaga
+LIVRE = 0
+INICIANDO = 1
+ATIVA = 2
+
+COLUNAS = (
+    'minuto', 'under_atual', 'over_atual', 'under_esperado', 'divergencia_percent',
+    'taxa_queda', 'queda_restante', 'taxa_queda_restante'
+)
+CODIGOS = {'status': STATUS_DIVERGENCIA, 'ritmo': RITMOS, 'potencial': POTENCIAIS}
+COLUNAS_CARGA = ('partidas', 'ticks', 'lotes', 'ocupado_s', 'inicio', 'pid')
+
+_COLUNA = {nome: i for i, nome in enumerate(COLUNAS)}
+_CARGA = {nome: i for i, nome in enumerate(COLUNAS_CARGA)}
+
+
+def _campos(capacidade, processos):
+    return (
+        ('ids', f'S{TAMANHO_ID}', (capacidade,)),
+        ('situacao', np.int8, (capacidade,)),
+        ('particao', np.int16, (capacidade,)),
+        ('versao', np.int64, (capacidade,)),
+        ('ticks', np.int64, (capacidade,)),
+        ('under_inicial', np.float64, (capacidade,)),
+        ('under_final', np.float64, (capacidade,)),
+        ('curvas', np.float64, (capacidade, len(MINUTOS))),
+        ('valores', np.float64, (capacidade, len(COLUNAS))),
+        ('codigos', np.int8, (capacidade, len(CODIGOS))),
+        ('cargas', np.float64, (processos, len(COLUNAS_CARGA))),
+    )
+
+
+def _layout(capacidade, processos):
+    """[(nome, dtype, forma, deslocamento)] e o tamanho total do segmento"""
+    regioes = []
+    deslocamento = ALINHAMENTO  # cabeçalho: mágico, capacidade, processos
+    for nome, dtype, forma in _campos(capacidade, processos):
+        regioes.append((nome, dtype, forma, deslocamento))
+        tamanho = np.dtype(dtype).itemsize * math.prod(forma)
+        deslocamento += -(-tamanho // ALINHAMENTO) * ALINHAMENTO
+    return regioes, deslocamento
+
+
+class MemoriaMonitor:
+    """Arrays do monitor num segmento de memória compartilhada"""
+
+    def __init__(self, memoria, dono=False):
+        self.memoria = memoria
+        self.dono = dono
+        cabecalho = np.ndarray((3,), np.int64, memoria.buf)
+        if cabecalho[0] != MAGICO:
+            raise ValueError(f"{memoria.name} não é um segmento do monitor")
+        self.capacidade = int(cabecalho[1])
+        self.processos = int(cabecalho[2])
+        del cabecalho
+        regioes, _ = _layout(self.capacidade, self.processos)
+        self._nomes = [nome for nome, _, _, _ in regioes]
+        for nome, dtype, forma, deslocamento in regioes:
+            setattr(self, nome, np.ndarray(forma, dtype, memoria.buf, deslocamento))
+
+    @classmethod
+    def criar(cls, capacidade=CAPACIDADE, processos=PROCESSOS, nome=None):
+        _, tamanho = _layout(capacidade, processos)
+        memoria = shared_memory.SharedMemory(nome, create=True, size=tamanho)
+        cabecalho = np.ndarray((3,), np.int64, memoria.buf)
+        cabecalho[:] = (MAGICO, capacidade, processos)
+        del cabecalho
+        resultado = cls(memoria, dono=True)
+        resultado.particao[:] = -1
+        return resultado
+
+    @classmethod
+    def anexar(cls, nome=NOME_PADRAO, desregistrar=True):
+        """Anexa um segmento existente
+
+        Leitores de fora (interface, scripts) desregistram o segmento do
+        resource_tracker: sem isso, no Python < 3.13, ele é apagado quando
+        o leitor termina. Os trabalhadores dividem o tracker com o
+        coordenador e não desregistram; no processo do coordenador, use
+        coordenador.memoria.
+        """
+        memoria = shared_memory.SharedMemory(nome)
+        if desregistrar:
+            resource_tracker.unregister(memoria._name, 'shared_memory')
+        return cls(memoria)
+
+    @property
+    def nome(self):
+        return self.memoria.name
+
+    def fechar(self):
+        for nome in self._nomes:
+            setattr(self, nome, None)
+        self.memoria.close()
+        if self.dono:
+            self.memoria.unlink()
+
+    # Escrita (trabalhadores)
+
+    def iniciar(self, vagas, unders_iniciais, parametros=None):
+        unders = np.asarray(unders_iniciais, dtype=np.float64)
+        self.versao[vagas] += 1
+        self.curvas[vagas] = gerar_curvas_lote(unders, parametros)['under']
+        self.under_inicial[vagas] = unders
+        self.under_final[vagas] = calcular_under_final_lote(unders, parametros)
+        valores = np.full((len(vagas), len(COLUNAS)), np.nan)
+        valores[:, _COLUNA['minuto']] = 0
+        valores[:, _COLUNA['under_atual']] = unders
+        valores[:, _COLUNA['under_esperado']] = unders
+        self.valores[vagas] = valores
+        self.codigos[vagas] = -1
+        self.ticks[vagas] = 0
+        self.versao[vagas] += 1
+        self.situacao[vagas] = ATIVA
+
+    def processar(self, dados):
+        """Aplica um lote de ticks (vaga, minuto, under, over), como processar_tick do MonitorPartidas"""
+        vagas = dados[:, 0].astype(np.intp)
+        # Só o último tick de cada partida fica no estado; a contagem inclui todos
+        unicas, primeiro, contagem = np.unique(vagas[::-1], return_index=True, return_counts=True)
+        ultimos = dados[len(dados) - 1 - primeiro]
+        minuto, under, over = ultimos[:, 1], ultimos[:, 2], ultimos[:, 3]
+
+        esperado = self.curvas[unicas, np.clip(minuto.astype(np.int64), 1, 90) - 1]
+        divergencia, status = classificar_divergencia_lote(under, esperado)
+        taxa = calcular_taxa_queda_lote(self.under_inicial[unicas], under, minuto)
+        finais = self.under_final[unicas]
+        queda = calcular_queda_restante_lote(under, finais)
+        restantes = 90 - minuto
+        taxa_restante = np.where(restantes > 0, (under - finais) / np.where(restantes > 0, restantes, 1), 0.0)
+
+        self.versao[unicas] += 1
+        self.valores[unicas] = np.column_stack((minuto, under, over, esperado, divergencia, taxa, queda, taxa_restante))
+        self.codigos[unicas] = np.column_stack((status, classificar_ritmo_lote(taxa), classificar_potencial_lote(queda)))
+        self.ticks[unicas] += contagem
+        self.versao[unicas] += 1
+
+    def limpar(self, vagas):
+        self.situacao[vagas] = LIVRE
+        self.ids[vagas] = b''
+
+    # Leitura (qualquer processo)
+
+    def vaga(self, id_partida):
+        encontradas = np.flatnonzero((self.ids == str(id_partida).encode()) & (self.situacao == ATIVA))
+        return int(encontradas[0]) if encontradas.size else None
+
+    def _ler(self, vagas, tempo_limite=TEMPO_LEITURA):
+        """Cópia consistente (valores, codigos, ticks, particao) das vagas
+
+        Só as linhas escritas durante a leitura são relidas, até ficarem
+        estáveis; RuntimeError se alguma não estabiliza em tempo_limite.
+        """
+        vagas = np.asarray(vagas, dtype=np.intp)
+        posicoes = np.arange(len(vagas))
+        linhas = (np.empty((len(vagas), len(COLUNAS))), np.empty((len(vagas), len(CODIGOS)), dtype=np.int8),
+                  np.empty(len(vagas), dtype=np.int64), np.empty(len(vagas), dtype=np.int16))
+        limite = None
+        while True:
+            relidas = vagas[posicoes]
+            antes = self.versao[relidas]
+            for destino, origem in zip(linhas, (self.valores, self.codigos, self.ticks, self.particao)):
+                destino[posicoes] = origem[relidas]
+            depois = self.versao[relidas]
+            posicoes = posicoes[(antes != depois) | (antes & 1 == 1)]
+            if not posicoes.size:
+                return linhas
+            if limite is None:
+                limite = time.monotonic() + tempo_limite
+            elif time.monotonic() > limite:
+                raise RuntimeError(f"Vagas {vagas[posicoes].tolist()} não estabilizaram em {tempo_limite} s "
+                                   "(trabalhador parado no meio de uma escrita?)")
+            else:
+                time.sleep(0.0001)
+
+    def instantaneo(self):
+        """Estado atual das partidas ativas: dict de colunas (arrays copiados de forma consistente)"""
+        vagas = np.flatnonzero(self.situacao == ATIVA)
+        valores, codigos, ticks, particoes = self._ler(vagas)
+        resultado = {
+            # Vaga reaproveitada durante a leitura pode trazer bytes de outro id
+            'id_partida': np.char.decode(self.ids[vagas], 'utf-8', 'replace'),
+            'particao': particoes,
+            'ticks': ticks,
+            'under_inicial': self.under_inicial[vagas],
+            'under_final': self.under_final[vagas],
+        }
+        for i, nome in enumerate(COLUNAS):
+            resultado[nome] = valores[:, i]
+        for i, (nome, rotulos) in enumerate(CODIGOS.items()):
+            # Partida sem tick ainda: código -1, sem rótulo
+            resultado[nome] = np.array(rotulos + (None,), dtype=object)[codigos[:, i]]
+        return resultado
+
+    def partida(self, id_partida):
+        """Estado atual de uma partida (dict) ou None"""
+        vaga = self.vaga(id_partida)
+        if vaga is None:
+            return None
+        valores, codigos, ticks, particoes = self._ler([vaga])
+        resultado = {'id_partida': str(id_partida), 'particao': int(particoes[0]), 'ticks': int(ticks[0]),
+                     'under_inicial': float(self.under_inicial[vaga]), 'under_final': float(self.under_final[vaga])}
+        resultado.update(zip(COLUNAS, valores[0].tolist()))
+        for i, (nome, rotulos) in enumerate(CODIGOS.items()):
+            resultado[nome] = rotulos[codigos[0, i]] if codigos[0, i] >= 0 else None
+        return resultado
+
+    def carga(self):
+        """Carga de cada partição: partidas, ticks, lotes, tempo ocupado e ocupação"""
+        agora = time.time()
+        resultado = []
+        for particao, linha in enumerate(self.cargas.tolist()):
+            dados = dict(zip(COLUNAS_CARGA, linha))
+            decorrido = agora - dados['inicio'] if dados['inicio'] else 0
+            resultado.append({
+                'particao': particao,
+                'pid': int(dados['pid']),
+                'partidas': int(dados['partidas']),
+                'ticks': int(dados['ticks']),
+                'lotes': int(dados['lotes']),
+                'ocupado_s': round(dados['ocupado_s'], 3),
+                'ocupacao': round(dados['ocupado_s'] / decorrido, 3) if decorrido > 0 else 0.0
+            })
+        return resultado
+
+
+def _trabalhador(nome, particao, entrada, saida, parametros):
+    """Laço de uma partição: aplica os comandos da sua fila na memória compartilhada"""
+    memoria = MemoriaMonitor.anexar(nome, desregistrar=False)
+    carga = memoria.cargas[particao]
+    carga[_CARGA['inicio']] = time.time()
+    carga[_CARGA['pid']] = multiprocessing.current_process().pid
+    try:
+        while True:
+            comando = entrada.get()
+            if comando is None:
+                return
+            inicio = time.perf_counter()
+            tipo, dados = comando
+            if tipo == 'ticks':
+                memoria.processar(dados)
+                carga[_CARGA['ticks']] += len(dados)
+                carga[_CARGA['lotes']] += 1
+            elif tipo == 'iniciar':
+                memoria.iniciar(dados[0], dados[1], parametros)
+            elif tipo == 'encerrar':
+                memoria.limpar(dados)
+                saida.put(('liberadas', particao, dados))
+            elif tipo == 'sincronizar':
+                saida.put(('sincronizado', particao, dados))
+            carga[_CARGA['ocupado_s']] += time.perf_counter() - inicio
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        saida.put(('erro', particao, traceback.format_exc()))
+    finally:
+        del carga
+        memoria.fechar()
+
+
+class CoordenadorMonitor:
+    """Distribui as partidas ao vivo entre processos trabalhadores"""
+
+    def __init__(self, processos=PROCESSOS, capacidade=CAPACIDADE, parametros=None,
+                 tolerancia=TOLERANCIA, nome=None):
+        self.processos = processos
+        self.tolerancia = tolerancia
+        self.memoria = MemoriaMonitor.criar(capacidade, processos, nome)
+        self._vagas = {}
+        self._livres = list(range(capacidade - 1, -1, -1))
+        self._por_particao = [set() for _ in range(processos)]
+        self._sincronizacoes = itertools.count(1)
+        self._saida = multiprocessing.Queue()
+        self._filas = [multiprocessing.Queue(FILA_MAXIMA) for _ in range(processos)]
+        self._trabalhadores = [
+            multiprocessing.Process(
+                target=_trabalhador, args=(self.nome, particao, fila, self._saida, parametros),
+                name=f'monitor-particao-{particao}', daemon=True
+            )
+            for particao, fila in enumerate(self._filas)
+        ]
+        for trabalhador in self._trabalhadores:
+            trabalhador.start()
+
+    @property
+    def nome(self):
+        return self.memoria.nome
+
+    def __len__(self):
+        return len(self._vagas)
+
+    def __contains__(self, id_partida):
+        return id_partida in self._vagas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def _tratar(self, mensagem):
+        tipo, particao, dados = mensagem
+        if tipo == 'erro':
+            raise RuntimeError(f"Partição {particao} falhou:\n{dados}")
+        if tipo == 'liberadas':
+            self.memoria.particao[dados] = -1
+            self._livres.extend(dados.tolist())
+
+    def _coletar(self):
+        """Trata as respostas já disponíveis dos trabalhadores, sem esperar"""
+        while True:
+            try:
+                mensagem = self._saida.get_nowait()
+            except queue.Empty:
+                return
+            self._tratar(mensagem)
+
+    def sincronizar(self, particoes=None):
+        """Espera as partições terminarem tudo o que já foi enviado a elas"""
+        pendentes = set()
+        for particao in range(self.processos) if particoes is None else particoes:
+            token = next(self._sincronizacoes)
+            self._filas[particao].put(('sincronizar', token))
+            pendentes.add((particao, token))
+        while pendentes:
+            try:
+                mensagem = self._saida.get(timeout=TEMPO_RESPOSTA)
+            except queue.Empty:
+                mortos = [t.name for t in self._trabalhadores if not t.is_alive()]
+                if mortos:
+                    raise RuntimeError(f"Trabalhadores encerrados: {', '.join(mortos)}") from None
+                continue
+            self._tratar(mensagem)
+            if mensagem[0] == 'sincronizado':
+                pendentes.discard(mensagem[1:])
+
+    def _atualizar_carga(self):
+        self.memoria.cargas[:, _CARGA['partidas']] = [len(vagas) for vagas in self._por_particao]
+
+    def iniciar_partidas(self, ids_partidas, unders_iniciais):
+        """Aloca vagas na partição com menos partidas; as curvas são geradas pelos trabalhadores
+
+        ValueError (sem alocar nada) se faltar vaga ou se algum id passar de
+        TAMANHO_ID bytes em UTF-8.
+        """
+        self._coletar()
+        novas = [(str(i), float(u)) for i, u in zip(ids_partidas, unders_iniciais) if str(i) not in self._vagas]
+        if len(novas) > len(self._livres):
+            raise ValueError(f"Limite de {self.memoria.capacidade} partidas acompanhadas atingido")
+        longos = [id_partida for id_partida, _ in novas if len(id_partida.encode()) > TAMANHO_ID]
+        if longos:
+            raise ValueError(f"id_partida com mais de {TAMANHO_ID} bytes em UTF-8: {longos[0]!r}")
+
+        por_particao = [([], []) for _ in range(self.processos)]
+        for id_partida, under_inicial in novas:
+            particao = min(range(self.processos), key=lambda p: len(self._por_particao[p]))
+            vaga = self._livres.pop()
+            self._vagas[id_partida] = vaga
+            self._por_particao[particao].add(vaga)
+            self.memoria.ids[vaga] = id_partida.encode()
+            self.memoria.particao[vaga] = particao
+            self.memoria.situacao[vaga] = INICIANDO
+            por_particao[particao][0].append(vaga)
+            por_particao[particao][1].append(under_inicial)
+        for particao, (vagas, unders) in enumerate(por_particao):
+            if vagas:
+                self._filas[particao].put(('iniciar', (np.array(vagas, dtype=np.intp), unders)))
+        self._atualizar_carga()
+
+    def iniciar_partida(self, id_partida, under_inicial):
+        self.iniciar_partidas([id_partida], [under_inicial])
+
+    def processar_lote(self, ticks):
+        """Envia (id_partida, minuto, under, over) às partições donas
+
+        O processamento é assíncrono; ticks de partidas não iniciadas são
+        ignorados. Devolve quantos foram enviados.
+        """
+        self._coletar()
+        vagas = self._vagas
+        linhas = [
+            (vagas[i], minuto, under, math.nan if over is None else over)
+            for i, minuto, under, over in ticks if i in vagas
+        ]
+        if not linhas:
+            return 0
+        dados = np.array(linhas, dtype=np.float64)
+        donos = self.memoria.particao[dados[:, 0].astype(np.intp)]
+        ordem = np.argsort(donos, kind='stable')
+        cortes = np.searchsorted(donos[ordem], np.arange(1, self.processos))
+        for particao, parte in enumerate(np.split(dados[ordem], cortes)):
+            if len(parte):
+                self._filas[particao].put(('ticks', parte))
+        return len(linhas)
+
+    def processar_tick(self, id_partida, minuto, under_atual, over_atual):
+        return self.processar_lote([(id_partida, minuto, under_atual, over_atual)])
+
+    def encerrar_partidas(self, ids_partidas, rebalancear=True):
+        """Libera as vagas (depois que a partição processa o que já recebeu) e rebalanceia"""
+        por_particao = {}
+        for id_partida in ids_partidas:
+            vaga = self._vagas.pop(str(id_partida), None)
+            if vaga is None:
+                continue
+            particao = int(self.memoria.particao[vaga])
+            self._por_particao[particao].discard(vaga)
+            por_particao.setdefault(particao, []).append(vaga)
+        for particao, vagas in por_particao.items():
+            self._filas[particao].put(('encerrar', np.array(vagas, dtype=np.intp)))
+        if rebalancear and por_particao:
+            self.rebalancear()
+        self._atualizar_carga()
+        return sum(len(vagas) for vagas in por_particao.values())
+
+    def encerrar_partida(self, id_partida):
+        return self.encerrar_partidas([id_partida]) == 1
+
+    def rebalancear(self):
+        """Move partidas da partição mais cheia para a mais vazia; devolve quantas moveu
+
+        Antes de trocar a dona, a partição de origem termina os ticks que já
+        recebeu, para que dois trabalhadores nunca escrevam na mesma vaga.
+        """
+        movidas = 0
+        while True:
+            contagens = [len(vagas) for vagas in self._por_particao]
+            origem = contagens.index(max(contagens))
+            destino = contagens.index(min(contagens))
+            if contagens[origem] - contagens[destino] <= self.tolerancia:
+                break
+            quantidade = (contagens[origem] - contagens[destino]) // 2
+            self.sincronizar([origem])
+            vagas = [self._por_particao[origem].pop() for _ in range(quantidade)]
+            self.memoria.particao[vagas] = destino
+            self._por_particao[destino].update(vagas)
+            movidas += quantidade
+        self._atualizar_carga()
+        return movidas
+
+    def estado(self, id_partida):
+        """Estado atual da partida lido da memória compartilhada (ver MemoriaMonitor.partida)"""
+        return self.memoria.partida(id_partida)
+
+    def carga(self):
+        """Carga por partição, com a profundidade da fila e se o processo está vivo"""
+        self._coletar()
+        carga = self.memoria.carga()
+        for dados, fila, trabalhador in zip(carga, self._filas, self._trabalhadores):
+            dados['fila'] = fila.qsize()
+            dados['vivo'] = trabalhador.is_alive()
+        return carga
+
+    def fechar(self):
+        for fila, trabalhador in zip(self._filas, self._trabalhadores):
+            # Fila cheia de um trabalhador morto ou travado: ele é terminado abaixo
+            if trabalhador.is_alive():
+                try:
+                    fila.put(None, timeout=TEMPO_RESPOSTA)
+                except queue.Full:
+                    pass
+        for trabalhador in self._trabalhadores:
+            trabalhador.join(timeout=5)
+            if trabalhador.is_alive():
+                trabalhador.terminate()
+                trabalhador.join()
+        for fila in self._filas + [self._saida]:
+            # Sem leitor, o que sobrou na fila não precisa ser entregue
+            fila.cancel_join_thread()
+            fila.close()
+        self.memoria.fechar()
+
+
+def main(argv=None):
+    from analisador.ingestao import FonteReplay, IngestorTicks
+
+    parser = argparse.ArgumentParser(description='Monitor ao vivo distribuído entre processos')
+    parser.add_argument('arquivo', help='replay CSV (python -m analisador.ingestao sintetico)')
+    parser.add_argument('--processos', type=int, default=PROCESSOS)
+    parser.add_argument('--capacidade', type=int, default=CAPACIDADE)
+    parser.add_argument('--velocidade', type=float, default=0, help='0 = o mais rápido possível')
+    parser.add_argument('--nome', default=NOME_PADRAO, help='nome do segmento de memória compartilhada')
+    parser.add_argument('--manter', action='store_true', help='mantém o segmento até Ctrl+C')
+    args = parser.parse_args(argv)
+
+    with CoordenadorMonitor(args.processos, args.capacidade, nome=args.nome) as coordenador:
+        resumo = asyncio.run(IngestorTicks(FonteReplay(args.arquivo, args.velocidade), coordenador).executar())
+        coordenador.sincronizar()
+        for nome, valor in resumo.items():
+            print(f"{nome}: {valor}")
+        for dados in coordenador.carga():
+            print(f"🖥️ partição {dados['particao']}: {dados['partidas']} partidas, {dados['ticks']} ticks, "
+                  f"{dados['lotes']} lotes, ocupação {dados['ocupacao']:.0%}")
+        if args.manter:
+            print(f"📡 Segmento '{coordenador.nome}' disponível (ANALISADOR_MONITOR={coordenador.nome}); Ctrl+C encerra")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""Núcleo de cálculo do analisador, sem dependência de Streamlit ou pandas"""
+import math
+
+from analisador.lote import MINUTOS, gerar_curvas_lote
+from analisador.parametros import PARAMETROS
+from analisador.placar import projetar, total_gols
+from analisador.resultado import ResultadoCurva, como_resultado
+
+
+class AnalisadorApostasUnderOver:
+    def __init__(self, parametros=None):
+        # Parâmetros do modelo (padrão: os carregados na inicialização)
+        self.parametros = parametros or PARAMETROS
+    
+    def calcular_under_final_esperado(self, under_inicial):
+        """Cálculo mais equilibrado do Under final"""
+        # Faixas em ordem decrescente: (a partir de, multiplicador, piso)
+        for limite, multiplicador, piso in self.parametros.faixas_under_final:
+            if under_inicial >= limite:
+                return max(piso, under_inicial * multiplicador)
+        multiplicador, piso = self.parametros.faixa_padrao
+        return max(piso, under_inicial * multiplicador)
+    
+    def calcular_over_baseado_no_under(self, under_atual):
+        """Cálculo seguro do Over"""
+        try:
+            under_atual = max(under_atual, 1.01)
+            prob_under = 1 / under_atual
+            prob_over = 1 - prob_under
+            
+            if prob_over <= 0.01:
+                return 15.0
+            
+            over_atual = 1 / prob_over
+            return min(over_atual, 15.0)
+        except:
+            return 15.0
+    
+    def criar_curva_natural(self, under_inicial, under_final):
+        """NOVA: Cria curva natural baseada em função matemática"""
+        
+        # Calcula a diferença total que precisa ser distribuída
+        diferenca_total = under_inicial - under_final
+        
+        # Define velocidades de queda por período (padrão: 25/20/20/15/12/8%)
+        velocidades = dict(zip(
+            ['periodo_1_15', 'periodo_15_30', 'periodo_30_45', 'periodo_45_60', 'periodo_60_75', 'periodo_75_90'],
+            self.parametros.velocidades
+        ))
+        
+        # Calcula pontos de controle
+        pontos = {}
+        valor_atual = under_inicial
+        
+        # Minuto 1
+        pontos[1] = under_inicial
+        
+        # Minuto 15
+        queda_15 = diferenca_total * velocidades['periodo_1_15']
+        valor_atual -= queda_15
+        pontos[15] = max(valor_atual, under_final)
+        
+        # Minuto 30
+        queda_30 = diferenca_total * velocidades['periodo_15_30']
+        valor_atual -= queda_30
+        pontos[30] = max(valor_atual, under_final)
+        
+        # Minuto 45
+        queda_45 = diferenca_total * velocidades['periodo_30_45']
+        valor_atual -= queda_45
+        pontos[45] = max(valor_atual, under_final)
+        
+        # Minuto 46 (pequeno boost no início do 2º tempo)
+        boost_2tempo = (pontos[45] - under_final) * 0.95  # Pequena aceleração
+        pontos[46] = max(pontos[45] - (pontos[45] - under_final) * 0.05, under_final)
+        
+        # Minuto 60
+        queda_60 = diferenca_total * velocidades['periodo_45_60']
+        valor_atual -= queda_60
+        pontos[60] = max(valor_atual, under_final)
+        
+        # Minuto 75
+        queda_75 = diferenca_total * velocidades['periodo_60_75']
+        valor_atual -= queda_75
+        pontos[75] = max(valor_atual, under_final)
+        
+        # Minuto 85 (penúltimo ponto)
+        queda_85 = diferenca_total * velocidades['periodo_75_90'] * 0.7  # 70% da queda final
+        valor_atual -= queda_85
+        pontos[85] = max(valor_atual, under_final)
+        
+        # Minuto 90 (final)
+        pontos[90] = under_final
+        
+        # VERIFICAÇÃO: Garante progressão decrescente
+        minutos_ordenados = sorted(pontos.keys())
+        for i in range(1, len(minutos_ordenados)):
+            min_atual = minutos_ordenados[i]
+            min_anterior = minutos_ordenados[i-1]
+            
+            if pontos[min_atual] >= pontos[min_anterior]:
+                # Corrige forçando uma pequena queda
+                pontos[min_atual] = pontos[min_anterior] * 0.98
+                pontos[min_atual] = max(pontos[min_atual], under_final)
+        
+        return pontos
+    
+    def interpolar_suave(self, minuto, pontos_curva):
+        """Interpolação suave que mantém progressão natural"""
+        if minuto in pontos_curva:
+            return pontos_curva[minuto]
+        
+        minutos_ordenados = sorted(pontos_curva.keys())
+        
+        # Casos extremos
+        if minuto <= minutos_ordenados[0]:
+            return pontos_curva[minutos_ordenados[0]]
+        if minuto >= minutos_ordenados[-1]:
+            return pontos_curva[minutos_ordenados[-1]]
+        
+        # Encontra segmento para interpolação
+        for i in range(len(minutos_ordenados) - 1):
+            min1 = minutos_ordenados[i]
+            min2 = minutos_ordenados[i + 1]
+            
+            if min1 <= minuto <= min2:
+                val1 = pontos_curva[min1]
+                val2 = pontos_curva[min2]
+                
+                # Interpolação com curva suave (não linear)
+                fator = (minuto - min1) / (min2 - min1)
+                
+                # Aplica suavização exponencial para evitar quedas muito lineares
+                fator_suave = 1 - math.exp(-2 * fator)  # Curva exponencial suave
+                
+                valor = val1 + (val2 - val1) * fator_suave
+                
+                # Garante que não suba
+                return min(valor, val1)
+        
+        return pontos_curva[minutos_ordenados[-1]]
+    
+    def gerar_curva_equilibrio_90min(self, under_inicial, over_inicial, ao_criar_pontos=None):
+        """Gera curva natural e equilibrada
+
+        ao_criar_pontos, se informado, recebe o dict de pontos de controle
+        (minuto -> under) antes da geração minuto a minuto.
+        
+        Devolve um ResultadoCurva; curva[i] continua dando o dict
+        {'minuto', 'under', 'over'} de antes.
+        """
+        # Debug: repassa os pontos de controle a quem pediu
+        if ao_criar_pontos is not None:
+            under_final = self.calcular_under_final_esperado(under_inicial)
+            ao_criar_pontos(self.criar_curva_natural(under_inicial, under_final))
+        
+        # Mesmos valores do cálculo minuto a minuto (interpolar_suave), em lote
+        curvas = gerar_curvas_lote([under_inicial], self.parametros)
+        return ResultadoCurva(MINUTOS, curvas['under'][0], curvas['over'][0])
+    
+    def gerar_curvas_equilibrio_lote(self, unders_iniciais):
+        """Gera várias curvas de uma vez: matrizes (N, 90) de under e over"""
+        return gerar_curvas_lote(unders_iniciais, self.parametros)
+    
+    def analisar_divergencia(self, under_atual_real, under_esperado, minuto):
+        """Análise de divergência"""
+        if under_esperado <= 0:
+            under_esperado = 1.01
+            
+        divergencia_percent = ((under_atual_real - under_esperado) / under_esperado) * 100
+        
+        if divergencia_percent >= 15:
+            status = "🔥 OPORTUNIDADE ALTA"
+            explicacao = "Odd atual muito ACIMA da projetada"
+            recomendacao = "✅ EXCELENTE momento para entrada Under"
+            risco = "Baixo"
+        elif divergencia_percent >= 8:
+            status = "💰 OPORTUNIDADE MÉDIA"
+            explicacao = "Odd atual ACIMA da projetada"
+            recomendacao = "✅ Bom momento para entrada Under"
+            risco = "Médio"
+        elif divergencia_percent >= -8:
+            status = "⚖️ EQUILIBRADO"
+            explicacao = "Odd atual próxima da projetada"
+            recomendacao = "⚠️ Entrada neutra"
+            risco = "Médio"
+        elif divergencia_percent >= -15:
+            status = "⚠️ CUIDADO"
+            explicacao = "Odd atual ABAIXO da projetada"
+            recomendacao = "❌ Entrada Under arriscada"
+            risco = "Alto"
+        else:
+            status = "🚨 RISCO ALTO"
+            explicacao = "Odd atual muito ABAIXO da projetada"
+            recomendacao = "❌ EVITAR entrada Under"
+            risco = "Muito Alto"
+        
+        return {
+            'status': status,
+            'divergencia_percent': round(divergencia_percent, 1),
+            'explicacao': explicacao,
+            'recomendacao': recomendacao,
+            'risco': risco
+        }
+    
+    def calcular_taxa_queda(self, under_inicial, under_atual, minutos):
+        if minutos == 0:
+            return 0
+        return (under_inicial - under_atual) / (under_inicial * minutos)
+    
+    def classificar_ritmo(self, taxa_queda):
+        if taxa_queda >= 0.015:
+            return "DESACELERADA ⏰", "Ritmo lento, partida conservadora"
+        else:
+            return "ACELERADA ⚡", "Ritmo rápido, partida ofensiva"
+    
+    def calcular_queda_restante(self, under_atual, under_final):
+        """Percentual de queda que ainda falta até o Under final"""
+        return ((under_atual - under_final) / under_atual) * 100 if under_atual > under_final else 0
+    
+    def classificar_potencial(self, queda_restante):
+        if queda_restante > 35:
+            return "🔥 MUITO ALTO"
+        elif queda_restante > 25:
+            return "💰 ALTO"
+        elif queda_restante > 15:
+            return "⚖️ MÉDIO"
+        else:
+            return "⚠️ BAIXO"
+    
+    def analisar_distribuicao_queda(self, curva):
+        """NOVA: Analisa como a queda está distribuída"""
+        under = como_resultado(curva).under.tolist()
+        under_inicial = under[0]
+        
+        # Análise por períodos
+        periodos = {
+            '1º Tempo (1-45)': (under[0], under[44]),
+            '2º Tempo (46-90)': (under[45], under[89]),
+            'Primeiro Terço (1-30)': (under[0], under[29]),
+            'Segundo Terço (31-60)': (under[30], under[59]),
+            'Terceiro Terço (61-90)': (under[60], under[89])
+        }
+        
+        análise = {}
+        for periodo, (valor_inicio, valor_fim) in periodos.items():
+            queda = valor_inicio - valor_fim
+            percentual = (queda / under_inicial) * 100
+            análise[periodo] = {
+                'queda_absoluta': round(queda, 2),
+                'queda_percentual': round(percentual, 1)
+            }
+        
+        return análise
+    
+    def analisar_melhor_entrada_under(self, curva):
+        melhores_entradas = []
+        under = como_resultado(curva).under.tolist()
+        
+        for i in range(10, 70, 5):  # Analisa a cada 5 minutos até o minuto 70
+            if i + 15 < len(under):  # Janela de 15 minutos
+                odd_entrada = under[i]
+                odd_depois = under[i + 15]
+                
+                if odd_entrada > 1.30 and odd_depois > 1.10:
+                    queda_percent = ((odd_entrada - odd_depois) / odd_entrada) * 100
+                    
+                    if queda_percent >= 8:  # Mínimo 8% de queda
+                        melhores_entradas.append({
+                            'minuto': i + 1,
+                            'odd_entrada': odd_entrada,
+                            'odd_apos_15min': odd_depois,
+                            'queda_percent': round(queda_percent, 1),
+                            'potencial_lucro': f"{queda_percent:.1f}%"
+                        })
+        
+        return sorted(melhores_entradas, key=lambda x: x['queda_percent'], reverse=True)[:3]
+    
+    def analisar_melhor_entrada_over(self, curva):
+        melhores_entradas = []
+        over = como_resultado(curva).over.tolist()
+        
+        for i in range(65, 85, 3):  # Foco nos últimos 25 minutos
+            if i < len(over):
+                odd_over = over[i]
+                
+                if 1.8 <= odd_over <= 12.0:  # Range mais equilibrado
+                    melhores_entradas.append({
+                        'minuto': i + 1,
+                        'odd_entrada': odd_over,
+                        'estabilidade': 'Alta' if odd_over <= 6.0 else 'Média'
+                    })
+        
+        return melhores_entradas[:3]
+    
+    def projetar_restante_equilibrio(self, under_inicial, under_atual, minuto_atual, placar):
+        under_final = self.calcular_under_final_esperado(under_inicial)
+        
+        # Com placar válido usa a família do estado (gols, minuto)
+        gols = total_gols(placar)
+        if gols is not None:
+            return ResultadoCurva(*projetar(under_final, under_atual, minuto_atual, gols))
+        
+        # Calcula quantos minutos restam
+        minutos_restantes = 90 - minuto_atual
+        diferenca_restante = under_atual - under_final
+        
+        # Taxa de queda constante para o restante
+        if minutos_restantes > 0:
+            taxa_queda_restante = diferenca_restante / minutos_restantes
+        else:
+            taxa_queda_restante = 0
+        
+        # Cria projeção minuto a minuto
+        minutos = range(minuto_atual + 1, 91)
+        unders = []
+        overs = []
+        valor_atual = under_atual
+        
+        for minuto in minutos:
+            # Aplicar queda gradual
+            valor_atual -= taxa_queda_restante
+            valor_atual = max(valor_atual, under_final)  # Nunca abaixo do final
+            
+            over_proj = self.calcular_over_baseado_no_under(valor_atual)
+            
+            unders.append(round(valor_atual, 2))
+            overs.append(round(over_proj, 3))
+        
+        return ResultadoCurva(minutos, unders, overs)
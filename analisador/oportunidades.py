@@ -0,0 +1,233 @@
+"""Ranking de oportunidades entre partidas ao vivo
+
+IndiceOportunidades mantém as partidas ordenadas por uma pontuação de
+uma casa decimal (como divergencia_percent). Cada valor distinto é um
+balde (chave inteira pontuação * 10), e as chaves ficam num heap de
+máximo com remoção preguiçosa:
+  * atualizar: O(1) num balde que já existe, O(log n) com heappush
+    quando a chave é nova (n = chaves distintas, sem limite de faixa);
+  * remover: O(1); o balde vazio sai do dict e a chave fica no heap até
+    ser descartada. Quando as chaves obsoletas passam das válidas o heap
+    é refeito, O(n) amortizado sobre as remoções;
+  * top(k): percorre o heap em ordem sem desmontá-lo (uma fronteira de
+    índices), O(m log m) para os m baldes visitados até juntar k
+    partidas. Empates saem na ordem de chegada ao balde.
+
+RadarOportunidades liga dois índices a um MonitorPartidas:
+  * 'divergencia': divergencia_percent do último tick;
+  * 'entrada': queda da melhor janela de entrada em Under ainda por vir
+    (analisar_melhor_entrada_under, calculada uma vez por partida).
+Também dispara alertas quando a partida cruza um limiar de status
+(LIMIARES_DIVERGENCIA) entrando ou saindo de um dos status_alerta.
+"""
+import heapq
+import math
+from collections import deque
+
+from analisador.lote import MINUTOS, STATUS_DIVERGENCIA, calcular_over_lote, gerar_curvas_lote
+from analisador.resultado import ResultadoCurva
+
+CRITERIOS = ('divergencia', 'entrada')
+
+# Índices em STATUS_DIVERGENCIA que geram alerta ao entrar ou sair:
+# oportunidade alta, oportunidade média e risco alto
+STATUS_ALERTA = (0, 1, 4)
+
+# Status de partida recém-iniciada (under atual = under esperado)
+_EQUILIBRADO = STATUS_DIVERGENCIA.index("⚖️ EQUILIBRADO")
+_FAIXAS = {status: i for i, status in enumerate(STATUS_DIVERGENCIA)}
+
+
+class IndiceOportunidades:
+    """Partidas ordenadas por pontuação, em baldes de uma casa decimal"""
+
+    def __init__(self, escala=10):
+        self.escala = escala
+        self._heap = []
+        self._no_heap = set()
+        self._baldes = {}
+        self._posicao = {}
+
+    def __len__(self):
+        return len(self._posicao)
+
+    def __contains__(self, id_partida):
+        return id_partida in self._posicao
+
+    def atualizar(self, id_partida, pontuacao):
+        if not math.isfinite(pontuacao):
+            raise ValueError(f'pontuação inválida para {id_partida}: {pontuacao}')
+        chave = round(pontuacao * self.escala)
+        anterior = self._posicao.get(id_partida)
+        if anterior == chave:
+            return
+        if anterior is not None:
+            self._retirar(id_partida, anterior)
+        balde = self._baldes.get(chave)
+        if balde is None:
+            balde = self._baldes[chave] = {}
+            # Chave obsoleta ainda no heap volta a valer sem novo push
+            if chave not in self._no_heap:
+                heapq.heappush(self._heap, -chave)
+                self._no_heap.add(chave)
+        balde[id_partida] = None
+        self._posicao[id_partida] = chave
+
+    def remover(self, id_partida):
+        chave = self._posicao.pop(id_partida, None)
+        if chave is not None:
+            self._retirar(id_partida, chave)
+
+    def _retirar(self, id_partida, chave):
+        balde = self._baldes[chave]
+        del balde[id_partida]
+        if not balde:
+            del self._baldes[chave]
+            if len(self._no_heap) > 2 * len(self._baldes) + 64:
+                self._refazer_heap()
+
+    def _refazer_heap(self):
+        """Descarta as chaves obsoletas do heap"""
+        self._heap = [-chave for chave in self._baldes]
+        heapq.heapify(self._heap)
+        self._no_heap = set(self._baldes)
+
+    def _chaves_decrescentes(self):
+        """Chaves válidas da maior para a menor; só as obsoletas do topo saem do heap"""
+        heap = self._heap
+        while heap and -heap[0] not in self._baldes:
+            self._no_heap.discard(-heapq.heappop(heap))
+        if not heap:
+            return
+        fronteira = [(heap[0], 0)]
+        while fronteira:
+            valor, i = heapq.heappop(fronteira)
+            if -valor in self._baldes:
+                yield -valor
+            for filho in (2 * i + 1, 2 * i + 2):
+                if filho < len(heap):
+                    heapq.heappush(fronteira, (heap[filho], filho))
+
+    def pontuacao(self, id_partida):
+        chave = self._posicao.get(id_partida)
+        return None if chave is None else chave / self.escala
+
+    def top(self, k=10, minimo=None):
+        """[(id_partida, pontuacao)] das k maiores pontuações (>= minimo, se dado)"""
+        resultado = []
+        if k <= 0:
+            return resultado
+        piso = None if minimo is None else round(minimo * self.escala)
+        for chave in self._chaves_decrescentes():
+            if piso is not None and chave < piso:
+                break
+            pontuacao = chave / self.escala
+            for id_partida in self._baldes[chave]:
+                resultado.append((id_partida, pontuacao))
+                if len(resultado) == k:
+                    return resultado
+        return resultado
+
+
+class RadarOportunidades:
+    """Top-k de oportunidades e alertas de status de um MonitorPartidas"""
+
+    def __init__(self, monitor, status_alerta=STATUS_ALERTA, max_alertas=1000):
+        self.monitor = monitor
+        self.indices = {criterio: IndiceOportunidades() for criterio in CRITERIOS}
+        self.status_alerta = frozenset(status_alerta)
+        self.alertas = deque(maxlen=max_alertas)
+        self.total_alertas = 0
+        self._faixas = {}
+        self._entradas = {}
+        self._ouvintes = []
+        monitor.adicionar_ouvinte(self._ao_tick)
+        monitor.adicionar_ouvinte_encerramento(self.remover)
+
+    def adicionar_ouvinte(self, ouvinte):
+        """ouvinte(alerta) é chamado a cada alerta disparado"""
+        self._ouvintes.append(ouvinte)
+
+    def _entradas_partida(self, estado):
+        """Três melhores janelas de entrada em Under da curva da partida"""
+        curva = estado.curva
+        if curva.shape[0] != len(MINUTOS):
+            # Curva por segundo (GradeTemporal): usa a de 90 minutos
+            curva = gerar_curvas_lote([estado.under_inicial], self.monitor.analisador.parametros)['under'][0]
+        resultado = ResultadoCurva(MINUTOS, curva, calcular_over_lote(curva))
+        return self.monitor.analisador.analisar_melhor_entrada_under(resultado)
+
+    def proxima_entrada(self, id_partida):
+        """Melhor janela de entrada que ainda não começou (None se não houver)"""
+        estado = self.monitor.partidas[id_partida]
+        entradas = self._entradas.get(id_partida, ())
+        # As entradas vêm ordenadas pela queda: a primeira futura é a melhor
+        return next((e for e in entradas if e['minuto'] > estado.minuto), None)
+
+    def _ao_tick(self, estado):
+        id_partida = estado.id_partida
+        divergencia = estado.divergencia
+        self.indices['divergencia'].atualizar(id_partida, divergencia['divergencia_percent'])
+
+        if id_partida not in self._entradas:
+            self._entradas[id_partida] = self._entradas_partida(estado)
+        entrada = self.proxima_entrada(id_partida)
+        if entrada is None:
+            self.indices['entrada'].remover(id_partida)
+        else:
+            self.indices['entrada'].atualizar(id_partida, entrada['queda_percent'])
+
+        faixa = _FAIXAS[divergencia['status']]
+        anterior = self._faixas.get(id_partida, _EQUILIBRADO)
+        self._faixas[id_partida] = faixa
+        if faixa != anterior and (faixa in self.status_alerta or anterior in self.status_alerta):
+            self._alertar(estado, anterior, faixa)
+
+    def _alertar(self, estado, anterior, faixa):
+        self.total_alertas += 1
+        alerta = {
+            'sequencia': self.total_alertas,
+            'id_partida': estado.id_partida,
+            'minuto': estado.minuto,
+            'de': STATUS_DIVERGENCIA[anterior],
+            'para': STATUS_DIVERGENCIA[faixa],
+            'direcao': '⬆️' if faixa < anterior else '⬇️',
+            'divergencia_percent': estado.divergencia['divergencia_percent'],
+            'under_atual': estado.under_atual,
+            'under_esperado': estado.under_esperado
+        }
+        self.alertas.append(alerta)
+        for ouvinte in self._ouvintes:
+            ouvinte(alerta)
+
+    def alertas_desde(self, sequencia=0):
+        """Alertas com sequência maior que `sequencia` (os mais antigos podem ter saído do histórico)"""
+        return [alerta for alerta in self.alertas if alerta['sequencia'] > sequencia]
+
+    def remover(self, id_partida):
+        for indice in self.indices.values():
+            indice.remover(id_partida)
+        self._faixas.pop(id_partida, None)
+        self._entradas.pop(id_partida, None)
+
+    def _linha(self, id_partida, pontuacao):
+        estado = self.monitor.partidas[id_partida]
+        entrada = self.proxima_entrada(id_partida)
+        return {
+            'id_partida': id_partida,
+            'pontuacao': pontuacao,
+            'minuto': estado.minuto,
+            'placar': estado.placar,
+            'under_atual': estado.under_atual,
+            'under_esperado': estado.under_esperado,
+            'divergencia_percent': estado.divergencia['divergencia_percent'],
+            'status': estado.divergencia['status'],
+            'entrada_minuto': entrada['minuto'] if entrada else None,
+            'entrada_queda_percent': entrada['queda_percent'] if entrada else None
+        }
+
+    def top(self, k=10, criterio='divergencia', minimo=None):
+        """As k partidas com maior pontuação no critério, com o resumo de cada uma"""
+        if criterio not in self.indices:
+            raise ValueError(f"critério deve ser um de: {', '.join(CRITERIOS)}")
+        return [self._linha(id_partida, pontuacao) for id_partida, pontuacao in self.indices[criterio].top(k, minimo)]
@@ -0,0 +1,92 @@
+"""Parâmetros do modelo de curvas (faixas do Under final e velocidades)
+
+Os valores padrão são os calibrados à mão originalmente. Um arquivo
+versionado gerado por analisador.calibracao pode substituí-los: ele é
+lido na inicialização a partir de ANALISADOR_PARAMETROS ou, se existir,
+de dados/parametros_modelo.json.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+ParametrosModelo = namedtuple('ParametrosModelo', 'faixas_under_final faixa_padrao velocidades versao')
+ParametrosModelo.__doc__ = """Parâmetros de calcular_under_final_esperado e criar_curva_natural
+
+faixas_under_final: ((a partir de, multiplicador, piso), ...) em ordem decrescente
+faixa_padrao: (multiplicador, piso) abaixo da última faixa
+velocidades: fração da queda total em 1-15, 15-30, 30-45, 45-60, 60-75, 75-90
+"""
+
+PARAMETROS_PADRAO = ParametrosModelo(
+    faixas_under_final=(
+        (50, 0.035, 1.50),
+        (30, 0.045, 1.40),
+        (20, 0.055, 1.30),
+        (15, 0.070, 1.25),
+        (10, 0.110, 1.20),
+        (7, 0.150, 1.15),  # 7 × 0.15 = 1.05, limitado a 1.15
+        (5, 0.200, 1.10),
+        (3, 0.300, 1.05),
+    ),
+    faixa_padrao=(0.500, 1.03),
+    velocidades=(0.25, 0.20, 0.20, 0.15, 0.12, 0.08),
+    versao=0
+)
+
+ARQUIVO_PADRAO = os.path.join('dados', 'parametros_modelo.json')
+
+
+def para_dict(parametros):
+    return {
+        'versao': parametros.versao,
+        'faixas_under_final': [list(faixa) for faixa in parametros.faixas_under_final],
+        'faixa_padrao': list(parametros.faixa_padrao),
+        'velocidades': list(parametros.velocidades)
+    }
+
+
+def de_dict(dados):
+    return ParametrosModelo(
+        faixas_under_final=tuple(tuple(faixa) for faixa in dados['faixas_under_final']),
+        faixa_padrao=tuple(dados['faixa_padrao']),
+        velocidades=tuple(dados['velocidades']),
+        versao=dados.get('versao', 0)
+    )
+
+
+def hash_parametros(parametros):
+    """Identificador curto dos valores (ignora o número da versão)"""
+    dados = para_dict(parametros)
+    del dados['versao']
+    return hashlib.sha256(json.dumps(dados, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def carregar_parametros(caminho=None):
+    """Lê um arquivo de parâmetros; sem arquivo, devolve PARAMETROS_PADRAO"""
+    if caminho is None:
+        caminho = os.environ.get('ANALISADOR_PARAMETROS', ARQUIVO_PADRAO)
+    if not os.path.exists(caminho):
+        return PARAMETROS_PADRAO
+    with open(caminho) as arquivo:
+        return de_dict(json.load(arquivo))
+
+
+def salvar_parametros(parametros, caminho=ARQUIVO_PADRAO, **extras):
+    """Grava os parâmetros com a próxima versão e o hash dos valores"""
+    anterior = carregar_parametros(caminho) if os.path.exists(caminho) else None
+    versao = (anterior.versao if anterior else 0) + 1
+    parametros = parametros._replace(versao=versao)
+    dados = para_dict(parametros)
+    dados['hash'] = hash_parametros(parametros)
+    dados.update(extras)
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    with open(caminho, 'w') as arquivo:
+        json.dump(dados, arquivo, indent=2)
+    return parametros
+
+
+# Parâmetros em uso, carregados uma vez na inicialização
+PARAMETROS = carregar_parametros()
@@ -0,0 +1,98 @@
+"""Projeções condicionadas ao placar
+
+O Under de um jogo em andamento é, na prática, 1 / P(sem mais gols até o
+fim): o seu logaritmo é proporcional aos gols esperados no tempo que
+falta. A projeção restante, então, leva log(under / under_final) a zero
+na proporção da intensidade de gols que ainda falta consumir, e essa
+intensidade depende do estado do jogo: um 0x0 tende a esfriar no fim,
+enquanto jogos com mais gols ficam abertos e aceleram.
+
+As famílias de projeção são pré-calculadas para cada estado (total de
+gols, minuto) numa tabela FRACOES[gols, minuto, t - 1] com a fração do
+excesso (em log) que ainda resta no minuto t. Reprojetar depois de um
+gol é uma consulta na linha do novo estado mais o ajuste ao under atual,
+sem regerar curva nenhuma.
+"""
+import re
+
+import numpy as np
+
+from analisador.lote import MINUTOS, arredondar, calcular_over_lote
+
+# Estados com 5 gols ou mais usam a mesma família
+MAX_GOLS = 5
+
+# Inclinação da intensidade de gols ao longo do jogo, por total de gols:
+# negativa esfria no fim, positiva acelera
+INCLINACOES = (-1.0, 0.0, 0.6, 1.0, 1.3, 1.5)
+
+# Peso extra dos minutos com acréscimos (45 e 90)
+PESO_ACRESCIMOS = {45: 2.0, 90: 2.5}
+
+_PLACAR = re.compile(r'^\s*(\d+)\s*[xX×:\-]\s*(\d+)\s*$')
+
+
+def ler_placar(placar):
+    """(gols_casa, gols_fora) de textos como '0x1', '2-2' ou '1 : 0'; None se inválido"""
+    if placar is None:
+        return None
+    encontrado = _PLACAR.match(str(placar))
+    if not encontrado:
+        return None
+    return int(encontrado.group(1)), int(encontrado.group(2))
+
+
+def total_gols(placar):
+    gols = ler_placar(placar)
+    return None if gols is None else sum(gols)
+
+
+def intensidades(inclinacoes=INCLINACOES):
+    """Intensidade relativa de gols por minuto (1 a 90), uma linha por estado"""
+    tempo = MINUTOS / 90
+    base = 1 + 0.4 * tempo
+    for minuto, peso in PESO_ACRESCIMOS.items():
+        base[minuto - 1] *= peso
+    return base * np.exp(np.asarray(inclinacoes, dtype=np.float64)[:, None] * tempo)
+
+
+def construir_fracoes(inclinacoes=INCLINACOES):
+    """Tabela (gols, minuto 0-90, t 1-90) da fração do excesso restante no minuto t"""
+    # restante[g, t] = intensidade dos minutos t+1..90, com restante[g, 0] = total
+    por_minuto = intensidades(inclinacoes)
+    restante = np.zeros((por_minuto.shape[0], len(MINUTOS) + 1))
+    restante[:, :-1] = np.cumsum(por_minuto[:, ::-1], axis=1)[:, ::-1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fracoes = restante[:, None, 1:] / restante[:, :, None]
+    minutos = np.arange(len(MINUTOS) + 1)
+    fracoes[:, MINUTOS[None, :] <= minutos[:, None]] = 1.0
+    return fracoes
+
+
+FRACOES = construir_fracoes()
+
+
+def fracoes(gols, minuto):
+    """Linha da família do estado (gols, minuto): view de 90 frações, sem cópia"""
+    return FRACOES[min(max(int(gols), 0), MAX_GOLS), min(max(int(minuto), 0), 90)]
+
+
+def projetar_lote(unders_finais, unders_atuais, minutos, gols):
+    """Projeções (N, 90) de under; minutos já jogados repetem o under atual"""
+    finais = np.asarray(unders_finais, dtype=np.float64)
+    atuais = np.asarray(unders_atuais, dtype=np.float64)
+    linhas = FRACOES[
+        np.clip(np.asarray(gols, dtype=np.int64), 0, MAX_GOLS),
+        np.clip(np.asarray(minutos, dtype=np.int64), 0, 90)
+    ]
+    # Under já abaixo do final fica no final, como na projeção linear
+    excesso = np.log(np.maximum(atuais / finais, 1.0))
+    return finais[:, None] * np.exp(excesso[:, None] * linhas)
+
+
+def projetar(under_final, under_atual, minuto, gols):
+    """(minutos, under, over) do minuto seguinte ao 90, arredondados como as curvas"""
+    minuto = int(minuto)
+    under = projetar_lote([under_final], [under_atual], [minuto], [gols])[0, minuto:]
+    return MINUTOS[minuto:], arredondar(under, 2), arredondar(calcular_over_lote(under), 3)
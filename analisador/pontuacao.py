@@ -0,0 +1,256 @@
+"""Pontuação em massa de arquivos de partidas, fora da interface
+
+Lê linhas (id_partida, under_inicial, minuto, under_atual, over_atual) de
+CSV ou Parquet em blocos e aplica a mesma lógica do modo "🎯 Jogo em
+Andamento": under esperado, divergência, ritmo, potencial e queda
+restante. Cada bloco é calculado de forma vetorizada e gravado antes do
+próximo ser lido, então a memória fica limitada a alguns blocos mesmo
+para arquivos de vários GB. Com --processos os blocos são distribuídos
+num pool (a ordem da saída é preservada).
+
+O minuto pode vir fracionário ou como float ("45.0", "45.7"): vale o
+minuto inteiro já iniciado, como no resto do analisador. Linhas em
+branco, sem todas as colunas ou com under_inicial, minuto ou under_atual
+vazios ou não numéricos são descartadas e contadas, sem interromper o
+arquivo.
+
+    python -m analisador.pontuacao jogos.csv pontuados.csv
+    python -m analisador.pontuacao jogos.parquet pontuados.parquet --processos 8
+
+Parquet requer pyarrow.
+"""
+import argparse
+import csv
+import io
+import itertools
+import operator
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analisador.lote import (
+    POTENCIAIS, RITMOS, STATUS_DIVERGENCIA, arredondar, calcular_queda_restante_lote,
+    calcular_taxa_queda_lote, calcular_under_final_lote, classificar_divergencia_lote,
+    classificar_potencial_lote, classificar_ritmo_lote, gerar_curvas_lote
+)
+
+COLUNAS_ENTRADA = ('id_partida', 'under_inicial', 'minuto', 'under_atual', 'over_atual')
+COLUNAS_SAIDA = (
+    'id_partida', 'minuto', 'under_atual', 'over_atual', 'under_esperado', 'divergencia_percent',
+    'status', 'taxa_queda', 'ritmo', 'under_final', 'queda_restante', 'potencial'
+)
+
+TAMANHO_BLOCO = 100000
+
+
+def _numerico(valores):
+    """Coluna como float64; valores vazios ou não numéricos viram NaN"""
+    try:
+        return np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    convertidos = np.empty(len(valores), dtype=np.float64)
+    for i, valor in enumerate(valores):
+        try:
+            convertidos[i] = float(valor)
+        except (TypeError, ValueError):
+            convertidos[i] = np.nan
+    return convertidos
+
+
+def pontuar_bloco(bloco):
+    """Pontua um bloco de colunas (dict de arrays); devolve as colunas de saída
+
+    Linhas com valores inválidos ficam de fora da saída.
+    """
+    under_inicial = _numerico(bloco['under_inicial'])
+    minuto = _numerico(bloco['minuto'])
+    under_atual = _numerico(bloco['under_atual'])
+    over_atual = _numerico(bloco['over_atual'])
+    id_partida = bloco['id_partida']
+
+    validas = np.isfinite(under_inicial) & np.isfinite(minuto) & np.isfinite(under_atual)
+    if not validas.all():
+        id_partida = np.asarray(id_partida)[validas]
+        under_inicial, minuto, under_atual, over_atual = (
+            coluna[validas] for coluna in (under_inicial, minuto, under_atual, over_atual)
+        )
+    minuto = np.floor(minuto).astype(np.int64)
+
+    # Uma curva por under_inicial distinto do bloco
+    unders, linha = np.unique(under_inicial, return_inverse=True)
+    curvas = gerar_curvas_lote(unders)['under']
+    under_esperado = curvas[linha, np.clip(minuto, 1, 90) - 1]
+
+    divergencia, status = classificar_divergencia_lote(under_atual, under_esperado)
+    taxa_queda = calcular_taxa_queda_lote(under_inicial, under_atual, minuto)
+    under_final = calcular_under_final_lote(under_inicial)
+    queda_restante = calcular_queda_restante_lote(under_atual, under_final)
+
+    return {
+        'id_partida': id_partida,
+        'minuto': minuto,
+        'under_atual': under_atual,
+        'over_atual': over_atual,
+        'under_esperado': under_esperado,
+        'divergencia_percent': divergencia,
+        'status': np.array(STATUS_DIVERGENCIA)[status],
+        'taxa_queda': arredondar(taxa_queda, 4),
+        'ritmo': np.array(RITMOS)[classificar_ritmo_lote(taxa_queda)],
+        'under_final': arredondar(under_final, 2),
+        'queda_restante': arredondar(np.maximum(queda_restante, 0), 1),
+        'potencial': np.array(POTENCIAIS)[classificar_potencial_lote(queda_restante)]
+    }
+
+
+def ler_csv(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera blocos de linhas brutas de um CSV com cabeçalho
+
+    A decodificação fica para decodificar_csv(), que roda nos processos do
+    pool; o processo principal só lê texto do disco.
+    """
+    with open(caminho, newline='') as arquivo:
+        cabecalho = next(csv.reader([arquivo.readline()]))
+        faltando = [c for c in COLUNAS_ENTRADA if c not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas ausentes em {caminho}: {', '.join(faltando)}")
+        posicoes = tuple(cabecalho.index(c) for c in COLUNAS_ENTRADA)
+        while True:
+            linhas = list(itertools.islice(arquivo, tamanho_bloco))
+            if not linhas:
+                return
+            yield linhas, posicoes
+
+
+def decodificar_csv(linhas, posicoes):
+    """Colunas de entrada de um bloco; devolve (colunas, linhas descartadas)
+
+    Linhas em branco ou sem todas as colunas de entrada são descartadas.
+    """
+    minimo = max(posicoes) + 1
+    registros = list(csv.reader(linhas))
+    completos = [registro for registro in registros if len(registro) >= minimo]
+    colunas = list(zip(*map(operator.itemgetter(*posicoes), completos))) or [()] * len(posicoes)
+    bloco = {nome: np.array(coluna, dtype=str) for nome, coluna in zip(COLUNAS_ENTRADA, colunas)}
+    return bloco, len(registros) - len(completos)
+
+
+def ler_parquet(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    import pyarrow.parquet as pq
+
+    for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco, columns=list(COLUNAS_ENTRADA)):
+        yield {nome: lote.column(nome).to_numpy(zero_copy_only=False) for nome in COLUNAS_ENTRADA}, None
+
+
+def formatar_csv(colunas):
+    """Texto CSV (sem cabeçalho) das colunas de saída"""
+    texto = io.StringIO()
+    csv.writer(texto).writerows(zip(*(colunas[nome].tolist() for nome in COLUNAS_SAIDA)))
+    return texto.getvalue()
+
+
+def processar_bloco(tarefa):
+    """Decodifica, pontua e (para saída CSV) formata um bloco
+
+    Roda inteira no processo do pool; devolve (linhas, descartadas, conteúdo).
+    """
+    dados, posicoes, saida_csv = tarefa
+    bloco, incompletas = decodificar_csv(dados, posicoes) if posicoes is not None else (dados, 0)
+    colunas = pontuar_bloco(bloco)
+    linhas = len(colunas['minuto'])
+    descartadas = incompletas + len(bloco['minuto']) - linhas
+    return linhas, descartadas, formatar_csv(colunas) if saida_csv else colunas
+
+
+class EscritorCSV:
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'w', newline='')
+        csv.writer(self._arquivo).writerow(COLUNAS_SAIDA)
+
+    def escrever(self, texto):
+        self._arquivo.write(texto)
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class EscritorParquet:
+    def __init__(self, caminho):
+        import pyarrow.parquet as pq
+
+        self._pq = pq
+        self._caminho = caminho
+        self._escritor = None
+
+    def escrever(self, colunas):
+        import pyarrow as pa
+
+        tabela = pa.table({nome: colunas[nome] for nome in COLUNAS_SAIDA})
+        if self._escritor is None:
+            self._escritor = self._pq.ParquetWriter(self._caminho, tabela.schema)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def _eh_parquet(caminho):
+    return caminho.endswith('.parquet') or caminho.endswith('.pq')
+
+
+def pontuar_arquivo(entrada, saida, processos=1, tamanho_bloco=TAMANHO_BLOCO):
+    """Pontua entrada em streaming e grava em saida; devolve (linhas pontuadas, linhas descartadas)"""
+    blocos = ler_parquet(entrada, tamanho_bloco) if _eh_parquet(entrada) else ler_csv(entrada, tamanho_bloco)
+    saida_csv = not _eh_parquet(saida)
+    escritor = EscritorCSV(saida) if saida_csv else EscritorParquet(saida)
+    tarefas = ((dados, posicoes, saida_csv) for dados, posicoes in blocos)
+    total = descartadas = 0
+
+    def gravar(resultado):
+        nonlocal total, descartadas
+        linhas, invalidas, conteudo = resultado
+        escritor.escrever(conteudo)
+        total += linhas
+        descartadas += invalidas
+
+    try:
+        if processos <= 1:
+            for tarefa in tarefas:
+                gravar(processar_bloco(tarefa))
+            return total, descartadas
+
+        # No máximo 2 blocos por processo em voo: memória limitada
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            pendentes = deque()
+            for tarefa in tarefas:
+                pendentes.append(pool.submit(processar_bloco, tarefa))
+                while len(pendentes) >= processos * 2 or (pendentes and pendentes[0].done()):
+                    gravar(pendentes.popleft().result())
+            while pendentes:
+                gravar(pendentes.popleft().result())
+        return total, descartadas
+    finally:
+        escritor.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pontua arquivos de partidas (CSV ou Parquet)')
+    parser.add_argument('entrada')
+    parser.add_argument('saida')
+    parser.add_argument('--processos', type=int, default=1)
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    total, descartadas = pontuar_arquivo(args.entrada, args.saida, args.processos, args.tamanho_bloco)
+    decorrido = time.perf_counter() - inicio
+    print(f"✅ {total} linhas pontuadas em {decorrido:.1f}s ({total / max(decorrido, 1e-9):.0f} linhas/s)")
+    if descartadas:
+        print(f"⚠️ {descartadas} linhas descartadas (incompletas ou com under_inicial, minuto ou under_atual inválidos)")
+
+
+if __name__ == '__main__':
+    main()
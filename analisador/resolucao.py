@@ -0,0 +1,116 @@
+"""Curvas em resolução arbitrária (por segundo, minutos fracionários, acréscimos)
+
+A curva inteira só é definida nos minutos 1 a 90. Aqui ela é avaliada em
+qualquer conjunto de instantes: o segmento de controle e o peso
+suavizado 1 - exp(-2 * fator) de cada instante são calculados uma única
+vez por GradeTemporal, e a avaliação de N partidas vira uma coleta
+vetorizada nos pontos de controle. Nos minutos inteiros o valor coincide
+com a curva de gerar_curva_equilibrio_90min antes do arredondamento;
+depois do minuto 90 (acréscimos) a curva fica no Under final.
+
+A saída é float32: 5400 pontos por partida ocupam ~21 KB.
+"""
+import numpy as np
+
+from analisador.lote import MINUTOS_CONTROLE, calcular_under_final_lote, criar_pontos_controle_lote
+
+SEGUNDOS_POR_JOGO = 5400
+
+_CONTROLE = np.array(MINUTOS_CONTROLE, dtype=np.float64)
+
+
+class GradeTemporal:
+    """Instantes (minutos fracionários) com segmentos e pesos pré-calculados"""
+
+    __slots__ = ('minutos', 'inicio', 'fim', 'pesos', 'passo', 'trechos')
+
+    def __init__(self, minutos):
+        minutos = np.asarray(minutos, dtype=np.float64)
+        limitados = np.clip(minutos, _CONTROLE[0], _CONTROLE[-1])
+        ultimo = len(_CONTROLE) - 1
+
+        inicio = np.clip(np.searchsorted(_CONTROLE, limitados, side='right') - 1, 0, ultimo)
+        fim = np.minimum(inicio + 1, ultimo)
+        largura = _CONTROLE[fim] - _CONTROLE[inicio]
+        fator = np.divide(limitados - _CONTROLE[inicio], largura, out=np.zeros_like(limitados), where=largura > 0)
+
+        self.minutos = minutos
+        self.inicio = inicio
+        self.fim = fim
+        self.pesos = 1 - np.exp(-2 * fator)
+        diferencas = np.diff(minutos)
+        uniforme = diferencas.size and np.allclose(diferencas, diferencas[0])
+        self.passo = float(diferencas[0]) if uniforme else None
+
+        # Em grades ordenadas cada segmento ocupa um trecho contíguo: a
+        # avaliação vira um produto externo por trecho, sem coleta
+        self.trechos = None
+        if np.all(diferencas >= 0):
+            mudancas = np.flatnonzero(np.diff(inicio)) + 1
+            limites = np.concatenate([[0], mudancas, [len(minutos)]])
+            self.trechos = [(int(a), int(b), int(inicio[a]), int(fim[a])) for a, b in zip(limites[:-1], limites[1:])]
+
+    def __len__(self):
+        return self.minutos.shape[0]
+
+    @classmethod
+    def por_segundo(cls, segundos=SEGUNDOS_POR_JOGO):
+        """Um ponto por segundo a partir do minuto 1 (além de 90 = acréscimos)"""
+        return cls(1 + np.arange(segundos) / 60)
+
+    def indice(self, minuto):
+        """Posição do instante mais próximo de minuto (grades uniformes: O(1))"""
+        if self.passo:
+            posicao = int(round((minuto - self.minutos[0]) / self.passo))
+        else:
+            posicao = int(np.searchsorted(self.minutos, minuto))
+        return min(max(posicao, 0), len(self) - 1)
+
+
+def avaliar_curvas(unders_iniciais, grade, parametros=None, tamanho_bloco=4096):
+    """Curvas de under (N, len(grade)) em float32, nos instantes da grade"""
+    unders = np.atleast_1d(np.asarray(unders_iniciais, dtype=np.float64)).ravel()
+    saida = np.empty((unders.shape[0], len(grade)), dtype=np.float32)
+
+    for i in range(0, unders.shape[0], tamanho_bloco):
+        bloco = unders[i:i + tamanho_bloco]
+        finais = calcular_under_final_lote(bloco, parametros)
+        pontos = criar_pontos_controle_lote(bloco, finais, parametros)
+
+        piso = np.maximum(finais, 1.01)[:, None]
+        destino = saida[i:i + tamanho_bloco]
+
+        # Os pontos de controle já são decrescentes e os pesos crescem dentro
+        # de cada segmento, então a curva é monotônica sem acumular mínimos
+        if grade.trechos is not None:
+            for a, b, k_inicio, k_fim in grade.trechos:
+                valor_inicio = pontos[:, k_inicio, None]
+                valor_fim = pontos[:, k_fim, None]
+                curvas = np.minimum(valor_inicio + (valor_fim - valor_inicio) * grade.pesos[a:b], valor_inicio)
+                destino[:, a:b] = np.maximum(curvas, piso)
+        else:
+            valor_inicio = pontos[:, grade.inicio]
+            valor_fim = pontos[:, grade.fim]
+            curvas = np.minimum(valor_inicio + (valor_fim - valor_inicio) * grade.pesos, valor_inicio)
+            destino[:] = np.maximum(curvas, piso)
+
+    return saida
+
+
+def under_esperado_continuo(under_inicial, minuto, parametros=None):
+    """Under esperado num minuto fracionário (ex.: 25.5 = 25'30\")"""
+    return float(avaliar_curvas([under_inicial], GradeTemporal([minuto]), parametros)[0, 0])
+
+
+def avaliar_pares(unders_iniciais, minutos, parametros=None):
+    """Under esperado de cada par (under_inicial[i], minuto[i]), em float64"""
+    unders = np.atleast_1d(np.asarray(unders_iniciais, dtype=np.float64)).ravel()
+    grade = GradeTemporal(np.atleast_1d(np.asarray(minutos, dtype=np.float64)).ravel())
+    finais = calcular_under_final_lote(unders, parametros)
+    pontos = criar_pontos_controle_lote(unders, finais, parametros)
+
+    linhas = np.arange(unders.shape[0])
+    valor_inicio = pontos[linhas, grade.inicio]
+    valor_fim = pontos[linhas, grade.fim]
+    curvas = np.minimum(valor_inicio + (valor_fim - valor_inicio) * grade.pesos, valor_inicio)
+    return np.maximum(curvas, np.maximum(finais, 1.01))
@@ -0,0 +1,93 @@
+"""Resultado compacto de curvas e projeções
+
+Em vez de uma lista de 90 dicts {'minuto', 'under', 'over'}, a curva fica
+em dois arrays: minutos (int16) e uma matriz (2, N) float64 com under e
+over. para_dataframe() devolve um DataFrame que aponta para essa mesma
+memória (sem cópia), e os arrays são somente leitura, então o resultado
+pode ser compartilhado pelo cache sem risco.
+
+Código antigo continua funcionando: curva[i] devolve o dict de sempre,
+iterar produz dicts e para_lista() monta a lista completa.
+"""
+import numpy as np
+
+COLUNAS = ('under', 'over')
+
+
+class ResultadoCurva:
+    """Curva (ou projeção) minuto a minuto apoiada em arrays NumPy"""
+
+    __slots__ = ('minutos', 'valores')
+
+    def __init__(self, minutos, under, over):
+        self.minutos = np.asarray(minutos, dtype=np.int16)
+        self.valores = np.array([under, over], dtype=np.float64)
+        self.minutos.flags.writeable = False
+        self.valores.flags.writeable = False
+
+    @classmethod
+    def de_lista(cls, pontos):
+        """Converte a lista de dicts antiga"""
+        return cls([p['minuto'] for p in pontos], [p['under'] for p in pontos], [p['over'] for p in pontos])
+
+    @property
+    def under(self):
+        return self.valores[0]
+
+    @property
+    def over(self):
+        return self.valores[1]
+
+    def __len__(self):
+        return self.minutos.shape[0]
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, indice):
+        """Acesso no formato antigo: curva[i] -> {'minuto', 'under', 'over'}"""
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        return {
+            'minuto': int(self.minutos[indice]),
+            'under': float(self.valores[0, indice]),
+            'over': float(self.valores[1, indice])
+        }
+
+    def __iter__(self):
+        for minuto, under, over in zip(self.minutos.tolist(), self.valores[0].tolist(), self.valores[1].tolist()):
+            yield {'minuto': minuto, 'under': under, 'over': over}
+
+    def __eq__(self, outro):
+        if isinstance(outro, list):
+            return self.para_lista() == outro
+        if not isinstance(outro, ResultadoCurva):
+            return NotImplemented
+        return np.array_equal(self.minutos, outro.minutos) and np.array_equal(self.valores, outro.valores)
+
+    __hash__ = None
+
+    def __repr__(self):
+        if not len(self):
+            return 'ResultadoCurva([])'
+        return (f'ResultadoCurva(minutos {self.minutos[0]}-{self.minutos[-1]}, '
+                f'under {self.valores[0, 0]} → {self.valores[0, -1]})')
+
+    def para_lista(self):
+        return list(self)
+
+    def para_dataframe(self, colunas=COLUNAS, indice='minuto'):
+        """DataFrame indexado pelo minuto, sem copiar os arrays"""
+        import pandas as pd  # só quem monta DataFrames paga a importação
+
+        return pd.DataFrame(
+            self.valores.T, index=pd.Index(self.minutos, name=indice, copy=False),
+            columns=list(colunas), copy=False
+        )
+
+
+def como_resultado(curva):
+    """Aceita ResultadoCurva ou a lista de dicts antiga"""
+    if isinstance(curva, ResultadoCurva):
+        return curva
+    return ResultadoCurva.de_lista(curva)
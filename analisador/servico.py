@@ -0,0 +1,472 @@
+"""API HTTP local do analisador, com agrupamento de requisições em lote
+
+Endpoints (GET com query string ou POST com JSON; no POST o corpo pode
+ser um objeto ou uma lista de objetos):
+
+    /curva?under_inicial=7.0                         curva de 90 minutos
+    /esperado?under_inicial=7.0&minuto=37.5          under/over esperados no minuto
+    /divergencia?under_inicial=7.0&minuto=37&under_atual=4.5
+    /tick  (POST)                                    ticks de partidas ao vivo para o radar
+    /oportunidades?k=10&criterio=divergencia         top-k do radar (ou criterio=entrada)
+    /alertas?desde=0                                 alertas de status após a sequência dada
+    /encerrar?id_partida=abc                         tira a partida do radar
+    /saude                                           versão e hash dos parâmetros
+    /metrics, /metrics.json                          latências e tamanho dos lotes
+
+Requisições que chegam dentro de uma janela curta (padrão 2 ms) são
+calculadas juntas numa única chamada vetorizada de lote.py, por um
+único AgrupadorLotes. As conexões são HTTP/1.1 com keep-alive; cada
+conexão ocupa um dos --trabalhadores enquanto está aberta e é liberada
+depois de TEMPO_OCIOSO sem requisições.
+
+Em minutos inteiros os valores são os da curva arredondada
+(gerar_curva_equilibrio_90min); em minutos fracionários, os da curva
+contínua (resolucao.py) arredondada em 2 casas, como na interface.
+
+O radar (oportunidades.py) guarda estado: um MonitorPartidas por
+servidor, alimentado por /tick com {id_partida, minuto, under_atual} e,
+na primeira vez que a partida aparece, under_inicial (over_atual e placar
+são opcionais). Os pedidos ao radar são atendidos um de cada vez.
+
+    python -m analisador.servico --porta 8470 --trabalhadores 32
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from analisador.lote import (
+    MINUTOS, STATUS_DIVERGENCIA, arredondar, calcular_over_lote, calcular_under_final_lote,
+    classificar_divergencia_lote, gerar_curvas_lote
+)
+from analisador.metricas import RegistroMetricas
+from analisador.monitor import MonitorPartidas
+from analisador.nucleo import AnalisadorApostasUnderOver
+from analisador.oportunidades import RadarOportunidades
+from analisador.parametros import PARAMETROS, hash_parametros
+from analisador.resolucao import avaliar_pares
+
+PORTA_PADRAO = 8470
+TRABALHADORES = 16
+JANELA = 0.002
+MAX_LOTE = 4096
+TEMPO_OCIOSO = 5.0
+
+CAMPOS = {
+    'curva': ('under_inicial',),
+    'esperado': ('under_inicial', 'minuto'),
+    'divergencia': ('under_inicial', 'minuto', 'under_atual'),
+}
+
+# Explicação, recomendação e risco de cada status, tirados do caminho escalar
+_VEREDITOS = tuple(
+    AnalisadorApostasUnderOver().analisar_divergencia(100 + divergencia, 100, 1)
+    for divergencia in (20, 10, 0, -10, -20)
+)
+if tuple(veredito['status'] for veredito in _VEREDITOS) != STATUS_DIVERGENCIA:
+    raise RuntimeError('STATUS_DIVERGENCIA de lote.py não acompanha analisar_divergencia')
+
+
+def ler_item(tipo, bruto):
+    """Valida e converte os campos de um pedido; ValueError se inválido"""
+    if not isinstance(bruto, dict):
+        raise ValueError('cada item deve ser um objeto')
+    item = {}
+    for campo in CAMPOS[tipo]:
+        if campo not in bruto:
+            raise ValueError(f'campo obrigatório ausente: {campo}')
+        try:
+            item[campo] = float(bruto[campo])
+        except (TypeError, ValueError):
+            raise ValueError(f'{campo} deve ser numérico') from None
+        if not math.isfinite(item[campo]):
+            raise ValueError(f'{campo} deve ser finito')
+    if not 1.01 <= item['under_inicial'] <= 1000:
+        raise ValueError('under_inicial deve estar entre 1.01 e 1000')
+    if 'minuto' in item and not 0 <= item['minuto'] <= 120:
+        raise ValueError('minuto deve estar entre 0 e 120')
+    if 'under_atual' in item and not item['under_atual'] > 0:
+        raise ValueError('under_atual deve ser positivo')
+    return item
+
+
+def ler_tick(bruto):
+    """Valida um tick do radar; ValueError se inválido"""
+    if not isinstance(bruto, dict):
+        raise ValueError('cada item deve ser um objeto')
+    if bruto.get('id_partida') in (None, ''):
+        raise ValueError('campo obrigatório ausente: id_partida')
+    tick = {'id_partida': str(bruto['id_partida']), 'placar': bruto.get('placar')}
+    for campo in ('minuto', 'under_atual', 'over_atual', 'under_inicial'):
+        if bruto.get(campo) is None:
+            if campo in ('minuto', 'under_atual'):
+                raise ValueError(f'campo obrigatório ausente: {campo}')
+            tick[campo] = None
+            continue
+        try:
+            tick[campo] = float(bruto[campo])
+        except (TypeError, ValueError):
+            raise ValueError(f'{campo} deve ser numérico') from None
+        if not math.isfinite(tick[campo]):
+            raise ValueError(f'{campo} deve ser finito')
+    if not 0 <= tick['minuto'] <= 120:
+        raise ValueError('minuto deve estar entre 0 e 120')
+    if tick['minuto'].is_integer():
+        tick['minuto'] = int(tick['minuto'])
+    if not tick['under_atual'] > 0:
+        raise ValueError('under_atual deve ser positivo')
+    if tick['under_inicial'] is not None and not 1.01 <= tick['under_inicial'] <= 1000:
+        raise ValueError('under_inicial deve estar entre 1.01 e 1000')
+    return tick
+
+
+def _coluna(itens, campo):
+    return np.fromiter((item[campo] for item in itens), dtype=np.float64, count=len(itens))
+
+
+def calcular_curvas(itens, parametros=None):
+    unders = _coluna(itens, 'under_inicial')
+    distintos, linha = np.unique(unders, return_inverse=True)
+    curvas = gerar_curvas_lote(distintos, parametros)
+    finais = arredondar(calcular_under_final_lote(distintos, parametros), 2).tolist()
+    minutos = MINUTOS.tolist()
+    por_under = [
+        {'under_inicial': u, 'under_final': f, 'minuto': minutos, 'under': du, 'over': do}
+        for u, f, du, do in zip(distintos.tolist(), finais, curvas['under'].tolist(), curvas['over'].tolist())
+    ]
+    return [por_under[i] for i in linha.tolist()]
+
+
+def _esperados(itens, parametros=None):
+    """(under, over) esperados de cada item, arrays float64"""
+    unders = _coluna(itens, 'under_inicial')
+    minutos = _coluna(itens, 'minuto')
+    under = np.empty_like(unders)
+    over = np.empty_like(unders)
+
+    inteiros = minutos == np.floor(minutos)
+    if inteiros.any():
+        distintos, linha = np.unique(unders[inteiros], return_inverse=True)
+        curvas = gerar_curvas_lote(distintos, parametros)
+        colunas = np.clip(minutos[inteiros].astype(np.int64), 1, 90) - 1
+        under[inteiros] = curvas['under'][linha, colunas]
+        over[inteiros] = curvas['over'][linha, colunas]
+    fracionarios = ~inteiros
+    if fracionarios.any():
+        continuos = avaliar_pares(unders[fracionarios], minutos[fracionarios], parametros)
+        under[fracionarios] = arredondar(continuos, 2)
+        over[fracionarios] = arredondar(calcular_over_lote(continuos), 3)
+    return under, over
+
+
+def calcular_esperados(itens, parametros=None):
+    under, over = _esperados(itens, parametros)
+    return [
+        {'under_inicial': item['under_inicial'], 'minuto': item['minuto'], 'under_esperado': u, 'over_esperado': o}
+        for item, u, o in zip(itens, under.tolist(), over.tolist())
+    ]
+
+
+def calcular_divergencias(itens, parametros=None):
+    under, _ = _esperados(itens, parametros)
+    divergencia, status = classificar_divergencia_lote(_coluna(itens, 'under_atual'), under)
+    return [
+        dict(_VEREDITOS[s], under_esperado=u, divergencia_percent=d, minuto=item['minuto'])
+        for item, u, d, s in zip(itens, under.tolist(), divergencia.tolist(), status.tolist())
+    ]
+
+
+CALCULOS = {
+    'curva': calcular_curvas,
+    'esperado': calcular_esperados,
+    'divergencia': calcular_divergencias,
+}
+
+
+class AgrupadorLotes:
+    """Junta pedidos concorrentes e calcula cada tipo num único lote vetorizado
+
+    A thread do agrupador espera o primeiro pedido, recolhe os que chegarem
+    nos próximos `janela` segundos (até max_lote itens) e resolve os
+    Futures de todos com uma chamada por tipo. Sem concorrência (o lote
+    anterior teve um só pedido e a fila está vazia) o pedido é calculado
+    na hora, sem pagar a janela.
+    """
+
+    def __init__(self, janela=JANELA, max_lote=MAX_LOTE, parametros=None, metricas=None):
+        self.janela = janela
+        self.max_lote = max_lote
+        self.parametros = parametros
+        self.metricas = metricas or RegistroMetricas()
+        self._fila = queue.SimpleQueue()
+        self._concorrente = False
+        self._thread = threading.Thread(target=self._laco, name='agrupador-lotes', daemon=True)
+        self._thread.start()
+
+    def enviar(self, tipo, itens):
+        """Enfileira itens já validados; devolve um Future com a lista de resultados"""
+        futuro = Future()
+        self._fila.put((tipo, itens, futuro))
+        return futuro
+
+    def calcular(self, tipo, itens, tempo_limite=None):
+        return self.enviar(tipo, itens).result(tempo_limite)
+
+    def fechar(self):
+        self._fila.put(None)
+        self._thread.join()
+
+    def _laco(self):
+        while True:
+            pedido = self._fila.get()
+            if pedido is None:
+                return
+            pedidos = [pedido]
+            quantidade = len(pedido[1])
+            limite = time.perf_counter() + self.janela
+            encerrar = False
+            # Pedido isolado (lote anterior unitário e fila vazia) sai sem esperar a janela
+            esperar = self._concorrente or not self._fila.empty()
+            while esperar and quantidade < self.max_lote:
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if pedido is None:
+                    encerrar = True
+                    break
+                pedidos.append(pedido)
+                quantidade += len(pedido[1])
+            self._concorrente = len(pedidos) > 1
+            self._processar(pedidos, quantidade)
+            if encerrar:
+                return
+
+    def _processar(self, pedidos, quantidade):
+        inicio = time.perf_counter()
+        por_tipo = {}
+        for tipo, itens, futuro in pedidos:
+            por_tipo.setdefault(tipo, []).append((itens, futuro))
+
+        for tipo, grupo in por_tipo.items():
+            itens = [item for itens_pedido, _ in grupo for item in itens_pedido]
+            try:
+                resultados = CALCULOS[tipo](itens, self.parametros)
+            except Exception as erro:
+                for _, futuro in grupo:
+                    futuro.set_exception(erro)
+                continue
+            posicao = 0
+            for itens_pedido, futuro in grupo:
+                futuro.set_result(resultados[posicao:posicao + len(itens_pedido)])
+                posicao += len(itens_pedido)
+
+        self.metricas.observar('servico.lote', time.perf_counter() - inicio)
+        self.metricas.contar('servico.lotes')
+        self.metricas.contar('servico.itens', quantidade)
+        self.metricas.contar('servico.pedidos', len(pedidos))
+
+
+class ManipuladorPontuacao(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = TEMPO_OCIOSO
+    # Cabeçalho e corpo saem em escritas separadas: sem isso o Nagle
+    # segura o corpo até o ACK atrasado do cliente (~40 ms no keep-alive)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        self._atender(partes.path, dict(parse_qsl(partes.query)))
+
+    def do_POST(self):
+        partes = urlsplit(self.path)
+        try:
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            if tamanho < 0:
+                raise ValueError
+        except ValueError:
+            # Sem o tamanho não dá para achar o fim do corpo: a conexão não é reaproveitada
+            self.close_connection = True
+            self._responder(400, {'erro': 'Content-Length inválido'})
+            return
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+        except ValueError:
+            self._responder(400, {'erro': 'JSON inválido'})
+            return
+        self._atender(partes.path, corpo, lista=isinstance(corpo, list))
+
+    def _atender(self, caminho, corpo, lista=False):
+        inicio = time.perf_counter()
+        servidor = self.server
+        tipo = caminho.strip('/')
+
+        if tipo in CALCULOS:
+            try:
+                itens = [ler_item(tipo, bruto) for bruto in (corpo if lista else [corpo])]
+            except ValueError as erro:
+                self._responder(400, {'erro': str(erro)})
+                return
+            resultados = servidor.agrupador.calcular(tipo, itens) if itens else []
+            self._responder(200, resultados if lista else resultados[0])
+        elif tipo in ('tick', 'oportunidades', 'alertas', 'encerrar'):
+            try:
+                conteudo = servidor.atender_radar(tipo, corpo)
+            except ValueError as erro:
+                self._responder(400, {'erro': str(erro)})
+                return
+            self._responder(200, conteudo)
+        elif tipo == 'saude':
+            self._responder(200, servidor.saude())
+        elif tipo == 'metrics':
+            self._responder(200, servidor.metricas.para_prometheus(), 'text/plain; version=0.0.4')
+        elif tipo == 'metrics.json':
+            self._responder(200, servidor.metricas.para_json())
+        else:
+            self._responder(404, {'erro': f'endpoint desconhecido: {caminho}'})
+            return
+        servidor.metricas.observar(f'servico.requisicao.{tipo}', time.perf_counter() - inicio)
+
+    def _responder(self, codigo, conteudo, tipo='application/json'):
+        corpo = conteudo.encode() if isinstance(conteudo, str) else json.dumps(conteudo, ensure_ascii=False).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServidorPontuacao(HTTPServer):
+    """Servidor HTTP com um pool fixo de trabalhadores e um agrupador de lotes"""
+
+    request_queue_size = 128
+
+    def __init__(self, endereco=('127.0.0.1', PORTA_PADRAO), trabalhadores=TRABALHADORES,
+                 janela=JANELA, max_lote=MAX_LOTE, parametros=None):
+        self.parametros = parametros or PARAMETROS
+        self.metricas = RegistroMetricas()
+        self.metricas.ativo = True
+        self.agrupador = AgrupadorLotes(janela, max_lote, self.parametros, self.metricas)
+        self.monitor = MonitorPartidas(AnalisadorApostasUnderOver(self.parametros))
+        self.radar = RadarOportunidades(self.monitor)
+        self._trava_radar = threading.Lock()
+        self._pool = ThreadPoolExecutor(trabalhadores, thread_name_prefix='servico')
+        super().__init__(endereco, ManipuladorPontuacao)
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._atender_conexao, request, client_address)
+
+    def _atender_conexao(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def atender_radar(self, tipo, corpo):
+        """Pedidos ao radar de oportunidades; ValueError se inválido"""
+        if tipo == 'tick':
+            ticks = [ler_tick(bruto) for bruto in (corpo if isinstance(corpo, list) else [corpo])]
+            with self._trava_radar:
+                return self._processar_ticks(ticks)
+        if not isinstance(corpo, dict):
+            raise ValueError('o pedido deve ser um objeto')
+        if tipo == 'encerrar':
+            if corpo.get('id_partida') in (None, ''):
+                raise ValueError('campo obrigatório ausente: id_partida')
+            with self._trava_radar:
+                return {'encerrada': self.monitor.encerrar_partida(str(corpo['id_partida'])) is not None}
+        try:
+            if tipo == 'alertas':
+                desde = int(corpo.get('desde', 0))
+            else:
+                k = int(corpo.get('k', 10))
+                minimo = corpo.get('minimo')
+                minimo = None if minimo in (None, '') else float(minimo)
+        except (TypeError, ValueError):
+            raise ValueError('parâmetros numéricos inválidos') from None
+        with self._trava_radar:
+            if tipo == 'alertas':
+                return {'total': self.radar.total_alertas, 'alertas': self.radar.alertas_desde(desde)}
+            return {
+                'partidas': len(self.monitor),
+                'oportunidades': self.radar.top(k, corpo.get('criterio', 'divergencia'), minimo)
+            }
+
+    def _processar_ticks(self, ticks):
+        novas = {}
+        for tick in ticks:
+            if tick['id_partida'] not in self.monitor and tick['id_partida'] not in novas:
+                if tick['under_inicial'] is None:
+                    raise ValueError(f"under_inicial obrigatório no primeiro tick de {tick['id_partida']}")
+                novas[tick['id_partida']] = tick['under_inicial']
+        if novas:
+            # Partidas novas do pedido ganham as curvas num só lote
+            self.monitor.iniciar_partidas(novas.keys(), novas.values())
+
+        sequencia = self.radar.total_alertas
+        for tick in ticks:
+            if tick['placar'] is not None:
+                self.monitor.registrar_placar(tick['id_partida'], tick['placar'])
+            self.monitor.processar_tick(tick['id_partida'], tick['minuto'], tick['under_atual'], tick['over_atual'])
+        return {'processados': len(ticks), 'alertas': self.radar.alertas_desde(sequencia)}
+
+    def saude(self):
+        return {
+            'status': 'ok',
+            'versao_parametros': self.parametros.versao,
+            'hash_parametros': hash_parametros(self.parametros),
+        }
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+        self.agrupador.fechar()
+
+
+def iniciar_servico(porta=PORTA_PADRAO, host='127.0.0.1', **opcoes):
+    """Sobe o servidor numa thread daemon; devolve o servidor (porta=0 escolhe uma livre)"""
+    servidor = ServidorPontuacao((host, porta), **opcoes)
+    threading.Thread(target=servidor.serve_forever, name='servico-http', daemon=True).start()
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='API HTTP local do analisador')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--trabalhadores', type=int, default=TRABALHADORES,
+                        help='conexões atendidas simultaneamente')
+    parser.add_argument('--janela-ms', type=float, default=JANELA * 1000,
+                        help='espera para juntar requisições num lote')
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE)
+    args = parser.parse_args(argv)
+
+    servidor = ServidorPontuacao((args.host, args.porta), args.trabalhadores,
+                                 args.janela_ms / 1000, args.max_lote)
+    print(f"🚀 Servindo em http://{args.host}:{servidor.server_address[1]} "
+          f"({args.trabalhadores} trabalhadores, janela {args.janela_ms:g} ms)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
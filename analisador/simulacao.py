@@ -0,0 +1,208 @@
+"""Simulação Monte Carlo de gols: faixas de confiança em torno da curva
+
+A curva de gerar_curva_equilibrio_90min é lida como o caminho "sem
+surpresas" de um processo de Poisson: log(under / under_final) é a
+intensidade de gols que ainda falta, e a queda de um minuto para o outro
+é a intensidade daquele minuto. Cada caminho simulado sorteia o ritmo
+real do jogo (multiplicador gama de média 1 e variância `dispersao`) e,
+com ele, os gols e as finalizações (FINALIZACOES_POR_GOL por gol
+esperado).
+
+O mercado não conhece o ritmo: estima-o pela média a posteriori
+(gama-Poisson) a partir dos gols e finalizações vistos até o minuto, e
+precifica o restante com essa estimativa. Sem eventos inesperados a
+estimativa fica em 1 e o Under é exatamente a curva; jogos mornos puxam
+o Under para baixo e jogos abertos para cima. O Under de cada caminho
+depende da linha:
+  * linha=None (padrão): linha móvel, placar + 0.5, como o Under do modo
+    "🎯 Jogo em Andamento": under_final * exp(ritmo_estimado * restante);
+  * linha fixa (0.5, 1.5...): under_final / P(gols no resto <= linha - gols
+    já marcados), limitado em ODD_MAXIMA quando a linha já foi superada.
+
+Condicionar a (minuto, gols) fica só com os caminhos que têm aquele
+placar no minuto.
+
+O resultado só depende da semente: os caminhos são gerados em blocos de
+TAMANHO_BLOCO com sementes derivadas, na mesma ordem com ou sem pool de
+processos.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analisador.lote import MINUTOS, calcular_over_lote, calcular_under_final_lote, curvas_continuas_lote
+
+CAMINHOS = 100000
+TAMANHO_BLOCO = 25000
+DISPERSAO = 0.15
+FINALIZACOES_POR_GOL = 10
+ODD_MAXIMA = 999.0
+PERCENTIS = (5, 25, 50, 75, 95)
+
+
+class BandasCurva:
+    """Percentis de under/over por minuto: matrizes (len(percentis), 90)"""
+
+    __slots__ = ('percentis', 'under', 'over', 'caminhos')
+
+    def __init__(self, percentis, under, over, caminhos):
+        self.percentis = percentis
+        self.under = under
+        self.over = over
+        self.caminhos = caminhos
+
+    def faixa(self, percentil):
+        """Curva de under de um dos percentis calculados"""
+        return self.under[self.percentis.index(percentil)]
+
+    def para_dict(self):
+        return {
+            'minuto': MINUTOS.tolist(),
+            'caminhos': self.caminhos,
+            **{f'under_p{p}': linha.tolist() for p, linha in zip(self.percentis, self.under)},
+            **{f'over_p{p}': linha.tolist() for p, linha in zip(self.percentis, self.over)}
+        }
+
+
+def intensidade_restante(under_inicial, parametros=None):
+    """Under final e intensidade de gols que falta a partir de cada minuto 0-90 (91 valores)"""
+    unders = np.array([under_inicial], dtype=np.float64)
+    final = calcular_under_final_lote(unders, parametros)
+    curva = curvas_continuas_lote(unders, final, parametros)[0]
+    restante = np.empty(len(MINUTOS) + 1)
+    restante[0] = math.log(max(under_inicial / final[0], 1.0))
+    restante[1:] = np.log(curva / final[0])
+    return float(final[0]), np.maximum(restante, 0.0)
+
+
+def _acumular(gerador, totais, acumulada, dtype):
+    """Eventos acumulados por minuto (N, 90) a partir do total de cada caminho
+
+    O minuto de cada evento sai da inversa da intensidade acumulada: o
+    custo é proporcional aos eventos, não aos minutos.
+    """
+    caminho = np.repeat(np.arange(totais.shape[0]), totais)
+    minuto = np.searchsorted(acumulada, gerador.random(caminho.shape[0]), side='right')
+    posicao = caminho * len(MINUTOS) + np.minimum(minuto, len(MINUTOS) - 1)
+    contagem = np.bincount(posicao, minlength=totais.shape[0] * len(MINUTOS)).astype(dtype)
+    contagem = contagem.reshape(totais.shape[0], len(MINUTOS))
+    return np.cumsum(contagem, axis=1, out=contagem)
+
+
+def _sortear_bloco(tarefa):
+    """Sorteia gols e eventos (gols + finalizações) acumulados de um bloco de caminhos"""
+    restante, caminhos, semente, dispersao, finalizacoes = tarefa
+    gerador = np.random.default_rng(semente)
+    if dispersao > 0:
+        ritmos = gerador.gamma(1 / dispersao, dispersao, caminhos)
+    else:
+        ritmos = np.ones(caminhos)
+
+    total = restante[0]
+    acumulada = (total - restante[1:]) / total if total > 0 else np.ones(len(MINUTOS))
+    gols = _acumular(gerador, gerador.poisson(ritmos * total), acumulada, np.int8)
+    chutes = _acumular(gerador, gerador.poisson(ritmos * total * finalizacoes), acumulada, np.int16)
+    chutes += gols
+    return gols, chutes
+
+
+class SimulacaoGols:
+    """Caminhos simulados de uma partida: gols e eventos acumulados (N, 90)"""
+
+    __slots__ = ('under_inicial', 'under_final', 'restante', 'dispersao', 'finalizacoes', 'gols', 'eventos')
+
+    def __init__(self, under_inicial, under_final, restante, dispersao, finalizacoes, gols, eventos):
+        self.under_inicial = under_inicial
+        self.under_final = under_final
+        self.restante = restante
+        self.dispersao = dispersao
+        self.finalizacoes = finalizacoes
+        self.gols = gols
+        self.eventos = eventos
+
+    def __len__(self):
+        return self.gols.shape[0]
+
+    def _selecao(self, minuto, gols):
+        if minuto is None or gols is None:
+            return slice(None)
+        return self.gols[:, min(max(int(minuto), 1), 90) - 1] == gols
+
+    def _unders(self, selecao, colunas, linha):
+        restante = self.restante[1:][colunas]
+        # float32 e operações in-place: 100 mil caminhos cabem em ~36 MB
+        if self.dispersao > 0:
+            # Média a posteriori do ritmo (gama-Poisson, priori de média 1)
+            alfa = 1 / self.dispersao
+            consumido = (self.restante[0] - restante) * (1 + self.finalizacoes)
+            esperado = self.eventos[selecao][:, colunas].astype(np.float32)
+            esperado += np.float32(alfa)
+            esperado *= (restante / (alfa + consumido)).astype(np.float32)
+        else:
+            esperado = np.tile(restante.astype(np.float32), (self.gols[selecao].shape[0], 1))
+        if linha is None:
+            np.exp(esperado, out=esperado)
+            esperado *= np.float32(self.under_final)
+            return esperado
+
+        # P(Poisson(esperado) <= linha - gols já marcados), somando os termos
+        faltam = math.floor(linha) - self.gols[selecao][:, colunas].astype(np.int16)
+        termo = np.exp(-esperado)
+        probabilidade = np.where(faltam >= 0, termo, 0.0)
+        for k in range(1, math.floor(linha) + 1):
+            termo = termo * esperado / k
+            probabilidade += np.where(faltam >= k, termo, 0.0)
+        with np.errstate(divide='ignore'):
+            under = self.under_final / probabilidade
+        return np.minimum(under, ODD_MAXIMA).astype(np.float32)
+
+    def unders(self, linha=None, minuto=None, gols=None):
+        """Under (N, 90) de cada caminho (ou dos que têm `gols` no minuto)"""
+        return self._unders(self._selecao(minuto, gols), slice(None), linha)
+
+    def bandas(self, percentis=PERCENTIS, linha=None, minuto=None, gols=None):
+        """Faixas de percentis por minuto; None se nenhum caminho tem o placar pedido"""
+        # Ordena minuto a minuto com os caminhos contíguos (2x mais rápido)
+        unders = np.ascontiguousarray(self.unders(linha, minuto, gols).T)
+        quantidade = unders.shape[1]
+        if quantidade == 0:
+            return None
+        unders.sort(axis=1)
+        posicoes = np.clip(np.ceil(np.asarray(percentis) / 100 * quantidade).astype(np.int64) - 1, 0, quantidade - 1)
+        under = unders[:, posicoes].T.astype(np.float64)
+        return BandasCurva(tuple(percentis), np.round(under, 2), np.round(calcular_over_lote(under), 3), quantidade)
+
+    def percentil(self, under_atual, minuto, linha=None, gols=None):
+        """Porcentagem dos caminhos com Under <= under_atual no minuto (None sem caminhos)"""
+        coluna = min(max(int(minuto), 1), 90) - 1
+        unders = self._unders(self._selecao(minuto, gols), slice(coluna, coluna + 1), linha)
+        if unders.shape[0] == 0:
+            return None
+        return round(float(np.mean(unders <= under_atual)) * 100, 1)
+
+
+def simular(under_inicial, caminhos=CAMINHOS, semente=0, processos=1, dispersao=DISPERSAO,
+            finalizacoes=FINALIZACOES_POR_GOL, parametros=None):
+    """Sorteia `caminhos` caminhos de gols para a partida (reprodutível pela semente)"""
+    under_final, restante = intensidade_restante(under_inicial, parametros)
+    blocos = [min(TAMANHO_BLOCO, caminhos - inicio) for inicio in range(0, caminhos, TAMANHO_BLOCO)]
+    sementes = np.random.SeedSequence(semente).spawn(len(blocos))
+    tarefas = [(restante, tamanho, s, dispersao, finalizacoes) for tamanho, s in zip(blocos, sementes)]
+
+    if processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(processos) as pool:
+            partes = list(pool.map(_sortear_bloco, tarefas))
+    else:
+        partes = [_sortear_bloco(tarefa) for tarefa in tarefas]
+
+    gols = np.concatenate([p[0] for p in partes])
+    eventos = np.concatenate([p[1] for p in partes])
+    return SimulacaoGols(under_inicial, under_final, restante, dispersao, finalizacoes, gols, eventos)
+
+
+def analisar_divergencia_percentil(analisador, simulacao, under_atual, under_esperado, minuto, gols=None, linha=None):
+    """analisar_divergencia acrescida do percentil do under atual entre os caminhos simulados"""
+    divergencia = analisador.analisar_divergencia(under_atual, under_esperado, minuto)
+    divergencia['percentil'] = simulacao.percentil(under_atual, minuto, linha, gols)
+    return divergencia
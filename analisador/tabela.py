@@ -0,0 +1,178 @@
+"""Tabela pré-calculada de curvas, mapeada em memória
+
+A curva depende apenas do under_inicial, e as odds são cotadas numa grade
+finita. A tabela guarda, para cada odd da grade, as 90 odds de under e
+over em float32: (G, 2, 90). Em tempo de execução o arquivo é aberto com
+mmap, então consultar uma curva ou um valor esperado é O(1), sem cópia, e
+as páginas são compartilhadas entre todos os processos.
+
+Construção:
+    python -m analisador.tabela construir [--escada] [--saida DIR]
+"""
+import argparse
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from analisador.lote import gerar_curvas_lote
+from analisador.parametros import PARAMETROS, hash_parametros
+
+DIRETORIO_PADRAO = os.environ.get('ANALISADOR_TABELA', os.path.join('dados', 'tabela_curvas'))
+
+ARQUIVO_CURVAS = 'curvas.npy'
+ARQUIVO_GRADE = 'grade.npy'
+ARQUIVO_META = 'meta.json'
+
+UNDER = 0
+OVER = 1
+
+# Escada de ticks da bolsa: (até, incremento)
+ESCADA_BOLSA = (
+    (2, 0.01),
+    (3, 0.02),
+    (4, 0.05),
+    (6, 0.1),
+    (10, 0.2),
+    (20, 0.5),
+    (30, 1),
+    (50, 2),
+    (100, 5),
+    (1000, 10),
+)
+
+
+def grade_centesimos(inicio=1.01, fim=999.0):
+    """Todas as odds de inicio a fim em passos de 0.01"""
+    return np.arange(round(inicio * 100), round(fim * 100) + 1) / 100
+
+
+def escada_ticks(fim=999.0):
+    """Odds válidas na escada de ticks da bolsa (1.01, 1.02, ..., 990, 999)"""
+    valores = []
+    anterior = 1.0
+    for limite, incremento in ESCADA_BOLSA:
+        passos = round((limite - anterior) / incremento)
+        valores.extend(round(anterior + k * incremento, 2) for k in range(1, passos + 1))
+        anterior = limite
+    grade = np.array([v for v in valores if v <= fim])
+    if grade[-1] < fim:
+        grade = np.append(grade, fim)
+    return grade
+
+
+def construir_tabela(diretorio=DIRETORIO_PADRAO, grade=None, escada=False):
+    """Gera a tabela com a lógica atual de curvas e grava em diretorio"""
+    if grade is None:
+        grade = escada_ticks() if escada else grade_centesimos()
+    grade = np.asarray(grade, dtype=np.float64)
+
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = os.path.join(diretorio, ARQUIVO_CURVAS)
+    curvas = np.lib.format.open_memmap(caminho, mode='w+', dtype=np.float32, shape=(grade.shape[0], 2, 90))
+
+    # Gera em blocos para não manter as matrizes float64 inteiras em memória
+    for inicio in range(0, grade.shape[0], 8192):
+        resultado = gerar_curvas_lote(grade[inicio:inicio + 8192])
+        curvas[inicio:inicio + 8192, UNDER] = resultado['under']
+        curvas[inicio:inicio + 8192, OVER] = resultado['over']
+    curvas.flush()
+    del curvas
+
+    np.save(os.path.join(diretorio, ARQUIVO_GRADE), grade)
+
+    diferencas = np.diff(grade)
+    uniforme = bool(diferencas.size) and np.allclose(diferencas, diferencas[0])
+    meta = {
+        'parametros': hash_parametros(PARAMETROS),
+        'tamanho': int(grade.shape[0]),
+        'inicio': float(grade[0]),
+        'passo': float(round(diferencas[0], 6)) if uniforme else None
+    }
+    with open(os.path.join(diretorio, ARQUIVO_META), 'w') as arquivo:
+        json.dump(meta, arquivo)
+    return meta
+
+
+@lru_cache(maxsize=1024)
+def _curva_fora_da_grade(under_inicial):
+    resultado = gerar_curvas_lote([under_inicial])
+    curva = np.stack([resultado['under'][0], resultado['over'][0]]).astype(np.float32)
+    curva.flags.writeable = False
+    return curva
+
+
+class TabelaCurvas:
+    """Consulta O(1) de curvas a partir da tabela mapeada em memória"""
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO):
+        with open(os.path.join(diretorio, ARQUIVO_META)) as arquivo:
+            self.meta = json.load(arquivo)
+        self.curvas = np.load(os.path.join(diretorio, ARQUIVO_CURVAS), mmap_mode='r')
+        self.grade = np.load(os.path.join(diretorio, ARQUIVO_GRADE), mmap_mode='r')
+        self._inicio = self.meta['inicio']
+        self._passo = self.meta['passo']
+
+    @classmethod
+    def abrir(cls, diretorio=DIRETORIO_PADRAO):
+        """Abre a tabela se ela já foi construída com os parâmetros em uso
+
+        Devolve None se a tabela não existe ou foi gerada com outros
+        parâmetros do modelo (nesse caso ela precisa ser reconstruída).
+        """
+        if not os.path.exists(os.path.join(diretorio, ARQUIVO_META)):
+            return None
+        tabela = cls(diretorio)
+        if tabela.meta.get('parametros') != hash_parametros(PARAMETROS):
+            return None
+        return tabela
+
+    def __len__(self):
+        return self.curvas.shape[0]
+
+    def indice(self, under_inicial):
+        """Posição de under_inicial na grade, ou None se estiver fora dela"""
+        if self._passo:
+            i = int(round((under_inicial - self._inicio) / self._passo))
+        else:
+            i = int(np.searchsorted(self.grade, under_inicial - 1e-9))
+        if 0 <= i < len(self) and abs(self.grade[i] - under_inicial) < 1e-9:
+            return i
+        return None
+
+    def curva(self, under_inicial):
+        """Matriz (2, 90) float32: linha 0 under, linha 1 over
+
+        Na grade devolve uma visão da tabela (sem cópia); fora dela calcula a
+        curva com o motor vetorizado e guarda em cache.
+        """
+        i = self.indice(under_inicial)
+        if i is None:
+            return _curva_fora_da_grade(float(under_inicial))
+        return self.curvas[i]
+
+    def under_esperado(self, under_inicial, minuto):
+        """Equivalente a curva[minuto - 1]['under'] do gerar_curva_equilibrio_90min"""
+        return round(float(self.curva(under_inicial)[UNDER, minuto - 1]), 2)
+
+    def over_esperado(self, under_inicial, minuto):
+        return round(float(self.curva(under_inicial)[OVER, minuto - 1]), 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tabela pré-calculada de curvas')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    construir = subcomandos.add_parser('construir', help='gera a tabela em disco')
+    construir.add_argument('--saida', default=DIRETORIO_PADRAO, help='diretório de saída')
+    construir.add_argument('--escada', action='store_true',
+                           help='usa a escada de ticks da bolsa em vez de passos de 0.01')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'construir':
+        meta = construir_tabela(args.saida, escada=args.escada)
+        print(f"✅ Tabela com {meta['tamanho']} curvas gravada em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Validação das invariantes do modelo em todo o domínio de odds
+
+Em vez de conferir uma curva por vez na hora de desenhar, as curvas de
+todas as odds do domínio (1.01 a 999, em centésimos ou na escada de ticks
+da bolsa) são geradas em blocos com o motor vetorizado e cada invariante
+vira uma máscara booleana por odd:
+
+  por odd (verificar_curvas):
+    * under_inicial: a curva começa no próprio under inicial;
+    * final_abaixo_inicial: calcular_under_final_esperado <= under inicial;
+    * under_monotono: o under nunca sobe de um minuto para o outro;
+    * under_acima_final: o under nunca fica abaixo do under final;
+    * under_minimo: o under nunca fica abaixo de 1.01;
+    * over_maximo: o over nunca passa de 15;
+    * over_crescente: o over nunca cai de um minuto para o outro;
+  entre odds vizinhas da grade (validar_dominio):
+    * final_monotono: odd inicial maior não dá under final menor;
+    * continuidade: a curva (antes do arredondamento) não salta mais que
+      LIMITE_SALTO além da variação relativa da própria odd: pega as
+      bordas das faixas de calcular_under_final_esperado e qualquer salto
+      de correções como a de 0.98 em criar_curva_natural.
+
+O relatório agrupa as odds que violam cada invariante em trechos
+consecutivos da grade, (odd inicial, odd final, quantidade), então mesmo
+milhares de violações cabem em poucas linhas.
+
+    python -m analisador.validacao              # grade de centésimos
+    python -m analisador.validacao --escada     # escada de ticks
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from analisador.lote import (
+    arredondar, calcular_over_lote, calcular_under_final_lote, curvas_continuas_lote
+)
+from analisador.parametros import PARAMETROS
+
+DESCRICOES = {
+    'under_inicial': 'curva não começa no Under inicial',
+    'final_abaixo_inicial': 'Under final acima do Under inicial',
+    'under_monotono': 'Under sobe em algum minuto',
+    'under_acima_final': 'Under abaixo do Under final',
+    'under_minimo': 'Under abaixo de 1.01',
+    'over_maximo': 'Over acima de 15',
+    'over_crescente': 'Over cai em algum minuto',
+    'final_monotono': 'Under final menor que o da odd anterior da grade',
+    'continuidade': 'salto da curva em relação à odd anterior da grade',
+}
+
+INVARIANTES_CURVA = (
+    'under_inicial', 'final_abaixo_inicial', 'under_monotono', 'under_acima_final',
+    'under_minimo', 'over_maximo', 'over_crescente'
+)
+INVARIANTES_DOMINIO = ('final_monotono', 'continuidade')
+
+OVER_MAXIMO = 15.0
+UNDER_MINIMO = 1.01
+LIMITE_SALTO = 0.05
+TAMANHO_BLOCO = 16384
+MAXIMO_TRECHOS = 20
+
+
+def _verificar(unders, finais, continuas):
+    under = arredondar(continuas, 2)
+    over = arredondar(calcular_over_lote(continuas), 3)
+    return {
+        'under_inicial': under[:, 0] != arredondar(unders, 2),
+        'final_abaixo_inicial': finais > unders,
+        'under_monotono': (np.diff(under, axis=1) > 0).any(axis=1),
+        'under_acima_final': (under < arredondar(finais, 2)[:, None]).any(axis=1),
+        'under_minimo': (under < UNDER_MINIMO).any(axis=1),
+        'over_maximo': (over > OVER_MAXIMO).any(axis=1),
+        'over_crescente': (np.diff(over, axis=1) < 0).any(axis=1),
+    }
+
+
+def verificar_curvas(unders_iniciais, parametros=None):
+    """Invariantes por odd: dict nome -> máscara (N,), True onde a odd viola"""
+    unders = np.atleast_1d(np.asarray(unders_iniciais, dtype=np.float64))
+    finais = calcular_under_final_lote(unders, parametros)
+    return _verificar(unders, finais, curvas_continuas_lote(unders, finais, parametros))
+
+
+def _trechos(grade, mascara, maximo=MAXIMO_TRECHOS):
+    """Trechos consecutivos de True: [(odd inicial, odd final, quantidade), ...]"""
+    bordas = np.diff(np.concatenate(([0], mascara.astype(np.int8), [0])))
+    inicios = np.flatnonzero(bordas == 1)[:maximo]
+    fins = np.flatnonzero(bordas == -1)[:maximo] - 1
+    return [(float(grade[i]), float(grade[f]), int(f - i + 1)) for i, f in zip(inicios, fins)]
+
+
+def validar_dominio(grade=None, parametros=None, limite_salto=LIMITE_SALTO, tamanho_bloco=TAMANHO_BLOCO):
+    """Confere todas as invariantes na grade (padrão: 1.01 a 999 em centésimos)
+
+    Devolve dict com 'entradas', 'tempo_s', 'ok' e 'invariantes':
+    {nome: {'descricao', 'violacoes', 'trechos'}}, os trechos limitados a
+    MAXIMO_TRECHOS por invariante.
+    """
+    if grade is None:
+        from analisador.tabela import grade_centesimos
+        grade = grade_centesimos()
+    grade = np.sort(np.asarray(grade, dtype=np.float64))
+    parametros = parametros or PARAMETROS
+    inicio = time.perf_counter()
+
+    mascaras = {nome: np.zeros(grade.shape[0], dtype=bool) for nome in DESCRICOES}
+    anterior = None
+    for posicao in range(0, grade.shape[0], tamanho_bloco):
+        unders = grade[posicao:posicao + tamanho_bloco]
+        finais = calcular_under_final_lote(unders, parametros)
+        continuas = curvas_continuas_lote(unders, finais, parametros)
+        for nome, mascara in _verificar(unders, finais, continuas).items():
+            mascaras[nome][posicao:posicao + unders.shape[0]] = mascara
+
+        # Pares vizinhos, marcados na odd de cima; a primeira odd do bloco
+        # compara com a última do bloco anterior
+        ultimo = (unders[-1:], finais[-1:], continuas[-1:])
+        if anterior is None:
+            destino = posicao + 1
+        else:
+            unders, finais, continuas = (np.concatenate(par) for par in zip(anterior, (unders, finais, continuas)))
+            destino = posicao
+        pares = slice(destino, destino + unders.shape[0] - 1)
+        variacao = np.diff(unders) / unders[:-1]
+        salto = (np.abs(np.diff(continuas, axis=0)) / continuas[:-1]).max(axis=1)
+        mascaras['final_monotono'][pares] = np.diff(finais) < 0
+        mascaras['continuidade'][pares] = salto > limite_salto + variacao
+        anterior = ultimo
+
+    invariantes = {
+        nome: {
+            'descricao': DESCRICOES[nome],
+            'violacoes': int(mascara.sum()),
+            'trechos': _trechos(grade, mascara)
+        }
+        for nome, mascara in mascaras.items()
+    }
+    return {
+        'entradas': int(grade.shape[0]),
+        'tempo_s': round(time.perf_counter() - inicio, 3),
+        'ok': not any(dados['violacoes'] for dados in invariantes.values()),
+        'invariantes': invariantes
+    }
+
+
+def formatar_relatorio(relatorio):
+    """Linhas de texto do relatório, uma por invariante violada"""
+    linhas = [f"{relatorio['entradas']} odds conferidas em {relatorio['tempo_s']:.2f} s"]
+    for nome, dados in relatorio['invariantes'].items():
+        if not dados['violacoes']:
+            continue
+        trechos = ', '.join(
+            f'{inicio:g}' if quantidade == 1 else f'{inicio:g}–{fim:g} ({quantidade})'
+            for inicio, fim, quantidade in dados['trechos']
+        )
+        if dados['violacoes'] > sum(quantidade for _, _, quantidade in dados['trechos']):
+            trechos += ', ...'
+        linhas.append(f"{nome}: {dados['violacoes']} odds — {dados['descricao']}: {trechos}")
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Valida as invariantes do modelo em todo o domínio de odds')
+    parser.add_argument('--escada', action='store_true', help='usa a escada de ticks da bolsa em vez de centésimos')
+    parser.add_argument('--ignorar', nargs='*', default=[], choices=list(DESCRICOES),
+                        help='invariantes que não contam para o código de saída')
+    args = parser.parse_args(argv)
+
+    grade = None
+    if args.escada:
+        from analisador.tabela import escada_ticks
+        grade = escada_ticks()
+    relatorio = validar_dominio(grade)
+    linhas = formatar_relatorio(relatorio)
+    falhou = any(dados['violacoes'] for nome, dados in relatorio['invariantes'].items() if nome not in args.ignorar)
+    print(('❌ ' if falhou else '✅ ') + linhas[0])
+    for linha in linhas[1:]:
+        print(f'  • {linha}')
+    return 1 if falhou else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,24 @@
+import os
+import time
+
 import streamlit as st
-import math
-import pandas as pd
 import numpy as np
+import pandas as pd
+
+from analisador import metricas
+from analisador.cache import AnalisadorEmCache
+from analisador.cache_disco import CacheDisco
+from analisador.graficos import GraficoPartidas
+from analisador.lote import gerar_curvas_lote
+from analisador.mercado import METODOS, projetar_cotacao
+from analisador.monitor import MonitorPartidas
+from analisador.monitor_distribuido import MemoriaMonitor
+from analisador.oportunidades import RadarOportunidades
+from analisador.placar import MAX_GOLS, projetar_lote, total_gols
+from analisador.resolucao import under_esperado_continuo
+from analisador.simulacao import analisar_divergencia_percentil, simular
+from analisador.tabela import TabelaCurvas, escada_ticks
+from analisador.validacao import DESCRICOES, formatar_relatorio, validar_dominio, verificar_curvas
 
 # Configuração da página
 st.set_page_config(
@@ -10,336 +27,67 @@ st.set_page_config(
     layout="wide"
 )
 
-class AnalisadorApostasUnderOver:
-    def __init__(self):
-        pass
-    
-    def calcular_under_final_esperado(self, under_inicial):
-        """Cálculo mais equilibrado do Under final"""
-        if under_inicial >= 50:
-            return max(1.50, under_inicial * 0.035)
-        elif under_inicial >= 30:
-            return max(1.40, under_inicial * 0.045) 
-        elif under_inicial >= 20:
-            return max(1.30, under_inicial * 0.055)
-        elif under_inicial >= 15:
-            return max(1.25, under_inicial * 0.070)
-        elif under_inicial >= 10:
-            return max(1.20, under_inicial * 0.110)
-        elif under_inicial >= 7:
-            return max(1.15, under_inicial * 0.150)  # 7 × 0.15 = 1.05, limitado a 1.15
-        elif under_inicial >= 5:
-            return max(1.10, under_inicial * 0.200)
-        elif under_inicial >= 3:
-            return max(1.05, under_inicial * 0.300)
-        else:
-            return max(1.03, under_inicial * 0.500)
-    
-    def calcular_over_baseado_no_under(self, under_atual):
-        """Cálculo seguro do Over"""
-        try:
-            under_atual = max(under_atual, 1.01)
-            prob_under = 1 / under_atual
-            prob_over = 1 - prob_under
-            
-            if prob_over <= 0.01:
-                return 15.0
-            
-            over_atual = 1 / prob_over
-            return min(over_atual, 15.0)
-        except:
-            return 15.0
-    
-    def criar_curva_natural(self, under_inicial, under_final):
-        """NOVA: Cria curva natural baseada em função matemática"""
-        
-        # Calcula a diferença total que precisa ser distribuída
-        diferenca_total = under_inicial - under_final
-        
-        # Define velocidades de queda por período
-        velocidades = {
-            'periodo_1_15': 0.25,    # 25% da queda total nos primeiros 15 min
-            'periodo_15_30': 0.20,   # 20% da queda nos próximos 15 min
-            'periodo_30_45': 0.20,   # 20% da queda nos próximos 15 min
-            'periodo_45_60': 0.15,   # 15% da queda nos próximos 15 min
-            'periodo_60_75': 0.12,   # 12% da queda nos próximos 15 min
-            'periodo_75_90': 0.08    # 8% da queda nos últimos 15 min
-        }
-        
-        # Calcula pontos de controle
-        pontos = {}
-        valor_atual = under_inicial
-        
-        # Minuto 1
-        pontos[1] = under_inicial
-        
-        # Minuto 15
-        queda_15 = diferenca_total * velocidades['periodo_1_15']
-        valor_atual -= queda_15
-        pontos[15] = max(valor_atual, under_final)
-        
-        # Minuto 30
-        queda_30 = diferenca_total * velocidades['periodo_15_30']
-        valor_atual -= queda_30
-        pontos[30] = max(valor_atual, under_final)
-        
-        # Minuto 45
-        queda_45 = diferenca_total * velocidades['periodo_30_45']
-        valor_atual -= queda_45
-        pontos[45] = max(valor_atual, under_final)
-        
-        # Minuto 46 (pequeno boost no início do 2º tempo)
-        boost_2tempo = (pontos[45] - under_final) * 0.95  # Pequena aceleração
-        pontos[46] = max(pontos[45] - (pontos[45] - under_final) * 0.05, under_final)
-        
-        # Minuto 60
-        queda_60 = diferenca_total * velocidades['periodo_45_60']
-        valor_atual -= queda_60
-        pontos[60] = max(valor_atual, under_final)
-        
-        # Minuto 75
-        queda_75 = diferenca_total * velocidades['periodo_60_75']
-        valor_atual -= queda_75
-        pontos[75] = max(valor_atual, under_final)
-        
-        # Minuto 85 (penúltimo ponto)
-        queda_85 = diferenca_total * velocidades['periodo_75_90'] * 0.7  # 70% da queda final
-        valor_atual -= queda_85
-        pontos[85] = max(valor_atual, under_final)
-        
-        # Minuto 90 (final)
-        pontos[90] = under_final
-        
-        # VERIFICAÇÃO: Garante progressão decrescente
-        minutos_ordenados = sorted(pontos.keys())
-        for i in range(1, len(minutos_ordenados)):
-            min_atual = minutos_ordenados[i]
-            min_anterior = minutos_ordenados[i-1]
-            
-            if pontos[min_atual] >= pontos[min_anterior]:
-                # Corrige forçando uma pequena queda
-                pontos[min_atual] = pontos[min_anterior] * 0.98
-                pontos[min_atual] = max(pontos[min_atual], under_final)
-        
-        return pontos
-    
-    def interpolar_suave(self, minuto, pontos_curva):
-        """Interpolação suave que mantém progressão natural"""
-        if minuto in pontos_curva:
-            return pontos_curva[minuto]
-        
-        minutos_ordenados = sorted(pontos_curva.keys())
-        
-        # Casos extremos
-        if minuto <= minutos_ordenados[0]:
-            return pontos_curva[minutos_ordenados[0]]
-        if minuto >= minutos_ordenados[-1]:
-            return pontos_curva[minutos_ordenados[-1]]
-        
-        # Encontra segmento para interpolação
-        for i in range(len(minutos_ordenados) - 1):
-            min1 = minutos_ordenados[i]
-            min2 = minutos_ordenados[i + 1]
-            
-            if min1 <= minuto <= min2:
-                val1 = pontos_curva[min1]
-                val2 = pontos_curva[min2]
-                
-                # Interpolação com curva suave (não linear)
-                fator = (minuto - min1) / (min2 - min1)
-                
-                # Aplica suavização exponencial para evitar quedas muito lineares
-                fator_suave = 1 - math.exp(-2 * fator)  # Curva exponencial suave
-                
-                valor = val1 + (val2 - val1) * fator_suave
-                
-                # Garante que não suba
-                return min(valor, val1)
-        
-        return pontos_curva[minutos_ordenados[-1]]
-    
-    def gerar_curva_equilibrio_90min(self, under_inicial, over_inicial):
-        """Gera curva natural e equilibrada"""
-        under_final = self.calcular_under_final_esperado(under_inicial)
-        
-        # Cria pontos de controle naturais
-        pontos_curva = self.criar_curva_natural(under_inicial, under_final)
-        
-        # Debug: Mostra pontos de controle
-        if st.sidebar.checkbox("🔍 Mostrar Pontos de Controle", False):
-            st.sidebar.write("**Pontos de Controle:**")
-            for min_key, valor in sorted(pontos_curva.items()):
-                st.sidebar.write(f"Min {min_key}: {valor:.2f}")
-        
-        # Gera curva completa minuto a minuto
-        curva = []
-        valor_anterior = under_inicial
-        
-        for minuto in range(1, 91):
-            under_atual = self.interpolar_suave(minuto, pontos_curva)
-            
-            # Dupla verificação: garante progressão decrescente
-            under_atual = min(under_atual, valor_anterior)
-            under_atual = max(under_atual, under_final)  # Nunca abaixo do final
-            under_atual = max(under_atual, 1.01)         # Mínimo absoluto
-            
-            over_atual = self.calcular_over_baseado_no_under(under_atual)
-            
-            curva.append({
-                'minuto': minuto,
-                'under': round(under_atual, 2),
-                'over': round(over_atual, 3)
-            })
-            
-            valor_anterior = under_atual
-        
-        return curva
-    
-    def analisar_divergencia(self, under_atual_real, under_esperado, minuto):
-        """Análise de divergência"""
-        if under_esperado <= 0:
-            under_esperado = 1.01
-            
-        divergencia_percent = ((under_atual_real - under_esperado) / under_esperado) * 100
-        
-        if divergencia_percent >= 15:
-            status = "🔥 OPORTUNIDADE ALTA"
-            explicacao = "Odd atual muito ACIMA da projetada"
-            recomendacao = "✅ EXCELENTE momento para entrada Under"
-            risco = "Baixo"
-        elif divergencia_percent >= 8:
-            status = "💰 OPORTUNIDADE MÉDIA"
-            explicacao = "Odd atual ACIMA da projetada"
-            recomendacao = "✅ Bom momento para entrada Under"
-            risco = "Médio"
-        elif divergencia_percent >= -8:
-            status = "⚖️ EQUILIBRADO"
-            explicacao = "Odd atual próxima da projetada"
-            recomendacao = "⚠️ Entrada neutra"
-            risco = "Médio"
-        elif divergencia_percent >= -15:
-            status = "⚠️ CUIDADO"
-            explicacao = "Odd atual ABAIXO da projetada"
-            recomendacao = "❌ Entrada Under arriscada"
-            risco = "Alto"
-        else:
-            status = "🚨 RISCO ALTO"
-            explicacao = "Odd atual muito ABAIXO da projetada"
-            recomendacao = "❌ EVITAR entrada Under"
-            risco = "Muito Alto"
-        
-        return {
-            'status': status,
-            'divergencia_percent': round(divergencia_percent, 1),
-            'explicacao': explicacao,
-            'recomendacao': recomendacao,
-            'risco': risco
-        }
-    
-    def calcular_taxa_queda(self, under_inicial, under_atual, minutos):
-        if minutos == 0:
-            return 0
-        return (under_inicial - under_atual) / (under_inicial * minutos)
-    
-    def classificar_ritmo(self, taxa_queda):
-        if taxa_queda >= 0.015:
-            return "DESACELERADA ⏰", "Ritmo lento, partida conservadora"
-        else:
-            return "ACELERADA ⚡", "Ritmo rápido, partida ofensiva"
-    
-    def analisar_distribuicao_queda(self, curva):
-        """NOVA: Analisa como a queda está distribuída"""
-        under_inicial = curva[0]['under']
-        
-        # Análise por períodos
-        periodos = {
-            '1º Tempo (1-45)': (curva[0]['under'], curva[44]['under']),
-            '2º Tempo (46-90)': (curva[45]['under'], curva[89]['under']),
-            'Primeiro Terço (1-30)': (curva[0]['under'], curva[29]['under']),
-            'Segundo Terço (31-60)': (curva[30]['under'], curva[59]['under']),
-            'Terceiro Terço (61-90)': (curva[60]['under'], curva[89]['under'])
-        }
-        
-        análise = {}
-        for periodo, (valor_inicio, valor_fim) in periodos.items():
-            queda = valor_inicio - valor_fim
-            percentual = (queda / under_inicial) * 100
-            análise[periodo] = {
-                'queda_absoluta': round(queda, 2),
-                'queda_percentual': round(percentual, 1)
-            }
-        
-        return análise
-    
-    def analisar_melhor_entrada_under(self, curva):
-        melhores_entradas = []
-        
-        for i in range(10, 70, 5):  # Analisa a cada 5 minutos até o minuto 70
-            if i + 15 < len(curva):  # Janela de 15 minutos
-                odd_entrada = curva[i]['under']
-                odd_depois = curva[i + 15]['under']
-                
-                if odd_entrada > 1.30 and odd_depois > 1.10:
-                    queda_percent = ((odd_entrada - odd_depois) / odd_entrada) * 100
-                    
-                    if queda_percent >= 8:  # Mínimo 8% de queda
-                        melhores_entradas.append({
-                            'minuto': i + 1,
-                            'odd_entrada': odd_entrada,
-                            'odd_apos_15min': odd_depois,
-                            'queda_percent': round(queda_percent, 1),
-                            'potencial_lucro': f"{queda_percent:.1f}%"
-                        })
-        
-        return sorted(melhores_entradas, key=lambda x: x['queda_percent'], reverse=True)[:3]
-    
-    def analisar_melhor_entrada_over(self, curva):
-        melhores_entradas = []
-        
-        for i in range(65, 85, 3):  # Foco nos últimos 25 minutos
-            if i < len(curva):
-                odd_over = curva[i]['over']
-                
-                if 1.8 <= odd_over <= 12.0:  # Range mais equilibrado
-                    melhores_entradas.append({
-                        'minuto': i + 1,
-                        'odd_entrada': odd_over,
-                        'estabilidade': 'Alta' if odd_over <= 6.0 else 'Média'
-                    })
-        
-        return melhores_entradas[:3]
-    
-    def projetar_restante_equilibrio(self, under_inicial, under_atual, minuto_atual, placar):
-        under_final = self.calcular_under_final_esperado(under_inicial)
-        
-        # Calcula quantos minutos restam
-        minutos_restantes = 90 - minuto_atual
-        diferenca_restante = under_atual - under_final
-        
-        # Taxa de queda constante para o restante
-        if minutos_restantes > 0:
-            taxa_queda_restante = diferenca_restante / minutos_restantes
-        else:
-            taxa_queda_restante = 0
-        
-        # Cria projeção minuto a minuto
-        projecao = []
-        valor_atual = under_atual
-        
-        for minuto in range(minuto_atual + 1, 91):
-            # Aplicar queda gradual
-            valor_atual -= taxa_queda_restante
-            valor_atual = max(valor_atual, under_final)  # Nunca abaixo do final
-            
-            over_proj = self.calcular_over_baseado_no_under(valor_atual)
-            
-            projecao.append({
-                'minuto': minuto,
-                'under': round(valor_atual, 2),
-                'over': round(over_proj, 3)
-            })
-        
-        return projecao
+inicio_rerun = time.perf_counter()
+
+def mostrar_pontos_controle(pontos_curva):
+    """Debug: mostra os pontos de controle na barra lateral"""
+    st.sidebar.write("**Pontos de Controle:**")
+    for min_key, valor in sorted(pontos_curva.items()):
+        st.sidebar.write(f"Min {min_key}: {valor:.2f}")
+
+@st.cache_resource
+def carregar_analisador():
+    """Analisador com cache LRU, compartilhado entre reruns e sessões, e cache em disco
+    (ANALISADOR_CACHE, vazio desativa) que sobrevive a reinícios"""
+    return AnalisadorEmCache(tamanho_maximo=256, disco=CacheDisco.abrir())
+
+@st.cache_resource
+def carregar_tabela_curvas():
+    """Tabela pré-calculada (python -m analisador.tabela construir), se existir"""
+    return TabelaCurvas.abrir()
+
+@st.cache_resource
+def iniciar_endpoint_metricas():
+    """Com ANALISADOR_METRICAS=1, expõe /metrics e /metrics.json na porta ANALISADOR_METRICAS_PORTA
+
+    Porta vazia, inválida ou já em uso (outro processo do Streamlit) deixa o
+    endpoint desativado; a instrumentação continua valendo na barra lateral.
+    """
+    if not metricas.REGISTRO.ativo:
+        return None
+    try:
+        porta = int(os.environ.get('ANALISADOR_METRICAS_PORTA', metricas.PORTA_PADRAO) or 0)
+        return metricas.REGISTRO.servir(porta) if porta else None
+    except (ValueError, OSError):
+        return None
+
+@st.cache_resource(max_entries=8)
+def carregar_simulacao(under_inicial):
+    """100 mil caminhos de gols da partida (~27 MB, por isso poucas entradas)"""
+    return simular(under_inicial)
+
+def faixas_grafico(under_inicial):
+    """Faixas P5/P95 de uma partida para os gráficos de várias partidas (simulação menor, em cache)"""
+    def montar():
+        bandas = simular(under_inicial, caminhos=5000).bandas((5, 95))
+        return {f"P{p}": bandas.faixa(p) for p in (5, 95)}
+    return carregar_analisador().obter_tabela(('faixas_grafico', under_inicial), montar)
+
+def desenhar_grafico(grafico, espaco=st):
+    """Gráfico com o histórico já reduzido (no máximo grafico.pontos + 2 pontos por série)"""
+    return espaco.line_chart(pd.DataFrame(grafico.historico()), x='minuto', y='valor', color='serie')
+
+@st.cache_resource
+def validar_modelo():
+    """Invariantes do modelo em toda a escada de ticks, conferidas uma vez na inicialização"""
+    return validar_dominio(escada_ticks(), carregar_analisador().parametros)
+
+@st.cache_resource
+def anexar_monitor(nome):
+    """Segmento do monitor distribuído (python -m analisador.monitor_distribuido ... --manter)"""
+    return MemoriaMonitor.anexar(nome)
+
+endpoint_metricas = iniciar_endpoint_metricas()
 
 # Interface Streamlit
 st.title("🎯 Analisador Under/Over v5.0 - NATURAL")
@@ -348,18 +96,27 @@ st.subheader("📊 Curva Equilibrada e Realista")
 # Sidebar
 st.sidebar.header("⚙️ Configurações")
 
+# Com ANALISADOR_MONITOR=<segmento> a interface lê o monitor distribuído
+nome_monitor = os.environ.get('ANALISADOR_MONITOR')
+
 modo = st.sidebar.selectbox(
     "📊 Selecione o Modo:",
-    ["🎯 Jogo em Andamento", "📈 Projeção Completa"]
+    ["🎯 Jogo em Andamento", "📈 Projeção Completa", "📡 Radar de Oportunidades"]
+    + (["🖥️ Monitor Compartilhado"] if nome_monitor else [])
 )
 
 if modo == "📈 Projeção Completa":
     st.sidebar.subheader("📋 Dados Iniciais")
     under_inicial = st.sidebar.number_input("Under Inicial:", value=7.0, min_value=1.01, max_value=999.0, step=0.1)
     over_inicial = st.sidebar.number_input("Over Inicial:", value=1.14, min_value=1.01, max_value=999.0, step=0.01)
+    metodo_margem = st.sidebar.selectbox("⚖️ Remoção de Margem:", METODOS)
     
     if st.sidebar.button("🚀 Executar Análise", type="primary"):
-        analisador = AnalisadorApostasUnderOver()
+        st.session_state.analise_projecao = True
+    
+    # Mantém a análise na tela nos reruns seguintes (checkbox, sliders...)
+    if st.session_state.get('analise_projecao', False):
+        analisador = carregar_analisador()
         
         st.header("📊 Projeção Completa (90 Minutos)")
         
@@ -373,14 +130,18 @@ if modo == "📈 Projeção Completa":
             st.metric("Over Inicial", f"{over_inicial}")
             st.success("✅ **Curva Natural:** Queda equilibrada")
         
-        curva = analisador.gerar_curva_equilibrio_90min(under_inicial, over_inicial)
+        debug_pontos = st.sidebar.checkbox("🔍 Mostrar Pontos de Controle", False)
+        curva = analisador.gerar_curva_equilibrio_90min(
+            under_inicial, over_inicial,
+            ao_criar_pontos=mostrar_pontos_controle if debug_pontos else None
+        )
         
         with col2:
-            st.metric("Under Final", f"{curva[89]['under']}")
-            st.metric("Over Final", f"{curva[89]['over']}")
+            st.metric("Under Final", f"{curva.under[89]}")
+            st.metric("Over Final", f"{curva.over[89]}")
             
             # Queda total
-            queda_total = under_inicial - curva[89]['under']
+            queda_total = under_inicial - curva.under[89]
             percentual_total = (queda_total / under_inicial) * 100
             st.metric("Queda Total", f"{percentual_total:.1f}%")
         
@@ -417,36 +178,71 @@ if modo == "📈 Projeção Completa":
                 st.info("ℹ️ Distribuição assimétrica")
         
         # Gráficos
-        df_curva = pd.DataFrame(curva)
+        with metricas.medir('app.dataframes'):
+            df_curva = curva.para_dataframe()  # sem cópia: aponta para os arrays da curva
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📈 Evolução Under (Natural)")
-            st.line_chart(df_curva.set_index('minuto')['under'])
+            with metricas.medir('app.render.graficos'):
+                st.line_chart(df_curva['under'])
         
         with col2:
             st.subheader("📈 Evolução Over")
-            st.line_chart(df_curva.set_index('minuto')['over'])
+            with metricas.medir('app.render.graficos'):
+                st.line_chart(df_curva['over'])
+        
+        # Faixas de confiança (Monte Carlo)
+        st.subheader("📉 Faixas de Confiança (Simulação de Gols)")
+        
+        def montar_faixas():
+            bandas = carregar_simulacao(under_inicial).bandas()
+            df = pd.DataFrame({f"P{p}": bandas.faixa(p) for p in (5, 25, 75, 95)}, index=df_curva.index)
+            df.insert(2, 'Curva', curva.under)
+            return df
+        
+        with metricas.medir('app.dataframes'):
+            df_faixas = analisador.obter_tabela(('faixas', under_inicial), montar_faixas)
+        
+        with metricas.medir('app.render.graficos'):
+            st.line_chart(df_faixas)
+        st.caption("Percentis do Under em 100 mil jogos simulados (linha móvel: placar + 0.5)")
+        
+        # Todas as linhas a partir da cotação 0.5 (under e over informados), sem a margem
+        st.subheader("📐 Curvas por Linha (Odds Justas)")
+        
+        def montar_linhas():
+            mercado = projetar_cotacao(under_inicial, over_inicial, 0.5, metodo=metodo_margem)
+            df = pd.DataFrame(mercado['under'][0].T.round(2), index=df_curva.index,
+                              columns=[f"Under {linha}" for linha in mercado['linhas']])
+            return df, float(np.nanmax(mercado['margem'])), float(mercado['gols_esperados'][0])
+        
+        with metricas.medir('app.dataframes'):
+            df_linhas, margem, gols_esperados = analisador.obter_tabela(
+                ('linhas', under_inicial, over_inicial, metodo_margem), montar_linhas
+            )
+        
+        with metricas.medir('app.render.graficos'):
+            st.line_chart(df_linhas)
+        st.caption(f"⚖️ Margem de {margem:.1%} removida ({metodo_margem}) · {gols_esperados:.2f} gols esperados no jogo")
         
         # Verificação de consistência
         st.subheader("🔍 Verificação de Consistência")
         
-        problemas = []
-        for i in range(1, len(curva)):
-            if curva[i]['under'] > curva[i-1]['under']:
-                problemas.append(f"Min {curva[i]['minuto']}: {curva[i]['under']} > {curva[i-1]['under']}")
+        violacoes = verificar_curvas([under_inicial], analisador.parametros)
+        problemas = [DESCRICOES[nome] for nome, mascara in violacoes.items() if mascara[0]]
         
         if problemas:
             st.error(f"❌ **{len(problemas)} problemas encontrados**")
             for problema in problemas[:3]:
                 st.write(f"• {problema}")
         else:
-            st.success("✅ **Perfeito!** Curva sempre decrescente")
+            st.success("✅ **Perfeito!** Curva sempre decrescente e dentro dos limites")
         
         # Análise de períodos críticos
-        under_60 = curva[59]['under']  # Minuto 60
-        under_90 = curva[89]['under']  # Minuto 90
+        under_60 = curva.under[59]  # Minuto 60
+        under_90 = curva.under[89]  # Minuto 90
         queda_segundo_tempo = under_60 - under_90
         percentual_segundo_tempo = (queda_segundo_tempo / under_60) * 100
         
@@ -481,13 +277,172 @@ if modo == "📈 Projeção Completa":
         # Tabela completa
         st.subheader("📊 Tabela Completa Minuto a Minuto")
         
-        df_display = df_curva.copy()
-        df_display['Minuto'] = df_display['minuto']
-        df_display['Under'] = df_display['under']
-        df_display['Over'] = df_display['over']
-        df_display = df_display[['Minuto', 'Under', 'Over']]
+        with metricas.medir('app.dataframes'):
+            df_display = curva.para_dataframe(('Under', 'Over'), 'Minuto')
         
-        st.dataframe(df_display, use_container_width=True, height=400)
+        with metricas.medir('app.render.tabela'):
+            st.dataframe(df_display, use_container_width=True, height=400)
+
+elif modo == "📡 Radar de Oportunidades":
+    st.sidebar.subheader("📋 Radar")
+    quantidade_top = st.sidebar.slider("Top:", min_value=1, max_value=20, value=5)
+    
+    # Monitor e radar ficam na sessão: o ranking e os alertas acompanham as atualizações
+    if 'radar' not in st.session_state:
+        st.session_state.radar = RadarOportunidades(MonitorPartidas(carregar_analisador()))
+        st.session_state.grafico_radar = GraficoPartidas()
+    radar = st.session_state.radar
+    grafico = st.session_state.grafico_radar
+    monitor = radar.monitor
+    
+    st.header("📡 Radar de Oportunidades")
+    st.write("**Partidas acompanhadas** (edite o minuto e as odds e atualize o radar):")
+    
+    partidas = st.data_editor(
+        pd.DataFrame({
+            'Partida': ['Jogo A', 'Jogo B', 'Jogo C'],
+            'Placar': ['0x0', '1x0', '0x1'],
+            'Under Inicial': [7.0, 5.5, 9.0],
+            'Minuto': [25, 40, 30],
+            'Under Atual': [6.2, 2.8, 5.5],
+            'Over Atual': [1.19, 1.55, 1.22]
+        }),
+        num_rows="dynamic", use_container_width=True, key='partidas_radar'
+    ).dropna()
+    
+    if st.sidebar.button("📡 Atualizar Radar", type="primary"):
+        linhas = list(partidas.itertuples(index=False))
+        ids = {str(linha[0]) for linha in linhas}
+        for id_partida in [id_partida for id_partida in monitor.partidas if id_partida not in ids]:
+            monitor.encerrar_partida(id_partida)
+            grafico.encerrar_partida(id_partida)
+        novas = {str(linha[0]): float(linha[2]) for linha in linhas if str(linha[0]) not in monitor}
+        if novas:
+            monitor.iniciar_partidas(novas.keys(), novas.values())
+            for id_partida, under_inicial in novas.items():
+                grafico.adicionar_partida(id_partida, monitor.partidas[id_partida].curva, faixas_grafico(under_inicial))
+        for id_partida, placar, _, minuto, under, over in linhas:
+            monitor.registrar_placar(str(id_partida), placar)
+            monitor.processar_tick(str(id_partida), min(max(int(minuto), 1), 89), float(under), float(over))
+            grafico.registrar_tick(str(id_partida), min(max(int(minuto), 1), 89), float(under))
+    
+    if len(monitor) == 0:
+        st.info("💡 Clique em 📡 Atualizar Radar para ranquear as partidas")
+    else:
+        colunas = {
+            'id_partida': 'Partida', 'minuto': 'Minuto', 'placar': 'Placar', 'under_atual': 'Under Atual',
+            'under_esperado': 'Under Esperado', 'divergencia_percent': 'Divergência %', 'status': 'Status',
+            'entrada_minuto': 'Entrada (min)', 'entrada_queda_percent': 'Queda Entrada %'
+        }
+        
+        st.subheader(f"🏆 Top {quantidade_top} - Maiores Divergências")
+        st.dataframe(pd.DataFrame(radar.top(quantidade_top), columns=list(colunas)).rename(columns=colunas),
+                     use_container_width=True, hide_index=True)
+        
+        st.subheader(f"🎯 Top {quantidade_top} - Melhores Entradas em Under")
+        st.dataframe(pd.DataFrame(radar.top(quantidade_top, 'entrada'), columns=list(colunas)).rename(columns=colunas),
+                     use_container_width=True, hide_index=True)
+        
+        st.subheader("📈 Curvas ao Vivo")
+        with metricas.medir('app.render.graficos'):
+            desenhar_grafico(grafico)
+        st.caption("Curva esperada, faixas P5/P95 e ticks de cada partida, reduzidos a no máximo "
+                   f"{grafico.pontos + 2} pontos por série (LTTB)")
+        
+        st.subheader("🔔 Alertas de Status")
+        alertas = list(radar.alertas)[-20:]
+        if not alertas:
+            st.write("Nenhuma partida cruzou um limiar de status ainda.")
+        for alerta in reversed(alertas):
+            st.write(f"{alerta['direcao']} **{alerta['id_partida']}** ({alerta['minuto']}'): "
+                     f"{alerta['de']} → {alerta['para']} ({alerta['divergencia_percent']:+.1f}%)")
+
+elif modo == "🖥️ Monitor Compartilhado":
+    st.header("🖥️ Monitor Compartilhado")
+    st.caption(f"Segmento de memória compartilhada: {nome_monitor}")
+    quantidade_top = st.sidebar.slider("Partidas:", min_value=5, max_value=100, value=20)
+    st.sidebar.button("🔄 Atualizar", type="primary")
+    
+    try:
+        memoria_monitor = anexar_monitor(nome_monitor)
+    except FileNotFoundError:
+        st.error(f"❌ Segmento '{nome_monitor}' não encontrado: o coordenador está rodando com --manter?")
+        st.stop()
+    
+    st.subheader("📊 Carga por Partição")
+    st.dataframe(pd.DataFrame(memoria_monitor.carga()).set_index('particao'), use_container_width=True)
+    
+    # Leitura direta dos arrays compartilhados: só as linhas ativas são copiadas
+    df_monitor = pd.DataFrame(memoria_monitor.instantaneo())
+    st.metric("Partidas Ativas", len(df_monitor))
+    if len(df_monitor):
+        st.subheader(f"🔥 Top {quantidade_top} - Maiores Divergências")
+        st.dataframe(
+            df_monitor.nlargest(quantidade_top, 'divergencia_percent')[
+                ['id_partida', 'particao', 'minuto', 'under_atual', 'under_esperado',
+                 'divergencia_percent', 'status', 'ritmo', 'potencial']
+            ],
+            use_container_width=True, hide_index=True
+        )
+        
+        # Curvas das partidas escolhidas: com "ao vivo", só o fragmento do gráfico roda a cada segundo,
+        # e o orçamento de pontos por série não cresce com o histórico de ticks
+        st.subheader("📈 Curvas ao Vivo")
+        ids_monitor = df_monitor.sort_values('divergencia_percent', ascending=False)['id_partida'].tolist()
+        escolhidas = st.multiselect("Partidas no gráfico:", ids_monitor, default=ids_monitor[:5])
+        ao_vivo = st.sidebar.toggle("▶️ Acompanhar ao vivo")
+        
+        if 'grafico_monitor' not in st.session_state:
+            st.session_state.grafico_monitor = GraficoPartidas()
+            st.session_state.ticks_grafico = {}
+            st.session_state.linhas_grafico = pd.DataFrame({'minuto': [], 'valor': [], 'serie': []})
+        grafico = st.session_state.grafico_monitor
+        ticks_vistos = st.session_state.ticks_grafico
+        
+        def alimentar_grafico(estado):
+            """Leva ao gráfico os ticks novos das partidas escolhidas
+
+            Partidas encerradas ou tiradas da seleção saem do gráfico; devolve
+            os nomes das séries removidas.
+            """
+            ativas = set(estado['id_partida'].tolist())
+            removidas = set()
+            for id_partida in grafico.partidas():
+                if id_partida not in ativas or id_partida not in escolhidas:
+                    removidas |= grafico.remover_partida(id_partida)
+                    ticks_vistos.pop(id_partida, None)
+            novas = [(i, id_partida) for i, id_partida in enumerate(estado['id_partida'].tolist())
+                     if id_partida in escolhidas and id_partida not in grafico]
+            if novas:
+                curvas = gerar_curvas_lote([estado['under_inicial'][i] for i, _ in novas])['under']
+                for curva, (i, id_partida) in zip(curvas, novas):
+                    grafico.adicionar_partida(id_partida, curva, faixas_grafico(float(estado['under_inicial'][i])))
+            for i, id_partida in enumerate(estado['id_partida'].tolist()):
+                if id_partida in grafico and estado['ticks'][i] > ticks_vistos.get(id_partida, 0):
+                    ticks_vistos[id_partida] = int(estado['ticks'][i])
+                    grafico.registrar_tick(id_partida, float(estado['minuto'][i]), float(estado['under_atual'][i]))
+            return removidas
+        
+        @st.fragment(run_every=1 if ao_vivo else None)
+        def curvas_ao_vivo():
+            """Relê o segmento e anexa às linhas do gráfico só os pontos emitidos desde a última execução"""
+            removidas = alimentar_grafico(memoria_monitor.instantaneo())
+            linhas = st.session_state.linhas_grafico
+            if removidas:
+                linhas = linhas[~linhas['serie'].isin(removidas)].reset_index(drop=True)
+            novas = grafico.novas_linhas()
+            if novas['minuto']:
+                linhas = pd.concat([linhas, pd.DataFrame(novas)], ignore_index=True)
+            st.session_state.linhas_grafico = linhas
+            with metricas.medir('app.render.graficos'):
+                st.line_chart(st.session_state.linhas_grafico, x='minuto', y='valor', color='serie')
+            dados_grafico = grafico.estatisticas()
+            st.caption(
+                f"{dados_grafico['ticks_recebidos']} ticks → {dados_grafico['pontos']} pontos no gráfico "
+                f"(no máximo {grafico.pontos + 2} por série, LTTB)"
+            )
+        
+        curvas_ao_vivo()
 
 else:
     # Modo Jogo em Andamento
@@ -498,9 +453,14 @@ else:
     under_atual = st.sidebar.number_input("Under Atual:", value=4.5, min_value=1.01, max_value=999.0, step=0.1)
     over_atual = st.sidebar.number_input("Over Atual:", value=1.28, min_value=1.01, max_value=999.0, step=0.01)
     minuto_atual = st.sidebar.slider("Minuto Atual:", min_value=1, max_value=89, value=25)
+    segundo_atual = st.sidebar.slider("Segundo:", min_value=0, max_value=59, value=0)
+    metodo_margem = st.sidebar.selectbox("⚖️ Remoção de Margem:", METODOS)
     
     if st.sidebar.button("🚀 Executar Análise", type="primary"):
-        analisador = AnalisadorApostasUnderOver()
+        st.session_state.analise_jogo = True
+    
+    if st.session_state.get('analise_jogo', False):
+        analisador = carregar_analisador()
         
         st.header("📊 Jogo em Andamento")
         
@@ -508,7 +468,7 @@ else:
         
         with col1:
             st.metric("Placar", placar_atual)
-            st.metric("Minuto", f"{minuto_atual}'")
+            st.metric("Minuto", f"{minuto_atual}'{segundo_atual:02d}\"" if segundo_atual else f"{minuto_atual}'")
         
         with col2:
             st.metric("Under", f"{under_inicial_jogo} → {under_atual}")
@@ -517,10 +477,28 @@ else:
             st.metric("Over", f"{over_inicial_jogo} → {over_atual}")
         
         # Análise
-        curva = analisador.gerar_curva_equilibrio_90min(under_inicial_jogo, over_inicial_jogo)
-        under_esperado = curva[minuto_atual - 1]['under']
+        debug_pontos = st.sidebar.checkbox("🔍 Mostrar Pontos de Controle", False)
+        tabela_curvas = carregar_tabela_curvas()
         
-        divergencia = analisador.analisar_divergencia(under_atual, under_esperado, minuto_atual)
+        if tabela_curvas is not None and not debug_pontos:
+            # Consulta O(1) na tabela mapeada em memória
+            under_esperado = tabela_curvas.under_esperado(under_inicial_jogo, minuto_atual)
+        else:
+            curva = analisador.gerar_curva_equilibrio_90min(
+                under_inicial_jogo, over_inicial_jogo,
+                ao_criar_pontos=mostrar_pontos_controle if debug_pontos else None
+            )
+            under_esperado = float(curva.under[minuto_atual - 1])
+        
+        if segundo_atual:
+            # Resolução por segundo: avalia a curva no minuto fracionário
+            under_esperado = round(under_esperado_continuo(under_inicial_jogo, minuto_atual + segundo_atual / 60), 2)
+        
+        # Percentil do Under atual entre os jogos simulados com o mesmo placar no minuto
+        divergencia = analisar_divergencia_percentil(
+            analisador, carregar_simulacao(under_inicial_jogo), under_atual, under_esperado,
+            minuto_atual, gols=total_gols(placar_atual)
+        )
         
         st.subheader("🔍 Análise de Divergência")
         
@@ -530,6 +508,8 @@ else:
             st.metric("Under Esperado", f"{under_esperado:.2f}")
             st.metric("Under Atual", f"{under_atual}")
             st.metric("Divergência", f"{divergencia['divergencia_percent']:+.1f}%")
+            if divergencia['percentil'] is not None:
+                st.metric("Percentil Simulado", f"{divergencia['percentil']:.0f}%")
         
         with col2:
             st.write(f"**Status:** {divergencia['status']}")
@@ -554,7 +534,7 @@ else:
         # Projeção final
         under_final = analisador.calcular_under_final_esperado(under_inicial_jogo)
         over_final = analisador.calcular_over_baseado_no_under(under_final)
-        queda_restante = ((under_atual - under_final) / under_atual) * 100 if under_atual > under_final else 0
+        queda_restante = analisador.calcular_queda_restante(under_atual, under_final)
         
         st.subheader("🎯 Projeção Final")
         
@@ -567,43 +547,121 @@ else:
             st.metric("Over Final", f"{over_final:.3f}")
         
         with col3:
-            if queda_restante > 35:
-                potencial = "🔥 MUITO ALTO"
-            elif queda_restante > 25:
-                potencial = "💰 ALTO"
-            elif queda_restante > 15:
-                potencial = "⚖️ MÉDIO"
-            else:
-                potencial = "⚠️ BAIXO"
-            
+            potencial = analisador.classificar_potencial(queda_restante)
             st.metric("Potencial Under", potencial)
             st.metric("Queda Restante", f"{max(queda_restante, 0):.1f}%")
         
         # Projeção restante
         st.subheader("📊 Projeção Restante (Queda Gradual)")
         
+        gols = total_gols(placar_atual)
+        if gols is None:
+            st.warning("⚠️ Placar não reconhecido (use o formato 0x1): projeção linear sem considerar o placar")
+        else:
+            st.caption(f"⚽ Família de projeção: {gols} gol(s) no minuto {minuto_atual}")
+        
         projecao = analisador.projetar_restante_equilibrio(under_inicial_jogo, under_atual, minuto_atual, placar_atual)
         
         if projecao:
-            df_projecao = pd.DataFrame(projecao)
+            with metricas.medir('app.dataframes'):
+                df_projecao = projecao.para_dataframe()
             
             col1, col2 = st.columns(2)
             
             with col1:
                 st.write("**Under - Projeção Natural:**")
-                st.line_chart(df_projecao.set_index('minuto')['under'])
+                with metricas.medir('app.render.graficos'):
+                    st.line_chart(df_projecao['under'])
             
             with col2:
                 st.write("**Over - Evolução:**")
-                st.line_chart(df_projecao.set_index('minuto')['over'])
+                with metricas.medir('app.render.graficos'):
+                    st.line_chart(df_projecao['over'])
             
             # Tabela
             st.subheader(f"📋 Projeção Restante - Min {minuto_atual + 1} ao 90")
             
-            df_display = df_projecao[['minuto', 'under', 'over']].copy()
-            df_display.columns = ['Minuto', 'Under', 'Over']
+            with metricas.medir('app.dataframes'):
+                df_display = projecao.para_dataframe(('Under', 'Over'), 'Minuto')
+            
+            with metricas.medir('app.render.tabela'):
+                st.dataframe(df_display, use_container_width=True, height=300)
+            
+            # Mesma partida em cada estado de gols: uma consulta por família
+            st.subheader("⚽ Projeção por Total de Gols")
+            
+            def montar_cenarios():
+                estados = range(MAX_GOLS + 1)
+                unders = projetar_lote([under_final] * len(estados), [under_atual] * len(estados),
+                                       [minuto_atual] * len(estados), list(estados))
+                df = pd.DataFrame(unders[:, minuto_atual:].T.round(2),
+                                  columns=[f"{g}{'+' if g == MAX_GOLS else ''} gols" for g in estados])
+                df.index = range(minuto_atual + 1, 91)
+                return df
             
-            st.dataframe(df_display, use_container_width=True, height=300)
+            with metricas.medir('app.dataframes'):
+                df_cenarios = analisador.obter_tabela(('cenarios_placar', under_final, under_atual, minuto_atual), montar_cenarios)
+            
+            with metricas.medir('app.render.graficos'):
+                st.line_chart(df_cenarios)
+        
+        # Linhas ainda abertas, a partir da cotação atual (linha placar + 0.5)
+        if gols is not None:
+            st.subheader("📐 Mercado por Linha (Odds Justas)")
+            
+            def montar_mercado():
+                mercado = projetar_cotacao(under_atual, over_atual, gols + 0.5, gols, minuto_atual, metodo=metodo_margem)
+                abertas = mercado['linhas'] > gols
+                df = pd.DataFrame(mercado['under'][0, abertas, minuto_atual:].T.round(2),
+                                  index=range(minuto_atual + 1, 91),
+                                  columns=[f"Under {linha}" for linha in mercado['linhas'][abertas]])
+                indice = list(mercado['linhas']).index(gols + 0.5)
+                return df, float(mercado['margem'][0, indice]), float(mercado['gols_esperados'][0])
+            
+            with metricas.medir('app.dataframes'):
+                df_mercado, margem, gols_restantes = analisador.obter_tabela(
+                    ('mercado', under_atual, over_atual, gols, minuto_atual, metodo_margem), montar_mercado
+                )
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Margem", f"{margem:.1%}")
+            with col2:
+                st.metric("Under Justo", f"{df_mercado.iloc[0, 0]:.2f}")
+            with col3:
+                st.metric("Gols Restantes", f"{gols_restantes:.2f}")
+            
+            with metricas.medir('app.render.graficos'):
+                st.line_chart(df_mercado)
+
+# Invariantes do modelo em todo o domínio (calculadas uma vez por processo)
+relatorio_validacao = validar_modelo()
+with st.sidebar.expander("🧪 Invariantes do Modelo" + ("" if relatorio_validacao['ok'] else " ⚠️")):
+    linhas_validacao = formatar_relatorio(relatorio_validacao)
+    st.write(("✅ " if relatorio_validacao['ok'] else "⚠️ ") + linhas_validacao[0])
+    for linha in linhas_validacao[1:]:
+        st.write(f"• {linha}")
+
+# Estatísticas do cache
+with st.sidebar.expander("📦 Cache"):
+    for nome, dados in carregar_analisador().estatisticas().items():
+        if nome == 'disco':
+            st.write(f"**💾 disco:** {dados['acertos']} acertos / {dados['falhas']} falhas "
+                     f"({dados['itens']} itens, {dados['bytes'] / 1024:.0f}/{dados['tamanho_maximo'] / 1024:.0f} KB)")
+            continue
+        st.write(f"**{nome}:** {dados['acertos']} acertos / {dados['falhas']} falhas ({dados['itens']}/{dados['tamanho_maximo']})")
+
+# Métricas de desempenho (só com ANALISADOR_METRICAS=1)
+if metricas.REGISTRO.ativo:
+    metricas.REGISTRO.observar('app.rerun', time.perf_counter() - inicio_rerun)
+    with st.sidebar.expander("⏱️ Métricas"):
+        if endpoint_metricas is None:
+            st.caption("Endpoint /metrics desativado (porta ocupada ou não configurada)")
+        else:
+            st.caption(f"Endpoint: http://127.0.0.1:{endpoint_metricas.server_address[1]}/metrics")
+        temporizadores = metricas.REGISTRO.para_json()['temporizadores']
+        for nome, dados in sorted(temporizadores.items(), key=lambda item: -item[1]['total_s'])[:10]:
+            st.write(f"**{nome}:** {dados['chamadas']}× · média {dados['media_us']:.0f} µs")
 
 # Rodapé
 st.sidebar.markdown("---")
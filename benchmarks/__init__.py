@@ -0,0 +1 @@
+"""Benchmarks do analisador (python -m benchmarks.executar)."""
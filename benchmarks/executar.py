@@ -0,0 +1,343 @@
+"""Suíte de benchmarks do analisador
+
+Mede cada método de AnalisadorApostasUnderOver, as execuções completas
+dos dois modos da interface (sem Streamlit), o escalonamento de 1 a
+100 mil partidas, a varredura de janelas de entrada, o mercado de várias
+linhas, a validação das invariantes e a API HTTP (servico.py) numa
+instância local. Para cada caso reporta vazão, latência p50/p99 e pico
+de memória, e compara com a linha de base gravada em baseline.json.
+
+    python -m benchmarks.executar                    # roda e compara
+    python -m benchmarks.executar --filtro lote      # só casos que casam
+    python -m benchmarks.executar --salvar-baseline  # grava nova base
+
+Sai com código 1 quando algum p50 piora mais que --limiar (padrão 25%).
+"""
+import argparse
+import contextlib
+import functools
+import http.client
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from analisador import AnalisadorApostasUnderOver
+from analisador.entradas import ESTRATEGIA_UNDER, grade_estrategias, varrer_entradas, varrer_estrategias
+from analisador.lote import gerar_curvas_lote
+from analisador.mercado import LINHAS, METODOS, cdf_poisson, projetar_linhas
+from analisador.monitor import MonitorPartidas
+from analisador.servico import iniciar_servico
+from analisador.simulacao import simular
+from analisador.tabela import grade_centesimos
+from analisador.validacao import validar_dominio
+
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+ESCALAS = (1, 10, 100, 1000, 10000, 100000)
+
+Caso = namedtuple('Caso', 'nome preparar itens repeticoes')
+Caso.__doc__ = """Um benchmark: preparar(recursos) devolve a função medida
+
+A função processa `itens` unidades por chamada. preparar só roda para os
+casos selecionados; o que precisa ser fechado (servidor, pool) vai para
+recursos, um ExitStack fechado logo depois de medir o caso.
+"""
+
+
+def _unders(quantidade, semente=0):
+    return np.round(np.random.default_rng(semente).uniform(1.5, 30.0, quantidade), 2)
+
+
+def _pronta(funcao):
+    """preparar de um caso sem preparação: devolve funcao como está"""
+    return lambda recursos: funcao
+
+
+def casos_metodos(analisador):
+    """Um caso por método do analisador, com entradas típicas"""
+    curva = functools.cache(lambda: analisador.gerar_curva_equilibrio_90min(7.0, 1.14))
+    pontos = functools.cache(lambda: analisador.criar_curva_natural(7.0, 1.15))
+
+    def com_curva(metodo):
+        return lambda recursos: functools.partial(metodo, curva())
+
+    return [
+        Caso('metodo.calcular_under_final_esperado',
+             _pronta(lambda: analisador.calcular_under_final_esperado(7.0)), 1, 20000),
+        Caso('metodo.calcular_over_baseado_no_under',
+             _pronta(lambda: analisador.calcular_over_baseado_no_under(4.5)), 1, 20000),
+        Caso('metodo.criar_curva_natural', _pronta(lambda: analisador.criar_curva_natural(7.0, 1.15)), 1, 5000),
+        Caso('metodo.interpolar_suave',
+             lambda recursos: functools.partial(analisador.interpolar_suave, 37, pontos()), 1, 20000),
+        Caso('metodo.gerar_curva_equilibrio_90min',
+             _pronta(lambda: analisador.gerar_curva_equilibrio_90min(7.0, 1.14)), 1, 1000),
+        Caso('metodo.analisar_divergencia', _pronta(lambda: analisador.analisar_divergencia(4.5, 4.68, 25)), 1, 20000),
+        Caso('metodo.calcular_taxa_queda', _pronta(lambda: analisador.calcular_taxa_queda(7.0, 4.5, 25)), 1, 20000),
+        Caso('metodo.classificar_ritmo', _pronta(lambda: analisador.classificar_ritmo(0.014)), 1, 20000),
+        Caso('metodo.calcular_queda_restante',
+             _pronta(lambda: analisador.calcular_queda_restante(4.5, 1.15)), 1, 20000),
+        Caso('metodo.classificar_potencial', _pronta(lambda: analisador.classificar_potencial(30.0)), 1, 20000),
+        Caso('metodo.analisar_distribuicao_queda', com_curva(analisador.analisar_distribuicao_queda), 1, 5000),
+        Caso('metodo.analisar_melhor_entrada_under', com_curva(analisador.analisar_melhor_entrada_under), 1, 5000),
+        Caso('metodo.analisar_melhor_entrada_over', com_curva(analisador.analisar_melhor_entrada_over), 1, 5000),
+        Caso('metodo.projetar_restante_equilibrio',
+             _pronta(lambda: analisador.projetar_restante_equilibrio(7.0, 4.5, 25, '0x1')), 1, 2000),
+    ]
+
+
+def modo_projecao_completa(analisador, under_inicial):
+    """Mesmos cálculos e DataFrames do modo 📈 Projeção Completa, sem renderização"""
+    analisador.calcular_under_final_esperado(under_inicial)
+    curva = analisador.gerar_curva_equilibrio_90min(under_inicial, 1.14)
+    analisador.analisar_distribuicao_queda(curva)
+    np.flatnonzero(np.diff(curva.under) > 0)
+    analisador.analisar_melhor_entrada_under(curva)
+    analisador.analisar_melhor_entrada_over(curva)
+    curva.para_dataframe()
+    curva.para_dataframe(('Under', 'Over'), 'Minuto')
+
+
+def modo_jogo_em_andamento(analisador, under_inicial, under_atual, minuto):
+    """Mesmos cálculos e DataFrames do modo 🎯 Jogo em Andamento, sem renderização"""
+    curva = analisador.gerar_curva_equilibrio_90min(under_inicial, 1.14)
+    analisador.analisar_divergencia(under_atual, float(curva.under[minuto - 1]), minuto)
+    analisador.classificar_ritmo(analisador.calcular_taxa_queda(under_inicial, under_atual, minuto))
+    under_final = analisador.calcular_under_final_esperado(under_inicial)
+    analisador.calcular_over_baseado_no_under(under_final)
+    analisador.classificar_potencial(analisador.calcular_queda_restante(under_atual, under_final))
+    projecao = analisador.projetar_restante_equilibrio(under_inicial, under_atual, minuto, '0x1')
+    projecao.para_dataframe()
+    projecao.para_dataframe(('Under', 'Over'), 'Minuto')
+
+
+def casos_modos(analisador):
+    return [
+        Caso('modo.projecao_completa', _pronta(lambda: modo_projecao_completa(analisador, 7.0)), 1, 500),
+        Caso('modo.jogo_em_andamento', _pronta(lambda: modo_jogo_em_andamento(analisador, 7.0, 4.5, 25)), 1, 500),
+    ]
+
+
+def casos_escala(analisador, escalas=ESCALAS, limite_escalar=1000):
+    """Escalonamento por número de partidas"""
+    casos = []
+    for quantidade in escalas:
+        unders = functools.cache(functools.partial(_unders, quantidade))
+        repeticoes = max(3, min(200, 200000 // (quantidade * 10)))
+
+        casos.append(Caso(f'escala.curvas_lote.{quantidade}',
+                          lambda recursos, unders=unders: functools.partial(gerar_curvas_lote, unders()),
+                          quantidade, repeticoes))
+
+        def ticks_monitor(u):
+            monitor = MonitorPartidas(analisador, max_partidas=len(u))
+            ids = range(len(u))
+            monitor.iniciar_partidas(ids, u)
+            for i, under in zip(ids, u.tolist()):
+                monitor.processar_tick(i, 25, under * 0.8, 1.3)
+
+        casos.append(Caso(f'escala.monitor_tick.{quantidade}',
+                          lambda recursos, unders=unders: functools.partial(ticks_monitor, unders()),
+                          quantidade, repeticoes))
+
+        if quantidade <= limite_escalar:
+            def curvas_escalares(u):
+                for under in u:
+                    analisador.gerar_curva_equilibrio_90min(under, 1.14)
+
+            casos.append(Caso(f'escala.curvas_escalar.{quantidade}',
+                              lambda recursos, unders=unders: functools.partial(curvas_escalares, unders().tolist()),
+                              quantidade, max(3, min(100, 20000 // (quantidade * 10)))))
+    return casos
+
+
+def casos_simulacao(caminhos=100000):
+    return [
+        Caso(f'simulacao.sortear.{caminhos}', _pronta(lambda: simular(7.0, caminhos)), caminhos, 5),
+        Caso(f'simulacao.bandas.{caminhos}', lambda recursos: simular(7.0, caminhos).bandas, caminhos, 5),
+    ]
+
+
+def casos_entradas(partidas=10000):
+    """Varredura de janelas de entrada: a estratégia do under e uma grade de 18 estratégias"""
+    curvas = functools.cache(lambda: gerar_curvas_lote(_unders(partidas)))
+    grade = grade_estrategias(janelas=(10, 15, 20), passos=(3, 5), limiares=(6, 8, 10))
+    return [
+        Caso(f'entradas.under.{partidas}',
+             lambda recursos: functools.partial(varrer_entradas, curvas()['under'], ESTRATEGIA_UNDER), partidas, 20),
+        Caso(f'entradas.grade.{partidas}',
+             lambda recursos: functools.partial(varrer_estrategias, curvas(), grade), partidas, 5),
+    ]
+
+
+def casos_validacao():
+    """Invariantes do modelo em toda a grade de centésimos (1.01 a 999)"""
+    grade = grade_centesimos()
+    return [Caso(f'validacao.dominio.{len(grade)}', _pronta(lambda: validar_dominio(grade)), len(grade), 3)]
+
+
+def casos_mercado(partidas=1000):
+    """Escadas de 4 linhas com margem de 5%: projeção (partidas x linhas x 90) por método"""
+    @functools.cache
+    def cotacoes():
+        medias = np.random.default_rng(0).uniform(1.5, 4.0, partidas)
+        prob_under = cdf_poisson(np.floor(LINHAS).astype(np.int64)[None, :], medias[:, None])
+        return 1 / (prob_under * 1.05), 1 / ((1 - prob_under) * 1.05)
+
+    def preparar(recursos, metodo):
+        unders, overs = cotacoes()
+        return lambda: projetar_linhas(unders, overs, metodo=metodo)
+
+    return [
+        Caso(f'mercado.{metodo}.{partidas}', functools.partial(preparar, metodo=metodo), partidas, 20)
+        for metodo in METODOS
+    ]
+
+
+def casos_servico(clientes=32):
+    """API HTTP numa instância local: uma requisição e rajadas concorrentes"""
+    caminho = '/divergencia?under_inicial=7.0&minuto=25&under_atual=4.5'
+
+    def servidor(recursos, trabalhadores):
+        """Sobe a instância e devolve requisitar(), que usa uma conexão keep-alive por thread"""
+        instancia = iniciar_servico(0, trabalhadores=trabalhadores)
+        recursos.callback(instancia.server_close)
+        recursos.callback(instancia.shutdown)
+        porta = instancia.server_address[1]
+        conexoes = threading.local()
+        abertas = []
+        recursos.callback(lambda: [conexao.close() for conexao in abertas])
+
+        def requisitar(_=None):
+            conexao = getattr(conexoes, 'conexao', None)
+            if conexao is None:
+                conexao = conexoes.conexao = http.client.HTTPConnection('127.0.0.1', porta)
+                abertas.append(conexao)
+            conexao.request('GET', caminho)
+            conexao.getresponse().read()
+
+        return requisitar
+
+    def sequencial(recursos):
+        return servidor(recursos, 1)
+
+    def rajada(recursos):
+        # Cada conexão keep-alive ocupa um trabalhador: um por cliente da rajada
+        requisitar = servidor(recursos, clientes)
+        pool = recursos.enter_context(ThreadPoolExecutor(clientes))
+        return lambda: list(pool.map(requisitar, range(clientes)))
+
+    return [
+        Caso('servico.divergencia', sequencial, 1, 500),
+        Caso(f'servico.rajada.{clientes}', rajada, clientes, 50),
+    ]
+
+
+def medir(caso, funcao):
+    """Latências (ns) de cada repetição e pico de memória de uma chamada"""
+    funcao()  # aquecimento
+    latencias = np.empty(caso.repeticoes, dtype=np.int64)
+    for i in range(caso.repeticoes):
+        inicio = time.perf_counter_ns()
+        funcao()
+        latencias[i] = time.perf_counter_ns() - inicio
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = float(np.percentile(latencias, 50))
+    return {
+        'itens': caso.itens,
+        'repeticoes': caso.repeticoes,
+        'p50_us': round(p50 / 1000, 3),
+        'p99_us': round(float(np.percentile(latencias, 99)) / 1000, 3),
+        'vazao_por_s': round(caso.itens / (p50 / 1e9), 1) if p50 else 0.0,
+        'pico_memoria_kb': round(pico / 1024, 1)
+    }
+
+
+def comparar(resultados, baseline, limiar):
+    """Casos cujo p50 piorou mais que limiar em relação à base"""
+    regressoes = []
+    for nome, atual in resultados.items():
+        base = baseline.get(nome)
+        if not base or not base['p50_us']:
+            continue
+        variacao = atual['p50_us'] / base['p50_us'] - 1
+        atual['variacao_percent'] = round(variacao * 100, 1)
+        if variacao > limiar:
+            regressoes.append((nome, base['p50_us'], atual['p50_us'], variacao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do analisador')
+    parser.add_argument('--filtro', default=None, help='expressão regular sobre o nome dos casos')
+    parser.add_argument('--rapido', action='store_true', help='escala só até 10 mil partidas')
+    parser.add_argument('--limiar', type=float, default=0.25, help='piora tolerada no p50 (0.25 = 25%%)')
+    parser.add_argument('--salvar-baseline', action='store_true')
+    parser.add_argument('--baseline', default=ARQUIVO_BASELINE)
+    parser.add_argument('--saida', default=None, help='grava os resultados em JSON')
+    args = parser.parse_args(argv)
+
+    analisador = AnalisadorApostasUnderOver()
+    escalas = tuple(e for e in ESCALAS if not args.rapido or e <= 10000)
+    casos = (casos_metodos(analisador) + casos_modos(analisador) + casos_escala(analisador, escalas)
+             + casos_simulacao() + casos_entradas() + casos_mercado() + casos_validacao() + casos_servico())
+    if args.filtro:
+        casos = [c for c in casos if re.search(args.filtro, c.nome)]
+
+    resultados = {}
+    for caso in casos:
+        # Cada caso prepara e fecha os próprios recursos, mesmo se falhar
+        with contextlib.ExitStack() as recursos:
+            resultados[caso.nome] = medida = medir(caso, caso.preparar(recursos))
+        print(f"{caso.nome:45s} p50 {medida['p50_us']:>12.1f} µs  p99 {medida['p99_us']:>12.1f} µs  "
+              f"{medida['vazao_por_s']:>14.1f}/s  pico {medida['pico_memoria_kb']:>10.1f} KB")
+
+    if args.saida:
+        with open(args.saida, 'w') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+
+    if args.salvar_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as arquivo:
+                baseline = json.load(arquivo).get('resultados', {})
+        baseline.update(resultados)
+        with open(args.baseline, 'w') as arquivo:
+            json.dump({
+                'ambiente': {'python': platform.python_version(), 'numpy': np.__version__,
+                             'maquina': platform.machine()},
+                'resultados': baseline
+            }, arquivo, indent=2)
+        print(f"✅ Linha de base gravada em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ Sem linha de base para comparar (use --salvar-baseline)")
+        return 0
+    with open(args.baseline) as arquivo:
+        baseline = json.load(arquivo)['resultados']
+    regressoes = comparar(resultados, baseline, args.limiar)
+    if regressoes:
+        print(f"❌ {len(regressoes)} regressões acima de {args.limiar * 100:.0f}%:")
+        for nome, antes, depois, variacao in regressoes:
+            print(f"  • {nome}: {antes:.1f} → {depois:.1f} µs ({variacao * 100:+.1f}%)")
+        return 1
+    print("✅ Nenhuma regressão acima do limiar")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
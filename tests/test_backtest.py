@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from analisador.backtest import FAIXAS, avaliar_fatia, executar_backtest, resumir
+from analisador.historico import TICK, ArmazemTicks
+from analisador.lote import STATUS_DIVERGENCIA
+from analisador.nucleo import AnalisadorApostasUnderOver
+
+ANALISADOR = AnalisadorApostasUnderOver()
+PARTIDAS = 23
+
+
+@pytest.fixture(scope='module')
+def raiz(tmp_path_factory):
+    """Armazém com partidas sintéticas: curva esperada com ruído, ticks irregulares"""
+    raiz = str(tmp_path_factory.mktemp('historico'))
+    armazem = ArmazemTicks(raiz)
+    aleatorio = np.random.default_rng(11)
+    for p in range(PARTIDAS):
+        under_inicial = round(float(aleatorio.uniform(2.0, 15.0)), 2)
+        armazem.registrar_partida(f'P{p}', under_inicial)
+        if p == 5:
+            continue  # partida sem ticks
+        curva = ANALISADOR.gerar_curva_equilibrio_90min(under_inicial, 1.0).under
+        minutos = np.sort(aleatorio.choice(np.arange(1, 91), size=int(aleatorio.integers(5, 60)), replace=False))
+        ticks = np.zeros(minutos.shape[0], dtype=TICK)
+        ticks['minuto'] = minutos
+        ticks['instante'] = (minutos - 1) * 60
+        ticks['under'] = np.maximum(curva[minutos - 1] * aleatorio.uniform(0.75, 1.25, minutos.shape[0]), 1.01)
+        ticks['over'] = 1 / (1 - 1 / ticks['under'])
+        armazem.anexar(f'P{p}', ticks)
+    return raiz
+
+
+def _divergencia_escalar(raiz, minutos_saida=15):
+    """Faixas de divergência por força bruta, partida a partida, no caminho escalar"""
+    armazem = ArmazemTicks(raiz)
+    totais = np.zeros((len(FAIXAS), 3))
+    for id_partida in armazem.partidas():
+        ticks = np.array(armazem.ticks(id_partida))
+        if not ticks.shape[0]:
+            continue
+        curva = ANALISADOR.gerar_curva_equilibrio_90min(armazem.under_inicial(id_partida), 1.0).under
+        vistas = set()
+        for i, tick in enumerate(ticks):
+            minuto = float(tick['minuto'])
+            under = float(tick['under'])
+            esperado = float(curva[min(max(int(minuto), 1), 90) - 1])
+            faixa = STATUS_DIVERGENCIA.index(ANALISADOR.analisar_divergencia(under, esperado, int(minuto))['status'])
+            if faixa in vistas:
+                continue
+            vistas.add(faixa)
+            saida = next((j for j in range(i, len(ticks)) if ticks['minuto'][j] >= minuto + minutos_saida),
+                         len(ticks) - 1)
+            retorno = under / float(ticks['under'][saida]) - 1
+            totais[faixa] += (1, retorno > 0, retorno)
+    return totais
+
+
+def test_divergencia_igual_ao_caminho_escalar(raiz):
+    relatorio = executar_backtest(raiz, processos=1)
+    referencia = resumir(_divergencia_escalar(raiz))
+    for nome in STATUS_DIVERGENCIA:
+        assert relatorio[nome] == referencia[nome]
+    assert sum(relatorio[nome]['entradas'] for nome in STATUS_DIVERGENCIA) > PARTIDAS
+
+
+def test_determinismo_entre_processos_e_fatias(raiz):
+    referencia = executar_backtest(raiz, processos=1)
+    assert referencia['janela_under']['entradas'] > 0
+    assert referencia['janela_over']['entradas'] > 0
+    for processos, tamanho_fatia in ((2, 4), (3, 4), (1, 4), (2, 1), (1, 500)):
+        relatorio = executar_backtest(raiz, processos=processos, tamanho_fatia=tamanho_fatia)
+        assert relatorio == referencia, (processos, tamanho_fatia)
+    # Com as mesmas fatias, a soma parcial sai idêntica qualquer que seja o pool
+    assert executar_backtest(raiz, processos=2, tamanho_fatia=4) == executar_backtest(raiz, processos=4, tamanho_fatia=4)
+
+
+def test_fatia_vazia():
+    resultado = avaliar_fatia(np.array([7.0]), np.array([0, 0]), np.zeros(0, dtype=TICK))
+    assert resultado.shape == (len(FAIXAS), 3)
+    assert not resultado.any()
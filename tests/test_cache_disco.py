@@ -0,0 +1,93 @@
+import sqlite3
+import time
+
+import pytest
+
+from analisador.cache_disco import CacheDisco
+from analisador.nucleo import AnalisadorApostasUnderOver
+
+
+@pytest.fixture
+def disco(tmp_path):
+    disco = CacheDisco(str(tmp_path / 'cache.sqlite'))
+    yield disco
+    disco.fechar()
+
+
+def test_valor_corrompido_vira_ausente(disco):
+    analisador = AnalisadorApostasUnderOver()
+    curva = analisador.gerar_curva_equilibrio_90min(7.0, 1.14)
+    distribuicao = analisador.analisar_distribuicao_queda(curva)
+    disco.gravar('projecao', (7.0,), curva)
+    disco.gravar('distribuicao', (7.0,), distribuicao)
+    assert disco.ler('projecao', (7.0,)).under.tolist() == curva.under.tolist()
+
+    # Valores truncados: o binário da curva e o JSON da distribuição
+    disco._conexao().execute('UPDATE resultados SET valor = substr(valor, 1, 7)')
+    assert disco.ler('projecao', (7.0,)) is None
+    assert disco.ler('distribuicao', (7.0,)) is None
+    assert disco.erros == 2
+    assert len(disco) == 0
+
+    # Ausente: calcula de novo e regrava
+    assert disco.obter('distribuicao', (7.0,), lambda: distribuicao) == distribuicao
+    assert disco.ler('distribuicao', (7.0,)) == distribuicao
+
+
+def test_banco_travado_nao_derruba(disco, monkeypatch):
+    def travado():
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(disco, '_conexao', travado)
+    assert disco.estatisticas()['itens'] == 0
+    assert disco.tamanho() == (0, 0)
+    assert disco.limpar() is False
+    assert disco.obter('distribuicao', ('x',), lambda: {'ok': 1}) == {'ok': 1}
+    assert disco.erros == 5
+
+
+def test_leitura_nao_espera_trava_de_escrita(tmp_path):
+    caminho = str(tmp_path / 'cache.sqlite')
+    disco = CacheDisco(caminho, intervalo_acesso=1)
+    try:
+        disco.gravar('distribuicao', ('a',), {'ok': 1})
+        (antes,) = disco._conexao().execute('SELECT acesso FROM resultados').fetchone()
+
+        # Outro processo segura a trava de escrita além do TEMPO_ESPERA
+        outro = sqlite3.connect(caminho, isolation_level=None)
+        outro.execute('BEGIN IMMEDIATE')
+        inicio = time.monotonic()
+        for _ in range(5):
+            assert disco.ler('distribuicao', ('a',)) == {'ok': 1}
+        assert time.monotonic() - inicio < 1
+        assert disco.erros == 0
+        outro.execute('ROLLBACK')
+        outro.close()
+
+        # Sem disputa, o acesso chega ao disco no próximo lote
+        assert disco.ler('distribuicao', ('a',)) == {'ok': 1}
+        (depois,) = disco._conexao().execute('SELECT acesso FROM resultados').fetchone()
+        assert depois > antes
+    finally:
+        disco.fechar()
+
+
+def test_acessos_em_lote_mantem_o_lru(tmp_path):
+    disco = CacheDisco(str(tmp_path / 'cache.sqlite'), tamanho_maximo=10 ** 9)
+    try:
+        for i in range(10):
+            disco.gravar('distribuicao', (i,), {'i': i, 'dados': 'x' * 100})
+        # Lidos depois de gravados: sem escrita no banco até o lote ir ao disco
+        assert disco.ler('distribuicao', (0,)) == {'i': 0, 'dados': 'x' * 100}
+        assert disco.ler('distribuicao', (1,))['i'] == 1
+        assert disco._acessos
+
+        disco.tamanho_maximo = 500
+        assert disco.descartar() > 0
+        assert not disco._acessos
+        # Os recém-lidos sobrevivem ao descarte
+        assert disco.ler('distribuicao', (0,)) is not None
+        assert disco.ler('distribuicao', (1,)) is not None
+        assert disco.ler('distribuicao', (2,)) is None
+    finally:
+        disco.fechar()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from analisador.graficos import AmostradorLTTB, GraficoPartidas
+
+CURVA = np.linspace(7.0, 1.15, 90)
+
+
+def _ticks(inicio, fim, quantidade):
+    aleatorio = np.random.default_rng(0)
+    return np.linspace(inicio, fim, quantidade), aleatorio.uniform(1.2, 7.0, quantidade)
+
+
+@pytest.mark.parametrize('inicio, fim', [(0, 90), (0, 120), (-10, 130), (85, 120)])
+def test_amostrador_respeita_o_orcamento(inicio, fim):
+    pontos = 30
+    amostrador = AmostradorLTTB(pontos)
+    emitidos = []
+    for x, y in zip(*_ticks(inicio, fim, 5000)):
+        emitidos.extend(amostrador.adicionar(float(x), float(y)))
+    emitidos.extend(amostrador.finalizar())
+    assert len(emitidos) <= pontos + 2
+    # Os pontos mantêm o minuto real, mesmo nos acréscimos
+    assert emitidos[0][0] == inicio and emitidos[-1][0] == fim
+    assert [x for x, _ in emitidos] == sorted(x for x, _ in emitidos)
+
+
+def test_remover_partida_apaga_as_linhas():
+    grafico = GraficoPartidas(pontos=20)
+    grafico.adicionar_partida('a', CURVA, {'P5': CURVA * 0.9})
+    grafico.adicionar_partida('b', CURVA)
+    for x, y in zip(*_ticks(1, 60, 300)):
+        grafico.registrar_ticks(('a', 'b'), (x, x), (y, y))
+    enviadas = grafico.novas_linhas()
+    assert {'a · esperado', 'a · P5', 'a · ticks', 'b · esperado', 'b · ticks'} == set(enviadas['serie'])
+
+    assert grafico.remover_partida('a') == {'a · esperado', 'a · P5', 'a · ticks'}
+    assert 'a' not in grafico and grafico.partidas() == ['b']
+    assert all(serie.startswith('b · ') for serie in grafico.historico()['serie'])
+    assert grafico.remover_partida('a') == set()
+
+    # Ticks de partida removida são ignorados, e novas_linhas continua só com o que é novo
+    grafico.registrar_ticks(('a', 'b'), (70, 70), (2.0, 2.0))
+    grafico.registrar_ticks(('a', 'b'), (80, 80), (1.5, 1.5))
+    novas = grafico.novas_linhas()
+    assert novas['serie'] and set(novas['serie']) == {'b · ticks'}
+    assert grafico.novas_linhas()['minuto'] == []
+
+
+def test_remover_partida_encerrada():
+    grafico = GraficoPartidas(pontos=20)
+    grafico.adicionar_partida('a', CURVA)
+    grafico.registrar_tick('a', 10, 5.0)
+    grafico.encerrar_partida('a')
+    assert 'a' not in grafico and grafico.partidas() == ['a']
+    assert grafico.remover_partida('a') == {'a · esperado', 'a · ticks'}
+    assert grafico.estatisticas()['pontos'] == 0
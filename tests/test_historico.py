@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from analisador.historico import TICK, ArmazemTicks, importar_replay
+
+
+def _ticks(minutos, under=5.0):
+    ticks = np.zeros(len(minutos), dtype=TICK)
+    ticks['minuto'] = minutos
+    ticks['instante'] = (np.asarray(minutos, dtype=np.float64) - 1) * 60
+    ticks['under'] = under
+    ticks['over'] = 1.25
+    return ticks
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    armazem = ArmazemTicks(str(tmp_path / 'historico'))
+    armazem.registrar_partida('a', 7.0, '2024')
+    armazem.registrar_partida('b', 3.0, '2025')
+    return armazem
+
+
+def test_anexar_e_ler(armazem, tmp_path):
+    armazem.anexar('a', _ticks([1, 2, 3, 10]))
+    armazem.anexar('a', _ticks([10, 20]))
+    assert armazem.ticks('a')['minuto'].tolist() == [1, 2, 3, 10, 10, 20]
+    assert armazem.intervalo('a', 3, 10)['minuto'].tolist() == [3, 10, 10]
+    assert len(armazem.ticks('b')) == 0
+
+    # O índice sobrevive à reabertura
+    reaberto = ArmazemTicks(str(tmp_path / 'historico'))
+    assert reaberto.partidas() == ['a', 'b'] and reaberto.partidas('2025') == ['b']
+    assert reaberto.under_inicial('a') == 7.0
+    assert reaberto.ticks('a')['minuto'].tolist() == [1, 2, 3, 10, 10, 20]
+
+    with pytest.raises(KeyError):
+        armazem.anexar('c', _ticks([1]))
+    with pytest.raises(ValueError):
+        armazem.registrar_partida('../c', 7.0)
+
+
+def test_bloco_fora_de_ordem_e_ordenado(armazem):
+    bloco = _ticks([30, 5, 12, 5])
+    bloco['instante'] = [1740, 250, 660, 240]
+    armazem.anexar('a', bloco)
+    gravados = armazem.ticks('a')
+    assert gravados['minuto'].tolist() == [5, 5, 12, 30]
+    assert gravados['instante'].tolist() == [240, 250, 660, 1740]
+    assert armazem.intervalo('a', 5, 12)['minuto'].tolist() == [5, 5, 12]
+
+
+def test_bloco_antes_do_ultimo_gravado_e_recusado(armazem):
+    armazem.anexar('a', _ticks([10, 20]))
+    with pytest.raises(ValueError, match='fora de ordem'):
+        armazem.anexar('a', _ticks([15, 30]))
+    assert armazem.ticks('a')['minuto'].tolist() == [10, 20]
+
+
+def test_descarregar_ordena_e_descarta_atrasados(armazem):
+    for minuto, under in ((20, 4.0), (5, 6.0), (12, 5.0), (5, 6.5)):
+        armazem.anexar_tick('a', minuto, under, 1.3)
+    armazem.anexar_tick('b', 1, 3.0, 1.5)
+    assert armazem.descarregar() == 5
+    assert armazem.ticks('a')['minuto'].tolist() == [5, 5, 12, 20]
+    assert armazem.ticks('a')['under'].tolist() == [6.0, 6.5, 5.0, 4.0]
+
+    # Feed atrasado: o tick do minuto 15 chega depois do 20 já gravado
+    armazem.anexar_tick('a', 25, 3.5, 1.4)
+    armazem.anexar_tick('a', 15, 4.5, 1.3)
+    assert armazem.descarregar() == 1
+    assert armazem.descartados == 1
+    assert armazem.ticks('a')['minuto'].tolist() == [5, 5, 12, 20, 25]
+    assert armazem.descarregar() == 0
+
+
+def test_carregar_temporada(armazem):
+    armazem.registrar_partida('c', 12.0, '2024')
+    armazem.anexar('a', _ticks([1, 2, 3]))
+    armazem.anexar('c', _ticks([4, 5], under=9.0))
+    temporada = armazem.carregar_temporada('2024')
+    assert temporada.ids.tolist() == ['a', 'c']
+    assert temporada.under_inicial.tolist() == [7.0, 12.0]
+    assert temporada.inicio.tolist() == [0, 3, 5]
+    assert temporada.ticks['minuto'].tolist() == [1, 2, 3, 4, 5]
+    assert temporada.ticks['under'][3:].tolist() == [9.0, 9.0]
+    assert armazem.carregar_temporada('2030').ticks.shape == (0,)
+
+
+def test_importar_replay_fora_de_ordem(tmp_path):
+    caminho = tmp_path / 'gravacao.csv'
+    caminho.write_text(
+        'instante,id_partida,minuto,under,over\n'
+        '0,a,1,7.0,1.17\n'
+        '600,a,11,5.0,1.25\n'
+        '300,a,6,6.0,1.2\n'
+        '0,b,1,3.0,1.5\n'
+    )
+    armazem = ArmazemTicks(str(tmp_path / 'historico'))
+    assert importar_replay(armazem, str(caminho), '2024') == 2
+    assert armazem.under_inicial('a') == 7.0
+    assert armazem.ticks('a')['minuto'].tolist() == [1, 6, 11]
+    assert armazem.intervalo('a', 5, 10)['under'].tolist() == [6.0]
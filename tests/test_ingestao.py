@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from analisador.ingestao import FonteReplay, FonteSocket, IngestorTicks, Tick, ler_tick
+
+LINHAS = [
+    'instante,id_partida,minuto,under,over',
+    '0.0,a,10,5.0,1.25',
+    '1.0,b,xx,4.0,1.33',      # minuto não numérico
+    '2.0,c,12,3.0,1.5',
+    '3.0,d,13',               # campos faltando
+    '4.0,e,14,inf,1.0',       # under infinito
+    '',
+    '5.0,a,15,4.5,1.29',
+]
+
+
+def test_ler_tick():
+    assert ler_tick(['1.5', 'a', '10', '5.0', '1.25']) == Tick(1.5, 'a', 10, 5.0, 1.25)
+    for campos in (['1.5', 'a', '10', '5.0'], ['1.5', 'a', 'dez', '5.0', '1.25'], ['nan', 'a', '10', '5.0', '1.25']):
+        with pytest.raises(ValueError):
+            ler_tick(campos)
+
+
+def test_replay_pula_linhas_malformadas(tmp_path):
+    caminho = tmp_path / 'gravacao.csv'
+    caminho.write_text('\n'.join(LINHAS) + '\n')
+
+    async def executar():
+        fonte = FonteReplay(str(caminho), velocidade=0)
+        return [tick async for tick in fonte.ticks()], fonte.descartados
+
+    ticks, descartados = asyncio.run(executar())
+    assert [(t.id_partida, t.minuto) for t in ticks] == [('a', 10), ('c', 12), ('a', 15)]
+    # A linha em branco do csv.reader também não vira tick
+    assert descartados == 4
+
+
+def test_socket_segue_depois_de_linha_malformada():
+    async def executar():
+        fonte = FonteSocket()
+        ingestor = IngestorTicks(fonte)
+        tarefa = asyncio.create_task(ingestor.executar())
+        await fonte.pronta.wait()
+        _, escritor = await asyncio.open_connection('127.0.0.1', fonte.porta)
+        escritor.write(('\n'.join(LINHAS) + '\n').encode() + b'\xff\xfe,x\n6.0,c,20,2.5,1.67\n')
+        await escritor.drain()
+        # A conexão continua aberta depois das linhas ruins
+        escritor.write(b'7.0,b,21,3.5,1.4\n')
+        await escritor.drain()
+        escritor.close()
+        await escritor.wait_closed()
+        await fonte.fechar()
+        return await tarefa, ingestor.monitor
+
+    resumo, monitor = asyncio.run(executar())
+    assert resumo['processados'] == 5
+    assert resumo['descartados'] == 4
+    assert monitor.partidas['a'].minuto == 15
+    assert monitor.partidas['b'].minuto == 21
+    assert monitor.partidas['c'].minuto == 20
+
+
+def test_fechar_com_cliente_ocioso():
+    async def executar():
+        fonte = FonteSocket()
+        ingestor = IngestorTicks(fonte)
+        tarefa = asyncio.create_task(ingestor.executar())
+        await fonte.pronta.wait()
+        leitor, escritor = await asyncio.open_connection('127.0.0.1', fonte.porta)
+        escritor.write(b'0.0,a,10,5.0,1.25\n')
+        await escritor.drain()
+        await asyncio.wait_for(fonte.fechar(espera=0.2), timeout=3)
+        resumo = await asyncio.wait_for(tarefa, timeout=3)
+        # O servidor fechou a conexão do cliente ocioso
+        assert await asyncio.wait_for(leitor.read(), timeout=3) == b''
+        escritor.close()
+        return resumo
+
+    assert asyncio.run(executar())['processados'] == 1
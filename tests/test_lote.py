@@ -0,0 +1,154 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from analisador.lote import MINUTOS, arredondar, calcular_under_final_lote, gerar_curvas_lote
+from analisador.nucleo import AnalisadorApostasUnderOver
+
+# Referência congelada: o gerar_curva_equilibrio_90min escalar original,
+# copiado sem a interface. Não depende de parametros.py nem de nucleo.py,
+# então uma mudança em qualquer um dos dois motores aparece aqui
+
+
+def _under_final_original(under_inicial):
+    if under_inicial >= 50:
+        return max(1.50, under_inicial * 0.035)
+    elif under_inicial >= 30:
+        return max(1.40, under_inicial * 0.045)
+    elif under_inicial >= 20:
+        return max(1.30, under_inicial * 0.055)
+    elif under_inicial >= 15:
+        return max(1.25, under_inicial * 0.070)
+    elif under_inicial >= 10:
+        return max(1.20, under_inicial * 0.110)
+    elif under_inicial >= 7:
+        return max(1.15, under_inicial * 0.150)
+    elif under_inicial >= 5:
+        return max(1.10, under_inicial * 0.200)
+    elif under_inicial >= 3:
+        return max(1.05, under_inicial * 0.300)
+    else:
+        return max(1.03, under_inicial * 0.500)
+
+
+def _over_original(under_atual):
+    under_atual = max(under_atual, 1.01)
+    prob_over = 1 - 1 / under_atual
+    if prob_over <= 0.01:
+        return 15.0
+    return min(1 / prob_over, 15.0)
+
+
+def _pontos_original(under_inicial, under_final):
+    diferenca_total = under_inicial - under_final
+    pontos = {1: under_inicial}
+    valor_atual = under_inicial
+    for minuto, velocidade in ((15, 0.25), (30, 0.20), (45, 0.20)):
+        valor_atual -= diferenca_total * velocidade
+        pontos[minuto] = max(valor_atual, under_final)
+    pontos[46] = max(pontos[45] - (pontos[45] - under_final) * 0.05, under_final)
+    for minuto, velocidade in ((60, 0.15), (75, 0.12), (85, 0.08 * 0.7)):
+        valor_atual -= diferenca_total * velocidade
+        pontos[minuto] = max(valor_atual, under_final)
+    pontos[90] = under_final
+    minutos = sorted(pontos)
+    for anterior, atual in zip(minutos, minutos[1:]):
+        if pontos[atual] >= pontos[anterior]:
+            pontos[atual] = max(pontos[anterior] * 0.98, under_final)
+    return pontos
+
+
+def _interpolar_original(minuto, pontos):
+    if minuto in pontos:
+        return pontos[minuto]
+    minutos = sorted(pontos)
+    for min1, min2 in zip(minutos, minutos[1:]):
+        if min1 <= minuto <= min2:
+            fator_suave = 1 - math.exp(-2 * (minuto - min1) / (min2 - min1))
+            valor = pontos[min1] + (pontos[min2] - pontos[min1]) * fator_suave
+            return min(valor, pontos[min1])
+    return pontos[minutos[-1]]
+
+
+def curva_original(under_inicial):
+    """(unders, overs) de 90 minutos, arredondados como no original"""
+    under_final = _under_final_original(under_inicial)
+    pontos = _pontos_original(under_inicial, under_final)
+    unders, overs = [], []
+    anterior = under_inicial
+    for minuto in range(1, 91):
+        under = min(_interpolar_original(minuto, pontos), anterior)
+        under = max(under, under_final, 1.01)
+        unders.append(round(under, 2))
+        overs.append(round(_over_original(under), 3))
+        anterior = under
+    return unders, overs
+
+
+BORDAS_FAIXAS = (3, 5, 7, 10, 15, 20, 30, 50)
+
+
+def _grade():
+    """Centésimos até 20, as bordas das faixas e uma amostra até 999"""
+    aleatorio = random.Random(7)
+    grade = {round(1.01 + i / 100, 2) for i in range(1900)}
+    for borda in BORDAS_FAIXAS:
+        grade.update(round(borda + delta, 3) for delta in (-0.01, -0.005, -0.001, 0, 0.001, 0.005, 0.01))
+    grade.update(round(aleatorio.uniform(20, 999), 2) for _ in range(1500))
+    # Pisos de cada faixa: onde o multiplicador cruza o piso
+    grade.update((1.03 / 0.5, 1.05 / 0.3, 1.10 / 0.2, 1.15 / 0.15, 1.20 / 0.11, 1.50 / 0.035, 999.0))
+    return sorted(grade)
+
+
+GRADE = _grade()
+
+
+def test_curvas_identicas_a_referencia():
+    curvas = gerar_curvas_lote(GRADE)
+    assert curvas['minuto'].tolist() == MINUTOS.tolist() == list(range(1, 91))
+    for i, under_inicial in enumerate(GRADE):
+        unders, overs = curva_original(under_inicial)
+        assert curvas['under'][i].tolist() == unders, under_inicial
+        assert curvas['over'][i].tolist() == overs, under_inicial
+
+
+def test_under_final_identico_a_referencia():
+    assert calcular_under_final_lote(GRADE).tolist() == [_under_final_original(u) for u in GRADE]
+
+
+def test_caminho_escalar_igual_ao_lote():
+    analisador = AnalisadorApostasUnderOver()
+    amostra = GRADE[::25] + [b + d for b in BORDAS_FAIXAS for d in (-0.01, 0)]
+    curvas = gerar_curvas_lote(amostra)
+    for i, under_inicial in enumerate(amostra):
+        curva = analisador.gerar_curva_equilibrio_90min(
+            under_inicial, analisador.calcular_over_baseado_no_under(under_inicial)
+        )
+        assert curva.under.tolist() == curvas['under'][i].tolist()
+        assert curva.over.tolist() == curvas['over'][i].tolist()
+
+
+def test_blocos_nao_mudam_o_resultado(monkeypatch):
+    from analisador import lote
+
+    inteiro = gerar_curvas_lote(GRADE)
+    monkeypatch.setattr(lote, 'TAMANHO_BLOCO', 7)
+    em_blocos = gerar_curvas_lote(GRADE)
+    assert np.array_equal(inteiro['under'], em_blocos['under'])
+    assert np.array_equal(inteiro['over'], em_blocos['over'])
+
+
+@pytest.mark.parametrize('casas', [1, 2, 3, 4])
+def test_arredondar_igual_a_round(casas):
+    aleatorio = random.Random(casas)
+    escala = 10 ** casas
+    # Meios exatos e quase-meios (…5 que o binário representa acima ou abaixo)
+    valores = [(k + 0.5) / escala for k in range(-2000, 2000)]
+    valores += [0.125, 0.375, 2.5, 2.675, 1.005, 1.015, 1.025, 1.045, 8.345, 1.4985, 14.985, -2.675]
+    valores += [aleatorio.uniform(-50, 1000) for _ in range(20000)]
+    valores += [float(np.nextafter(v, s)) for v in valores[:4000] for s in (-np.inf, np.inf)]
+    resultado = arredondar(valores, casas)
+    assert resultado.tolist() == [round(v, casas) for v in valores]
+    assert arredondar(np.array(valores).reshape(-1, 2), casas).ravel().tolist() == resultado.tolist()
@@ -0,0 +1,28 @@
+import numpy as np
+
+from analisador.monitor import MonitorPartidas
+from analisador.tabela import TabelaCurvas, construir_tabela
+
+UNDERS = [1.35, 1.8, 2.5, 3.1, 4.7, 6.2, 9.4]
+
+
+def _ticks():
+    gerador = np.random.default_rng(5)
+    for minuto in range(1, 91, 7):
+        for i, under_inicial in enumerate(UNDERS):
+            under = max(round(under_inicial * (1 - minuto / 120) + gerador.normal(0, 0.05), 2), 1.01)
+            yield f'p{i}', minuto, under, round(1 / (1 - 1 / under), 3) if under > 1.01 else 15.0
+
+
+def test_tabela_e_motor_dao_o_mesmo_resultado(tmp_path):
+    construir_tabela(str(tmp_path), grade=np.arange(101, 1001) / 100)
+    com_tabela = MonitorPartidas(tabela=TabelaCurvas(str(tmp_path)))
+    sem_tabela = MonitorPartidas()
+    ids = [f'p{i}' for i in range(len(UNDERS))]
+    com_tabela.iniciar_partidas(ids, UNDERS)
+    sem_tabela.iniciar_partidas(ids, UNDERS)
+
+    for id_partida in ids:
+        np.testing.assert_array_equal(com_tabela.partidas[id_partida].curva, sem_tabela.partidas[id_partida].curva)
+    for tick in _ticks():
+        assert com_tabela.processar_tick(*tick).resumo() == sem_tabela.processar_tick(*tick).resumo()
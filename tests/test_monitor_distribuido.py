@@ -0,0 +1,70 @@
+import time
+
+import numpy as np
+import pytest
+
+from analisador.monitor import MonitorPartidas
+from analisador.monitor_distribuido import FILA_MAXIMA, TAMANHO_ID, CoordenadorMonitor, MemoriaMonitor
+
+
+@pytest.fixture
+def coordenador():
+    coordenador = CoordenadorMonitor(processos=2, capacidade=64)
+    yield coordenador
+    coordenador.fechar()
+
+
+def test_mesmo_estado_do_monitor(coordenador):
+    ids = ['jogo-1', 'clássico ⚽', 'ç' * (TAMANHO_ID // 2)]
+    unders = [7.0, 3.4, 12.5]
+    ticks = [(i, minuto, round(u * (1 - minuto / 110), 2), 1.5) for minuto in (5, 30, 61) for i, u in zip(ids, unders)]
+    monitor = MonitorPartidas()
+    monitor.iniciar_partidas(ids, unders)
+    monitor.processar_lote(ticks)
+    coordenador.iniciar_partidas(ids, unders)
+    coordenador.processar_lote(ticks)
+    coordenador.sincronizar()
+
+    instantaneo = coordenador.memoria.instantaneo()
+    assert sorted(instantaneo['id_partida'].tolist()) == sorted(ids)
+    for id_partida in ids:
+        estado, esperado = coordenador.estado(id_partida), monitor.partidas[id_partida]
+        assert estado['under_esperado'] == esperado.under_esperado
+        assert estado['divergencia_percent'] == esperado.divergencia['divergencia_percent']
+        assert estado['status'] == esperado.divergencia['status']
+
+
+def test_id_longo_e_recusado(coordenador):
+    # 'ç' ocupa 2 bytes: cortar em TAMANHO_ID partiria o caractere
+    longo = 'a' + 'ç' * (TAMANHO_ID // 2)
+    with pytest.raises(ValueError):
+        coordenador.iniciar_partidas(['curto', longo], [7.0, 5.0])
+    assert len(coordenador) == 0
+    coordenador.iniciar_partidas(['curto'], [7.0])
+    assert 'curto' in coordenador
+
+
+def test_leitura_rasgada_falha():
+    memoria = MemoriaMonitor.criar(capacidade=4, processos=1)
+    try:
+        memoria.iniciar(np.array([0, 1]), [7.0, 3.0])
+        assert memoria._ler([0, 1])[2].tolist() == [0, 0]
+        # Versão ímpar parada: escritor morreu no meio da escrita
+        memoria.versao[1] += 1
+        with pytest.raises(RuntimeError):
+            memoria._ler([0, 1], tempo_limite=0.05)
+    finally:
+        memoria.fechar()
+
+
+def test_fechar_com_trabalhador_morto():
+    coordenador = CoordenadorMonitor(processos=1, capacidade=8)
+    coordenador.iniciar_partidas(['a'], [7.0])
+    coordenador.sincronizar()
+    coordenador._trabalhadores[0].kill()
+    coordenador._trabalhadores[0].join()
+    for minuto in range(FILA_MAXIMA):
+        coordenador._filas[0].put(('ticks', np.array([[0, minuto, 5.0, 1.5]])), timeout=1)
+    inicio = time.monotonic()
+    coordenador.fechar()
+    assert time.monotonic() - inicio < 5
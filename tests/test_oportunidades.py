@@ -0,0 +1,64 @@
+import math
+import random
+
+import pytest
+
+from analisador.oportunidades import IndiceOportunidades
+
+
+def _ranking(pontuacoes, chegada, k, minimo=None):
+    """Top-k por força bruta: pontuação decrescente, empate pela chegada ao balde"""
+    validas = [(id_partida, p) for id_partida, p in pontuacoes.items() if minimo is None or p >= minimo]
+    validas.sort(key=lambda item: (-item[1], chegada[item[0]]))
+    return validas[:k]
+
+
+def test_top_igual_a_ordenacao_completa():
+    aleatorio = random.Random(3)
+    indice = IndiceOportunidades()
+    pontuacoes, chegada = {}, {}
+    for passo in range(20000):
+        id_partida = aleatorio.randrange(300)
+        if aleatorio.random() < 0.1:
+            indice.remover(id_partida)
+            pontuacoes.pop(id_partida, None)
+        else:
+            # Faixa larga e sem limite fixo, com muitos baldes criados e esvaziados
+            pontuacao = round(aleatorio.uniform(-500, 5000) if aleatorio.random() < 0.2
+                              else aleatorio.gauss(0, 15), 1)
+            if pontuacoes.get(id_partida) != pontuacao:
+                chegada[id_partida] = passo
+            indice.atualizar(id_partida, pontuacao)
+            pontuacoes[id_partida] = pontuacao
+
+        if passo % 500 == 0:
+            assert len(indice) == len(pontuacoes)
+            assert indice.top(15) == _ranking(pontuacoes, chegada, 15)
+            assert indice.top(50, minimo=10) == _ranking(pontuacoes, chegada, 50, minimo=10)
+    assert indice.top(len(pontuacoes) + 5) == _ranking(pontuacoes, chegada, len(pontuacoes) + 5)
+    # O heap não acumula chaves obsoletas sem limite
+    assert len(indice._heap) <= 2 * len(indice._baldes) + 64
+
+
+def test_remover_todas():
+    indice = IndiceOportunidades()
+    for i in range(100):
+        indice.atualizar(i, i * 1.5)
+    for i in range(100):
+        indice.remover(i)
+    assert len(indice) == 0
+    assert indice.top(10) == []
+    indice.atualizar('a', 3.0)
+    assert indice.top(10) == [('a', 3.0)]
+
+
+@pytest.mark.parametrize('pontuacao', [math.inf, -math.inf, math.nan])
+def test_pontuacao_nao_finita_nao_muda_o_indice(pontuacao):
+    indice = IndiceOportunidades()
+    indice.atualizar('a', 10.7)
+    with pytest.raises(ValueError):
+        indice.atualizar('a', pontuacao)
+    with pytest.raises(ValueError):
+        indice.atualizar('b', pontuacao)
+    assert indice.top(10) == [('a', 10.7)]
+    assert 'b' not in indice
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from analisador.nucleo import AnalisadorApostasUnderOver
+from analisador.placar import FRACOES, MAX_GOLS, fracoes, ler_placar, projetar, projetar_lote, total_gols
+
+ANALISADOR = AnalisadorApostasUnderOver()
+
+
+@pytest.mark.parametrize('placar, gols', [
+    ('1x0', (1, 0)),
+    ('1-0', (1, 0)),
+    ('0X1', (0, 1)),
+    ('2 : 2', (2, 2)),
+    (' 3×1 ', (3, 1)),
+    ('10-0', (10, 0)),
+])
+def test_ler_placar(placar, gols):
+    assert ler_placar(placar) == gols
+    assert total_gols(placar) == sum(gols)
+
+
+@pytest.mark.parametrize('placar', [None, '', 'abc', '1x', 'x1', '1x0x2', '-1x0', '1.5x0', '1 0', 1, 0, 2.0, (1, 0)])
+def test_placar_invalido(placar):
+    # Número solto não é placar: não dá para saber de que lado foram os gols
+    assert ler_placar(placar) is None
+    assert total_gols(placar) is None
+
+
+def projecao_linear_original(under_inicial, under_atual, minuto_atual):
+    """Projeção de taxa constante do projetar_restante_equilibrio original"""
+    under_final = ANALISADOR.calcular_under_final_esperado(under_inicial)
+    minutos_restantes = 90 - minuto_atual
+    taxa = (under_atual - under_final) / minutos_restantes if minutos_restantes > 0 else 0
+    projecao = []
+    valor_atual = under_atual
+    for minuto in range(minuto_atual + 1, 91):
+        valor_atual = max(valor_atual - taxa, under_final)
+        projecao.append({
+            'minuto': minuto,
+            'under': round(valor_atual, 2),
+            'over': round(ANALISADOR.calcular_over_baseado_no_under(valor_atual), 3)
+        })
+    return projecao
+
+
+@pytest.mark.parametrize('placar', [None, 'abc', 3, '1 0'])
+@pytest.mark.parametrize('under_inicial, under_atual, minuto', [
+    (7.0, 4.5, 30), (2.4, 1.9, 60), (12.0, 13.0, 10), (3.0, 1.02, 85), (5.0, 3.0, 89), (7.0, 4.0, 90),
+])
+def test_placar_invalido_usa_projecao_linear(placar, under_inicial, under_atual, minuto):
+    projecao = ANALISADOR.projetar_restante_equilibrio(under_inicial, under_atual, minuto, placar)
+    assert projecao == projecao_linear_original(under_inicial, under_atual, minuto)
+
+
+def test_tabela_de_fracoes():
+    assert FRACOES.shape == (MAX_GOLS + 1, 91, 90)
+    assert np.isfinite(FRACOES).all()
+    assert ((FRACOES >= 0) & (FRACOES <= 1)).all()
+    # Não cresce ao longo do jogo, e vale 1 nos minutos já jogados
+    assert (np.diff(FRACOES, axis=2) <= 0).all()
+    for minuto in range(91):
+        assert (FRACOES[:, minuto, :minuto] == 1).all()
+        if minuto < 90:
+            assert (FRACOES[:, minuto, -1] == 0).all()
+    # Com mais gols a intensidade se concentra no fim: resta mais excesso a cada minuto
+    assert (np.diff(FRACOES[:, 45, 45:89], axis=0) >= 0).all()
+    assert np.array_equal(fracoes(9, 30), FRACOES[MAX_GOLS, 30])
+    assert np.array_equal(fracoes(-1, 200), FRACOES[0, 90])
+
+
+@pytest.mark.parametrize('gols', range(MAX_GOLS + 2))
+@pytest.mark.parametrize('under_inicial, under_atual, minuto', [
+    (7.0, 4.5, 30), (2.4, 1.9, 60), (12.0, 13.0, 0), (3.0, 1.02, 85), (30.0, 11.0, 45), (5.0, 3.0, 89),
+])
+def test_limites_da_projecao(gols, under_inicial, under_atual, minuto):
+    under_final = ANALISADOR.calcular_under_final_esperado(under_inicial)
+    minutos, under, over = projetar(under_final, under_atual, minuto, gols)
+    assert minutos.tolist() == list(range(minuto + 1, 91))
+    assert (np.diff(under) <= 0).all()
+    assert (under >= round(under_final, 2)).all()
+    assert (under <= round(max(under_atual, under_final), 2)).all()
+    assert under[-1] == round(under_final, 2)
+    assert (np.diff(over) >= 0).all()
+
+    projecao = ANALISADOR.projetar_restante_equilibrio(under_inicial, under_atual, minuto, f'{gols}x0')
+    assert projecao.under.tolist() == under.tolist()
+
+
+def test_under_abaixo_do_final_fica_no_final():
+    projecao = projetar_lote([1.5], [1.2], [60], [2])[0]
+    assert (projecao == 1.5).all()
+
+
+def test_projecao_no_fim_do_jogo_vazia():
+    minutos, under, over = projetar(1.2, 1.5, 90, 1)
+    assert len(minutos) == len(under) == len(over) == 0
+    assert len(ANALISADOR.projetar_restante_equilibrio(7.0, 1.5, 90, '1x0')) == 0
@@ -0,0 +1,76 @@
+import csv
+
+import pytest
+
+from analisador.pontuacao import COLUNAS_SAIDA, main, pontuar_arquivo
+
+CABECALHO = 'id_partida,under_inicial,minuto,under_atual,over_atual\n'
+VALIDAS = [
+    'A,7.0,25,4.5,1.8\n',
+    'B,3.4,45.7,2.0,2.2\n',
+    'C,12.5,"60",5.0,\n',
+]
+INVALIDAS = [
+    '\n',                    # em branco
+    'D,5.5,45,3.0\n',        # sem over_atual
+    'E\n',                   # só o id
+    'F,abc,30,4.0,1.5\n',    # under_inicial não numérico
+    'G,7.0,,4.0,1.5\n',      # minuto vazio
+    'H,7.0,30,x,1.5\n',      # under_atual não numérico
+]
+
+
+def _gravar(caminho, linhas):
+    caminho.write_text(CABECALHO + ''.join(linhas))
+    return str(caminho)
+
+
+def _ler(caminho):
+    with open(caminho, newline='') as arquivo:
+        return list(csv.DictReader(arquivo))
+
+
+def test_linhas_invalidas_sao_descartadas(tmp_path):
+    referencia = tmp_path / 'referencia.csv'
+    assert pontuar_arquivo(_gravar(tmp_path / 'validas.csv', VALIDAS), str(referencia)) == (3, 0)
+
+    misturadas = [INVALIDAS[1], VALIDAS[0], *INVALIDAS[2:], VALIDAS[1], INVALIDAS[0], VALIDAS[2], '\n']
+    saida = tmp_path / 'saida.csv'
+    assert pontuar_arquivo(_gravar(tmp_path / 'entrada.csv', misturadas), str(saida)) == (3, len(INVALIDAS) + 1)
+    linhas = _ler(saida)
+    assert linhas == _ler(referencia)
+    assert [linha['id_partida'] for linha in linhas] == ['A', 'B', 'C']
+    assert [linha['minuto'] for linha in linhas] == ['25', '45', '60']
+    assert list(linhas[0]) == list(COLUNAS_SAIDA)
+
+
+@pytest.mark.parametrize('processos, tamanho_bloco', [(1, 1), (1, 4), (2, 2)])
+def test_blocos_e_processos_nao_mudam_a_saida(tmp_path, processos, tamanho_bloco):
+    linhas = (VALIDAS + INVALIDAS) * 3
+    entrada = _gravar(tmp_path / 'entrada.csv', linhas)
+    pontuar_arquivo(entrada, str(tmp_path / 'referencia.csv'))
+    resultado = pontuar_arquivo(entrada, str(tmp_path / 'saida.csv'), processos, tamanho_bloco)
+    assert resultado == (9, 3 * len(INVALIDAS))
+    assert _ler(tmp_path / 'saida.csv') == _ler(tmp_path / 'referencia.csv')
+
+
+def test_bloco_so_com_linhas_invalidas(tmp_path):
+    entrada = _gravar(tmp_path / 'entrada.csv', INVALIDAS)
+    assert pontuar_arquivo(entrada, str(tmp_path / 'saida.csv')) == (0, len(INVALIDAS))
+    assert _ler(tmp_path / 'saida.csv') == []
+
+
+def test_colunas_ausentes(tmp_path):
+    entrada = tmp_path / 'entrada.csv'
+    entrada.write_text('id_partida,under_inicial,minuto\nA,7.0,25\n')
+    with pytest.raises(ValueError, match='under_atual'):
+        pontuar_arquivo(str(entrada), str(tmp_path / 'saida.csv'))
+
+
+def test_cli(tmp_path, capsys):
+    entrada = _gravar(tmp_path / 'entrada.csv', VALIDAS + INVALIDAS)
+    main([entrada, str(tmp_path / 'saida.csv'), '--tamanho-bloco', '2'])
+    saida = capsys.readouterr().out
+    assert '✅ 3 linhas pontuadas' in saida
+    assert f'⚠️ {len(INVALIDAS)} linhas descartadas' in saida
+    assert len(_ler(tmp_path / 'saida.csv')) == 3
@@ -0,0 +1,220 @@
+import http.client
+import json
+import math
+import threading
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from analisador import servico
+from analisador.nucleo import AnalisadorApostasUnderOver
+from analisador.servico import iniciar_servico
+
+ANALISADOR = AnalisadorApostasUnderOver()
+
+
+@pytest.fixture
+def servidor():
+    servidor = iniciar_servico(0, trabalhadores=8)
+    yield servidor
+    _encerrar(servidor)
+
+
+def _encerrar(servidor):
+    servidor.shutdown()
+    servidor.server_close()
+    assert not servidor.agrupador._thread.is_alive()
+
+
+def requisitar(servidor, caminho, parametros=None, corpo=None):
+    """(status, JSON) de um GET com query string ou, com corpo, de um POST"""
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    try:
+        if corpo is None:
+            conexao.request('GET', caminho + ('?' + urlencode(parametros) if parametros else ''))
+        else:
+            dados = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode()
+            conexao.request('POST', caminho, dados, {'Content-Type': 'application/json'})
+        resposta = conexao.getresponse()
+        return resposta.status, json.loads(resposta.read())
+    finally:
+        conexao.close()
+
+
+def curva_escalar(under_inicial):
+    return ANALISADOR.gerar_curva_equilibrio_90min(
+        under_inicial, ANALISADOR.calcular_over_baseado_no_under(under_inicial)
+    )
+
+
+def divergencia_escalar(under_inicial, minuto, under_atual):
+    under_esperado = float(curva_escalar(under_inicial).under[minuto - 1])
+    return dict(ANALISADOR.analisar_divergencia(under_atual, under_esperado, minuto),
+                under_esperado=under_esperado, minuto=minuto)
+
+
+def test_curva(servidor):
+    status, curva = requisitar(servidor, '/curva', {'under_inicial': 7.0})
+    assert status == 200
+    assert curva['under'] == curva_escalar(7.0).under.tolist()
+    assert curva['over'] == curva_escalar(7.0).over.tolist()
+    assert curva['under_final'] == ANALISADOR.calcular_under_final_esperado(7.0)
+
+    unders = [7.0, 2.35, 12.5, 7.0]
+    status, curvas = requisitar(servidor, '/curva', corpo=[{'under_inicial': u} for u in unders])
+    assert status == 200
+    assert [c['under'] for c in curvas] == [curva_escalar(u).under.tolist() for u in unders]
+
+
+def test_esperado(servidor):
+    status, esperado = requisitar(servidor, '/esperado', {'under_inicial': 7.0, 'minuto': 37})
+    assert status == 200
+    curva = curva_escalar(7.0)
+    assert esperado['under_esperado'] == curva.under[36]
+    assert esperado['over_esperado'] == curva.over[36]
+
+    pedidos = [(7.0, 1), (3.4, 45), (15.0, 90)]
+    status, esperados = requisitar(servidor, '/esperado',
+                                   corpo=[{'under_inicial': u, 'minuto': m} for u, m in pedidos])
+    assert status == 200
+    assert [e['under_esperado'] for e in esperados] == [curva_escalar(u).under[m - 1] for u, m in pedidos]
+
+
+def test_divergencia(servidor):
+    status, divergencia = requisitar(servidor, '/divergencia',
+                                     {'under_inicial': 7.0, 'minuto': 25, 'under_atual': 4.5})
+    assert status == 200
+    assert divergencia == divergencia_escalar(7.0, 25, 4.5)
+
+    pedidos = [(7.0, 25, 4.5), (7.0, 25, 6.5), (3.0, 60, 1.2), (9.5, 10, 7.0), (2.2, 80, 1.9)]
+    status, divergencias = requisitar(
+        servidor, '/divergencia',
+        corpo=[{'under_inicial': u, 'minuto': m, 'under_atual': a} for u, m, a in pedidos]
+    )
+    assert status == 200
+    assert divergencias == [divergencia_escalar(*pedido) for pedido in pedidos]
+
+
+def test_requisicoes_concorrentes_viram_um_lote(monkeypatch):
+    # O primeiro lote fica preso no cálculo até os outros pedidos estarem
+    # na fila; ao ser liberado, a fila inteira tem de sair num só lote
+    calculando = threading.Event()
+    liberar = threading.Event()
+    calcular = servico.CALCULOS['divergencia']
+
+    def calcular_preso(itens, parametros=None):
+        calculando.set()
+        liberar.wait(10)
+        return calcular(itens, parametros)
+
+    monkeypatch.setitem(servico.CALCULOS, 'divergencia', calcular_preso)
+    servidor = iniciar_servico(0, trabalhadores=16, janela=0.05)
+    try:
+        clientes = 12
+        respostas = [None] * clientes
+
+        def cliente(i):
+            respostas[i] = requisitar(servidor, '/divergencia',
+                                      {'under_inicial': 7.0, 'minuto': 20 + i, 'under_atual': 4.5})
+
+        threads = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+        threads[0].start()
+        assert calculando.wait(10)
+        for thread in threads[1:]:
+            thread.start()
+        limite = time.monotonic() + 10
+        while servidor.agrupador._fila.qsize() < clientes - 1 and time.monotonic() < limite:
+            time.sleep(0.005)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        assert respostas == [(200, divergencia_escalar(7.0, 20 + i, 4.5)) for i in range(clientes)]
+        contadores = servidor.metricas.contadores
+        assert contadores['servico.pedidos'] == clientes
+        assert contadores['servico.lotes'] == 2
+    finally:
+        liberar.set()
+        _encerrar(servidor)
+
+
+@pytest.mark.parametrize('caminho, parametros', [
+    ('/curva', {}),
+    ('/curva', {'under_inicial': 'abc'}),
+    ('/curva', {'under_inicial': 0.5}),
+    ('/esperado', {'under_inicial': 7.0}),
+    ('/esperado', {'under_inicial': 7.0, 'minuto': 500}),
+    ('/divergencia', {'under_inicial': 7.0, 'minuto': 25, 'under_atual': -1}),
+    ('/encerrar', {}),
+    ('/oportunidades', {'k': 'muitas'}),
+])
+def test_entrada_invalida_get(servidor, caminho, parametros):
+    status, resposta = requisitar(servidor, caminho, parametros)
+    assert status == 400
+    assert resposta['erro']
+
+
+@pytest.mark.parametrize('caminho, corpo', [
+    ('/curva', b'{nao e json'),
+    ('/curva', [{'under_inicial': 7.0}, {'under': 3.0}]),
+    ('/curva', [7.0]),
+    ('/divergencia', [{'under_inicial': 7.0, 'minuto': 25, 'under_atual': None}]),
+    ('/tick', [{'id_partida': 'a', 'minuto': 10, 'under_atual': 5.0}]),
+    ('/encerrar', {'id_partida': ''}),
+])
+def test_entrada_invalida_post(servidor, caminho, corpo):
+    status, resposta = requisitar(servidor, caminho, corpo=corpo)
+    assert status == 400
+    assert resposta['erro']
+
+
+def test_encerrar_partida(servidor):
+    tick = {'id_partida': 'a', 'under_inicial': 7.0, 'minuto': 10, 'under_atual': 5.0}
+    assert requisitar(servidor, '/tick', corpo=tick)[0] == 200
+    assert requisitar(servidor, '/encerrar', {'id_partida': 'a'}) == (200, {'encerrada': True})
+    assert requisitar(servidor, '/encerrar', {'id_partida': 'a'}) == (200, {'encerrada': False})
+
+
+@pytest.mark.parametrize('campo', ['minuto', 'under_atual', 'over_atual', 'under_inicial'])
+def test_tick_nao_finito(servidor, campo):
+    tick = {'id_partida': 'a', 'under_inicial': 7.0, 'minuto': 10, 'under_atual': 5.0}
+    assert requisitar(servidor, '/tick', corpo=tick)[0] == 200
+    status, resposta = requisitar(servidor, '/tick', corpo={**tick, 'minuto': 11, campo: math.inf})
+    assert status == 400
+    assert resposta['erro']
+
+    status, radar = requisitar(servidor, '/oportunidades', {'k': 5})
+    assert status == 200
+    [partida] = radar['oportunidades']
+    assert partida['minuto'] == 10
+    assert partida['pontuacao'] == partida['divergencia_percent'] == -15.8
+
+
+@pytest.mark.parametrize('caminho, parametros', [
+    ('/curva', {'under_inicial': 'inf'}),
+    ('/esperado', {'under_inicial': 7.0, 'minuto': 'nan'}),
+    ('/divergencia', {'under_inicial': 7.0, 'minuto': 25, 'under_atual': 'inf'}),
+    ('/divergencia', {'under_inicial': 7.0, 'minuto': 25, 'under_atual': 'NaN'}),
+])
+def test_valores_nao_finitos(servidor, caminho, parametros):
+    status, resposta = requisitar(servidor, caminho, parametros)
+    assert status == 400
+    assert resposta['erro']
+    status, _ = requisitar(servidor, caminho, corpo=[parametros])
+    assert status == 400
+
+
+@pytest.mark.parametrize('tamanho', ['abc', '-1'])
+def test_content_length_invalido(servidor, tamanho):
+    conexao = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    try:
+        conexao.putrequest('POST', '/curva')
+        conexao.putheader('Content-Length', tamanho)
+        conexao.endheaders()
+        resposta = conexao.getresponse()
+        assert resposta.status == 400
+        assert json.loads(resposta.read())['erro']
+    finally:
+        conexao.close()
+    assert requisitar(servidor, '/curva', {'under_inicial': 7.0})[0] == 200
@@ -0,0 +1,48 @@
+import numpy as np
+
+from analisador.nucleo import AnalisadorApostasUnderOver
+from analisador.validacao import main, validar_dominio, verificar_curvas
+
+# Bordas das faixas de calcular_under_final_esperado: a odd de cima dá um
+# under final bem menor que a de baixo, e a curva inteira salta junto
+BORDAS_FAIXAS = [3.0, 5.0, 7.0, 10.0, 15.0, 20.0, 30.0, 50.0]
+
+# Violações conhecidas do modelo na grade de centésimos; qualquer mudança
+# (para mais ou para menos) tem de vir com a atualização desta tabela
+VIOLACOES_CONHECIDAS = {
+    'under_inicial': [(1.01, 1.02, 2)],
+    'final_abaixo_inicial': [(1.01, 1.02, 2)],
+    'final_monotono': [(borda, borda, 1) for borda in BORDAS_FAIXAS],
+    'continuidade': [(borda, borda, 1) for borda in BORDAS_FAIXAS],
+}
+
+
+def test_violacoes_conhecidas_da_grade():
+    relatorio = validar_dominio()
+    assert not relatorio['ok']
+    violadas = {nome: dados['trechos'] for nome, dados in relatorio['invariantes'].items() if dados['violacoes']}
+    assert violadas == VIOLACOES_CONHECIDAS
+
+
+def test_under_final_acima_do_inicial_nas_menores_odds():
+    unders = [1.01, 1.02, 1.03, 1.5, 7.0]
+    mascaras = verificar_curvas(unders)
+    assert mascaras['final_abaixo_inicial'].tolist() == [True, True, False, False, False]
+    analisador = AnalisadorApostasUnderOver()
+    assert all(analisador.calcular_under_final_esperado(u) > u for u in (1.01, 1.02))
+
+
+def test_saltos_nas_bordas_das_faixas():
+    analisador = AnalisadorApostasUnderOver()
+    grade = np.round(np.concatenate([[borda - 0.01, borda] for borda in BORDAS_FAIXAS]), 2)
+    relatorio = validar_dominio(grade)
+    for nome in ('final_monotono', 'continuidade'):
+        assert relatorio['invariantes'][nome]['trechos'] == [(borda, borda, 1) for borda in BORDAS_FAIXAS]
+    for borda in BORDAS_FAIXAS:
+        assert analisador.calcular_under_final_esperado(borda) < analisador.calcular_under_final_esperado(borda - 0.01)
+
+
+def test_codigo_de_saida(capsys):
+    assert main([]) == 1
+    assert main(['--ignorar', *VIOLACOES_CONHECIDAS]) == 0
+    assert '❌' in capsys.readouterr().out